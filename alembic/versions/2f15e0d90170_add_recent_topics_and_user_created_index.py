@@ -0,0 +1,37 @@
+"""add recent_topics and user/created index on histories
+
+Revision ID: 2f15e0d90170
+Revises: 06e990cb07eb
+Create Date: 2026-10-18 10:12:41.203518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f15e0d90170'
+down_revision: Union[str, Sequence[str], None] = '06e990cb07eb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('recent_topics',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('scope', sa.String(length=200), nullable=False),
+    sa.Column('topics', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], name=op.f('fk_recent_topics_user_id_users')),
+    sa.PrimaryKeyConstraint('user_id', 'scope', name=op.f('pk_recent_topics'))
+    )
+    op.create_index('idx_hist_user_created', 'histories', ['user_id', sa.literal_column('created_at DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_hist_user_created', table_name='histories')
+    op.drop_table('recent_topics')
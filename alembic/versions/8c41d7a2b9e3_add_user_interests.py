@@ -0,0 +1,34 @@
+"""add user_interests
+
+Revision ID: 8c41d7a2b9e3
+Revises: 2f15e0d90170
+Create Date: 2026-10-18 13:40:07.518244
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41d7a2b9e3'
+down_revision: Union[str, Sequence[str], None] = '2f15e0d90170'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_interests',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('weights', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], name=op.f('fk_user_interests_user_id_users')),
+    sa.PrimaryKeyConstraint('user_id', name=op.f('pk_user_interests'))
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_interests')
@@ -0,0 +1,94 @@
+"""partition histories by month
+
+Revision ID: c3f1a9d5e7b2
+Revises: 8c41d7a2b9e3
+Create Date: 2026-10-18 21:05:44.310982
+
+모든 dialect: created_at 인덱스를 만들고 created_at을 NOT NULL로 바꾼다(모델과 일치, NULL 행은 현재 시각으로 채움).
+MySQL에서만 histories를 created_at 월 단위 RANGE COLUMNS 파티션으로 바꾼다.
+파티션 테이블은 외래 키를 가질 수 없고 모든 unique 키(PK 포함)에 파티션 열이 들어가야 하므로
+users 외래 키를 빼고 PK를 (history_id, created_at)으로 바꾼다.
+파티션은 가장 오래된 행의 달부터 이번 달 + settings.HISTORY_PARTITION_MONTHS_AHEAD까지 만들고, 그 뒤는 pmax가 받는다.
+이후 파티션 추가/만료 파티션 삭제는 python -m app.jobs.purge_histories가 한다.
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f1a9d5e7b2'
+down_revision: Union[str, Sequence[str], None] = '8c41d7a2b9e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _month_start(dt: datetime) -> datetime:
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(dt: datetime, n: int) -> datetime:
+    years, month = divmod(dt.month - 1 + n, 12)
+    return dt.replace(year=dt.year + years, month=month + 1)
+
+
+def _partitions(first: datetime, last: datetime) -> str:
+    parts = []
+    month = first
+    while month <= last:
+        upper = _add_months(month, 1)
+        parts.append(f"PARTITION p{month:%Y%m} VALUES LESS THAN ('{upper:%Y-%m-%d}')")
+        month = upper
+    parts.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+    return ",\n    ".join(parts)
+
+
+def _alter_created_at(nullable: bool) -> None:
+    """MySQL 외 dialect의 created_at NULL 허용 여부 변경."""
+    if op.get_bind().dialect.name != "sqlite":
+        op.alter_column('histories', 'created_at', existing_type=sa.DateTime(), nullable=nullable)
+        return
+    # sqlite는 테이블을 다시 만들어 바꾸는데(batch), 반영(reflection)으로 옮긴 인덱스는 DESC가 빠지므로 다시 만든다
+    with op.batch_alter_table('histories') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=nullable)
+    op.drop_index('idx_hist_user_room_created', table_name='histories')
+    op.create_index('idx_hist_user_room_created', 'histories',
+                    ['user_id', 'room_id', sa.literal_column('created_at DESC')], unique=False)
+    op.drop_index('idx_hist_user_created', table_name='histories')
+    op.create_index('idx_hist_user_created', 'histories', ['user_id', sa.literal_column('created_at DESC')], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 보존 기간 정리의 created_at 범위 배치 삭제용
+    op.create_index('idx_hist_created', 'histories', ['created_at'], unique=False)
+    op.execute("UPDATE histories SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    bind = op.get_bind()
+    if bind.dialect.name != "mysql":
+        _alter_created_at(nullable=False)
+        return
+
+    op.drop_constraint(op.f('fk_histories_user_id_users'), 'histories', type_='foreignkey')
+    op.execute("ALTER TABLE histories MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+               "DROP PRIMARY KEY, ADD PRIMARY KEY (history_id, created_at)")
+    now, oldest = bind.execute(sa.text("SELECT CURRENT_TIMESTAMP, MIN(created_at) FROM histories")).one()
+    first = _month_start(oldest or now)
+    last = _add_months(_month_start(now), settings.HISTORY_PARTITION_MONTHS_AHEAD)
+    op.execute(f"ALTER TABLE histories PARTITION BY RANGE COLUMNS(created_at) (\n    {_partitions(first, last)}\n)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == "mysql":
+        op.execute("ALTER TABLE histories REMOVE PARTITIONING")
+        op.execute("ALTER TABLE histories DROP PRIMARY KEY, ADD PRIMARY KEY (history_id), "
+                   "MODIFY created_at DATETIME NULL DEFAULT CURRENT_TIMESTAMP")
+        op.create_foreign_key(op.f('fk_histories_user_id_users'), 'histories', 'users', ['user_id'], ['user_id'])
+    else:
+        _alter_created_at(nullable=True)
+    op.drop_index('idx_hist_created', table_name='histories')
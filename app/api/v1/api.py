@@ -1,8 +1,9 @@
 from fastapi import APIRouter
-from app.api.v1.routers import gpt,test
+from app.api.v1.routers import gpt,test,ops
 router = APIRouter(
     prefix="/api"
 )
 
 router.include_router(gpt.router, prefix="", tags=["imporve prompt"])
-router.include_router(test.router, prefix="", tags=["test"])
\ No newline at end of file
+router.include_router(test.router, prefix="", tags=["test"])
+router.include_router(ops.router, prefix="", tags=["ops"])
\ No newline at end of file
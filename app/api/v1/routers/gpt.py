@@ -1,82 +1,370 @@
+import asyncio
 import json
-from typing import List
+import logging
+import time
+from typing import List, Optional
 from sqlalchemy.sql import desc
 from app.core.config import settings
-from app.core.prompts.prompt_loader import IMPROVE_SYS_PROMPT, REC_SYS_PROMPT1, REC_SYS_PROMPT2
-from app.models.history import History
+from app.core.prompts.registry import prompt_registry, PromptPrefix
+from app.models.history import History, MessageRole
 from app.schemas.gpt import inputPrompt, RecommendedPrompt, RecommendedPromptList, outputPrompt, RoomTrace, \
-    RecommendInput
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, HTTPException, Depends
-from openai import OpenAI
+    RecommendInput, Patch, BatchAnalyzeInput
+from app.core.patching import locate_patch, suggest
+from app.core.model_router import Route, get_model_router, record_route
+from app.core.local_fixer import local_fixer
+from app.core.pii import redact_for_llm
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
+from app.core.llm import LLMClient, get_llm_client
+from app.core.json_stream import IncrementalJSON
+from app.core.json_repair import parse_llm_json
+from app.core.metrics import stage_timer, add_stage_time, record_llm_error, current_endpoint, local_fix_requests, \
+    recommend_fallbacks
+from app.core.cache import analyze_cache, recommend_cache, recommend_cache_key, fingerprint, normalize_prompt
 from app.services import user_service, event_service
-from app.db.session import get_db
-from app.services.history_service import create_history, get_histories, get_histories_new
+from app.services.admission_service import admit_async
+from app.db.session import get_async_db, AsyncSessionLocal
+from app.services.history_service import create_history_async
+from app.services.topic_window_service import get_recent_topics_async
+from app.services.interest_service import get_top_interests_async
+from app.core.interests import interests_from_topics
+from app.core.local_recommender import local_recommender
+from app.services.trace_buffer import trace_buffer
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="")
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+# 분석 라우트의 model/max_tokens는 요청마다 모델 라우터(app.core.model_router)가 고른다
+RECOMMEND_PARAMS = {"model": "gpt-4o-mini", "temperature": 0.4, "max_tokens": 400}
+# 프롬프트 파일(app/core/prompts, hot reload). 메시지는 항상 [system, few-shot..., user] 순서로 만든다
+ANALYZE_SYS_PROMPT = "improve_sys_prompt.txt"
+ANALYZE_FEW_SHOTS = "improve_few_shots.json"
+ANALYZE_RESPONSE_FORMAT = "improve_response_format.json"
+# 추천 입력에 원문 그대로 붙이는 최근 토픽 수/길이 (나머지는 관심사 키워드로 요약)
+RECOMMEND_RECENT_TOPICS = 2
+RECOMMEND_RECENT_TOPIC_CHARS = 80
 
-@router.post(path="/analyze-prompt2", summary="사용자가 입력한 프롬프트를 분석하여 개선안을 제안")
-async def analyze_prompt(in_: inputPrompt, db:Session = Depends(get_db)):
-    if not user_service.is_exist_user(in_.device_uuid, db):
-        user_service.create_user(in_.device_uuid, db)
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": IMPROVE_SYS_PROMPT
-                },
-                {"role": "user", "content": in_.input_prompt}
-            ],
-            max_tokens=800,
-            # 필요 시 파라미터: temperature=0.3, max_tokens=800 등
-        )
+def analyze_prefix() -> PromptPrefix:
+    return prompt_registry.prefix("analyze", ANALYZE_SYS_PROMPT)
 
-        raw = response.choices[0].message.content
-        print(raw)
-        # 1) GPT 응답 파싱
+
+def recommend_prefix(room_id) -> PromptPrefix:
+    if room_id is None:  # 새 채팅방
+        return prompt_registry.prefix("recommend-new", "recommend_sys_prompt2.txt")
+    return prompt_registry.prefix("recommend-room", "recommend_sys_prompt1.txt")
+
+
+def analyze_cache_key(input_prompt: str, route: Route) -> str:
+    # 프롬프트 버전이나 경로 설정(모델/예산)이 바뀌면 이전 결과는 자연히 안 맞게 된다
+    return fingerprint(f"{analyze_prefix().version}:{fingerprint(route.params())}:{normalize_prompt(input_prompt)}")
+
+
+def get_cached_analysis(key: str, original: str):
+    cached = analyze_cache.get(key)
+    if cached is None:
+        return None
+    # 공백만 다른 프롬프트도 같은 키를 쓰므로 현재 원문 기준으로 다시 교차 검증
+    try:
+        return outputPrompt.model_validate(cached, context={"original": original}).model_dump(by_alias=True)
+    except ValidationError:
+        return None
+
+
+def try_local_fix(input_prompt: str) -> Optional[dict]:
+    """사전 기반 빠른 경로. 확신할 때만 교차 검증까지 마친 결과를 돌려주고, 판정은 hit/사유별로 집계한다."""
+    result = None
+    with stage_timer("local_fix"):
+        candidate, outcome = local_fixer.analyze(input_prompt)
+        if candidate is not None:
+            try:
+                result = outputPrompt.model_validate(candidate, context={"original": input_prompt}).model_dump(by_alias=True)
+            except ValidationError:
+                outcome = "invalid"
+    local_fix_requests.inc(current_endpoint(), outcome)
+    return result
+
+
+async def run_analysis(llm: LLMClient, input_prompt: str, bypass_cache: bool = False) -> dict:
+    """빠른 경로 -> 캐시 조회 -> LLM 호출 -> 파싱/교차 검증. 실패는 HTTPException(502 파싱, 400 규칙 위반)으로 올린다.
+
+    bypass_cache면 빠른 경로도 건너뛰고 LLM을 부른다.
+    """
+    if settings.LOCAL_FIX_ENABLED and not bypass_cache:
+        result = try_local_fix(input_prompt)
+        if result is not None:
+            return result
+
+    route = get_model_router().route(input_prompt)
+    cache_key = analyze_cache_key(input_prompt, route)
+    result = None if bypass_cache else get_cached_analysis(cache_key, input_prompt)
+    if result is not None:
+        return result
+
+    prefix = analyze_prefix()
+    # 이메일/전화/주민번호는 자리표시자로 바꿔 보내고, 응답의 자리표시자는 되돌린 뒤 원문 기준으로 검증
+    redaction = redact_for_llm(input_prompt)
+    started = time.perf_counter()
+    response = await llm.chat(
+        messages=prefix.build(redaction.text),
+        prompt=prefix,
+        timeout=settings.LLM_TIMEOUT_ANALYZE,
+        # 같은 프롬프트가 동시에 들어오면(재시도/여러 기기/배치 안 중복) 업스트림 호출 하나를 같이 기다린다
+        coalesce="analyze-prompt2",
+        **route.params(),
+        # 필요 시 파라미터: temperature=0.3 등
+    )
+    record_route(route, time.perf_counter() - started)
+
+    raw = response.choices[0].message.content
+    # 1) GPT 응답 파싱
+    with stage_timer("parse"):
         try:
-            parsed = json.loads(raw)
-        except json.JSONDecodeError:
+            parsed = redaction.restore_obj(parse_llm_json(raw, usage=response.usage))
+        except ValueError:
+            record_llm_error("parse")
             raise HTTPException(status_code=502, detail="GPT 응답 JSON 파싱 실패")
 
         try:
-            validated = outputPrompt.model_validate(parsed, context={"original": in_.input_prompt})
+            validated = outputPrompt.model_validate(parsed, context={"original": input_prompt})
         except ValidationError as e:
+            record_llm_error("validation")
             raise HTTPException(status_code=400, detail=f"스키마/규칙 위반: {e.errors()}")
 
+        result = validated.model_dump(by_alias=True)
+    analyze_cache.set(cache_key, result)
+    return result
+
+
+@router.post(path="/analyze-prompt2", summary="사용자가 입력한 프롬프트를 분석하여 개선안을 제안")
+async def analyze_prompt(in_: inputPrompt, db:AsyncSession = Depends(get_async_db), llm: LLMClient = Depends(get_llm_client)):
+    await admit_async(in_.device_uuid, db)
+    await user_service.get_or_create_user_id_async(in_.device_uuid, db)
+
+    try:
+        result = await run_analysis(llm, in_.input_prompt, in_.bypass_cache)
+
         # 2) DB 저장 (event)
-        event_service.create_event(in_.device_uuid, in_.input_prompt, validated, db)
+        await event_service.create_event_async(in_.device_uuid, in_.input_prompt, result, db)
 
         # 3) 그대로 클라이언트에 반환(topic/patches/full_suggestion 사용)
-        return validated.model_dump(by_alias=True)
+        return result
 
+    except HTTPException:
+        # 502/400은 그대로 내보낸다(아래에서 500으로 덮어쓰지 않도록)
+        raise
     except Exception as e:
+        record_llm_error("internal")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post(path="/trace_input", summary="유저 질문 수집 -> 유저의 관심사 파악")
-def trace_input_prompt(in_: RoomTrace, db:Session = Depends(get_db)):
-    if not user_service.is_exist_user(in_.device_uuid, db):
-        user_service.create_user(in_.device_uuid, db)
+@router.post(path="/analyze-prompt2/batch", summary="프롬프트 여러 개를 한 번에 분석(항목별 결과/실패 반환)")
+async def analyze_prompt_batch(in_: BatchAnalyzeInput, db:AsyncSession = Depends(get_async_db), llm: LLMClient = Depends(get_llm_client)):
+    # 요청 수 제한은 배치당 한 번 확인하되 항목 수만큼 토큰을 쓰고, LLM 호출은 배치 동시성 한도 안에서 병렬로
+    await admit_async(in_.device_uuid, db, cost=len(in_.items))
+    user_id = await user_service.get_or_create_user_id_async(in_.device_uuid, db)
+    semaphore = asyncio.Semaphore(settings.ANALYZE_BATCH_CONCURRENCY)
+
+    async def analyze_item(index: int, item) -> dict:
+        async with semaphore:
+            try:
+                result = await run_analysis(llm, item.input_prompt, item.bypass_cache)
+            except HTTPException as e:
+                item_result = {"index": index, "status": e.status_code, "detail": e.detail}
+                if e.headers and "Retry-After" in e.headers:
+                    # 부하로 거절된 항목: 클라이언트가 이 항목만 나중에 다시 보낼 수 있도록
+                    item_result["retry_after"] = int(e.headers["Retry-After"])
+                return item_result
+            except Exception as e:
+                record_llm_error("internal")
+                return {"index": index, "status": 500, "detail": str(e)}
+        return {"index": index, "status": 200, "result": result}
+
+    results = await asyncio.gather(*(analyze_item(i, item) for i, item in enumerate(in_.items)))
+
+    # 성공한 항목의 event를 한 트랜잭션으로 저장
+    succeeded = [(in_.items[r["index"]].input_prompt, r["result"]) for r in results if r["status"] == 200]
+    events_saved = 0
+    if succeeded:
+        try:
+            events_saved = await event_service.create_events_async(user_id, succeeded, db)
+        except Exception:
+            await db.rollback()
+            logger.exception("batch event insert failed (%d rows)", len(succeeded))
+
+    return {
+        "total": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "events_saved": events_saved,
+        "results": results,
+    }
+
+
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def is_complete_patch(p) -> bool:
+    # 부분 파싱 결과에는 닫힌 문자열만 들어 있으므로 세 키가 모두 있으면 완성된 패치
+    return isinstance(p, dict) and all(k in p for k in ("tag", "from", "to"))
+
+
+@router.post(path="/analyze-prompt2/stream", summary="프롬프트 분석 결과를 패치 단위 SSE로 스트리밍")
+async def analyze_prompt_stream(in_: inputPrompt, db:AsyncSession = Depends(get_async_db), llm: LLMClient = Depends(get_llm_client)):
+    await admit_async(in_.device_uuid, db)
+    await user_service.get_or_create_user_id_async(in_.device_uuid, db)
+
+    route = get_model_router().route(in_.input_prompt)
+    cache_key = analyze_cache_key(in_.input_prompt, route)
+    cached = None
+    if not in_.bypass_cache:
+        if settings.LOCAL_FIX_ENABLED:
+            cached = try_local_fix(in_.input_prompt)
+        if cached is None:
+            cached = get_cached_analysis(cache_key, in_.input_prompt)
+
+    async def events():
+        result = cached
+        sent = 0
+
+        if result is None:
+            # 1) 패치가 완성되는 즉시 교차 검증 후 전송
+            parser = IncrementalJSON()
+            search_from = 0
+            prefix = analyze_prefix()
+            redaction = redact_for_llm(in_.input_prompt)
+            started = time.perf_counter()
+            try:
+                async for chunk in llm.stream_chat(
+                    messages=prefix.build(redaction.text),
+                    prompt=prefix,
+                    timeout=settings.LLM_TIMEOUT_ANALYZE,
+                    **route.params(),
+                ):
+                    if not parser.feed(chunk) or not isinstance(parser.value, dict):
+                        continue
+                    patches = parser.value.get("patches") or []
+                    while sent < len(patches) and is_complete_patch(patches[sent]):
+                        patch = Patch.model_validate(redaction.restore_obj(patches[sent]))
+                        idx = locate_patch(in_.input_prompt, patch.from_, search_from, sent)
+                        search_from = idx + len(patch.from_)
+                        yield sse("patch", {"index": sent, **patch.model_dump(by_alias=True)})
+                        sent += 1
+            except ValueError as e:
+                record_llm_error("validation")
+                yield sse("error", {"status": 400, "detail": f"스키마/규칙 위반: {e}"})
+                return
+            except HTTPException as e:
+                # 대기열/서킷 거절(503), 기한 초과(504): 응답은 이미 시작했으므로 이벤트로 전달
+                error = {"status": e.status_code, "detail": e.detail}
+                if e.headers and "Retry-After" in e.headers:
+                    error["retry_after"] = int(e.headers["Retry-After"])
+                yield sse("error", error)
+                return
+            except Exception as e:
+                record_llm_error("internal")
+                yield sse("error", {"status": 500, "detail": str(e)})
+                return
+
+            record_route(route, time.perf_counter() - started)
+
+            # 2) 스트림 종료 후 전체 응답 검증
+            parse_started = time.perf_counter()
+            try:
+                parsed = redaction.restore_obj(parse_llm_json(parser.text))
+            except ValueError:
+                record_llm_error("parse")
+                yield sse("error", {"status": 502, "detail": "GPT 응답 JSON 파싱 실패"})
+                return
+            try:
+                validated = outputPrompt.model_validate(parsed, context={"original": in_.input_prompt})
+            except ValidationError as e:
+                record_llm_error("validation")
+                yield sse("error", {"status": 400, "detail": f"스키마/규칙 위반: {e.errors()}"})
+                return
+            result = validated.model_dump(by_alias=True)
+            add_stage_time("parse", time.perf_counter() - parse_started)
+            analyze_cache.set(cache_key, result)
+
+        for i in range(sent, len(result["patches"])):
+            yield sse("patch", {"index": i, **result["patches"][i]})
+        yield sse("topic", {"topic": result["topic"]})
+        yield sse("full_suggestion", {"full_suggestion": result["full_suggestion"]})
+
+        # 3) DB 저장 (event) - 요청 세션은 이미 응답을 시작했으므로 별도 세션 사용
+        try:
+            async with AsyncSessionLocal() as session:
+                event = await event_service.create_event_async(in_.device_uuid, in_.input_prompt, result, session)
+        except Exception as e:
+            record_llm_error("internal")
+            yield sse("error", {"status": 500, "detail": str(e)})
+            return
+        yield sse("done", {"event_id": event.event_id})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    new_history = create_history(in_, 'user',db)
 
+@router.post(path="/trace_input", summary="유저 질문 수집 -> 유저의 관심사 파악")
+async def trace_input_prompt(in_: RoomTrace, db:AsyncSession = Depends(get_async_db)):
+    await record_trace(in_, MessageRole.USER, db)
     return {"status": "success"}
 
 @router.post(path="/trace_output_prompt", summary="ai 답변 수집 -> 유저의 관심사 파악")
-def trace_output_prompt(in_: RoomTrace, db:Session = Depends(get_db)):
-    if not user_service.is_exist_user(in_.device_uuid, db):
-        user_service.create_user(in_.device_uuid, db)
+async def trace_output_prompt(in_: RoomTrace, db:AsyncSession = Depends(get_async_db)):
+    await record_trace(in_, MessageRole.AI, db)
+    return {"status": "success"}
 
-    new_history = create_history(in_,'ai',db)
+async def record_trace(in_: RoomTrace, role: MessageRole, db: AsyncSession):
+    # 버퍼가 켜져 있으면 큐에만 넣고 바로 응답(백그라운드에서 bulk insert)
+    if settings.TRACE_BUFFER_ENABLED and trace_buffer.running:
+        await trace_buffer.put(in_.device_uuid, in_.room_id, role, in_.input_prompt)
+        return
+
+    await create_history_async(in_, role.value, db)
+
+async def request_recommendations(llm: LLMClient, prefix: PromptPrefix, user_payload: dict):
+    # 최근 토픽 원문에 섞인 PII는 가려서 보내고, 추천 문구에 되살아난 자리표시자는 원래 값으로
+    redaction = redact_for_llm(json.dumps(user_payload, ensure_ascii=False))
+    resp = await llm.chat(
+        messages=prefix.build(redaction.text),
+        prompt=prefix,
+        timeout=settings.LLM_TIMEOUT_RECOMMEND,
+        coalesce="recommended-prompts",
+        **RECOMMEND_PARAMS,
+    )
+    raw = resp.choices[0].message.content
+    with stage_timer("parse"):
+        try:
+            return redaction.restore_obj(parse_llm_json(raw, usage=resp.usage))  # ✅ 파싱해서 dict/list로 변환
+        except ValueError:
+            record_llm_error("parse")
+            raise
+
+
+# 예산 초과로 응답은 먼저 나갔지만 아직 진행 중인 LLM 추천 호출 (GC 방지용 참조)
+_pending_recommendations: set[asyncio.Task] = set()
+
+
+def _store_late_recommendation(task: asyncio.Task, cache_key: str, payload_fp: str) -> None:
+    _pending_recommendations.discard(task)
+    if task.cancelled() or task.exception() is not None:
+        return
+    recommend_cache.set(cache_key, (payload_fp, task.result()))
+
+
+def local_recommendations(room_id, topics: list[str], interests: list[str]) -> dict:
+    # LLM 응답과 같은 모양: 기존 채팅방은 "local", 새 채팅은 "global"
+    key = "global" if room_id is None else "local"
+    return {key: local_recommender.recommend(topics, interests)}
 
-    return {"status": "success"}
 
 @router.post(
     "/recommended-prompts",
@@ -84,63 +372,65 @@ def trace_output_prompt(in_: RoomTrace, db:Session = Depends(get_db)):
 )
 async def get_recommend_prompts(
     in_: RecommendInput,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    llm: LLMClient = Depends(get_llm_client),
 ):
-    if in_.room_id is None: # 새 채팅방
-        # 1) 최근 3개 room 주제
-        histories = get_histories_new(in_.device_uuid, db)
-        topics = [h.topic for h in histories]
-
-        # 히스토리가 전혀 없으면 빈 배열 반환(또는 204/404 중 정책 선택)
-        if not topics:
-            return []
-
-        # 2) GPT 호출
-        user_payload = {
-            "topics": topics
-        }
-
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": REC_SYS_PROMPT2},
-                {"role": "user", "content": json.dumps(user_payload, ensure_ascii=False)},
-            ],
-            temperature=0.4,
-            max_tokens=400,
-        )
-
-        raw = resp.choices[0].message.content
-        parsed = json.loads(raw)
-        return parsed
-    else: # 기존 채팅방
-
-        # 1) 히스토리 토픽 조회
-        histories = get_histories(in_.device_uuid, in_.room_id, db)
-        topics = [h.topic for h in histories]
-
-        # 히스토리가 전혀 없으면 빈 배열 반환(또는 204/404 중 정책 선택)
-        if not topics:
-            return []
-
-        # 2) GPT 호출
-        user_payload = {
-            "topics": topics
-        }
-
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": REC_SYS_PROMPT1},
-                {"role": "user", "content": json.dumps(user_payload, ensure_ascii=False)},
-            ],
-            temperature=0.4,
-            max_tokens=400,
-        )
-
-        raw = resp.choices[0].message.content
-        parsed = json.loads(raw)  # ✅ 파싱해서 dict/list로 변환
-        return parsed
+    await admit_async(in_.device_uuid, db)
+
+    # 1) 최근 토픽 윈도우 조회 (recent_topics PK 조회 한 번)
+    topics = await get_recent_topics_async(in_.device_uuid, in_.room_id, db)
+    prefix = recommend_prefix(in_.room_id)
+
+    # 히스토리가 전혀 없으면 빈 배열 반환(또는 204/404 중 정책 선택)
+    if not topics:
+        return []
+
+    # 2) 원문 토픽 대신 상위 K개 관심사 + 최근 토픽 일부만 보낸다
+    #    새 채팅: 유저 프로필(없으면 최근 윈도우로 계산), 기존 채팅방: 해당 room 윈도우 기준
+    interests = []
+    if in_.room_id is None:
+        interests = await get_top_interests_async(in_.device_uuid, db)
+    if not interests:
+        interests = interests_from_topics(topics)
+    user_payload = {
+        "interests": interests,
+        "recent": [t[:RECOMMEND_RECENT_TOPIC_CHARS] for t in topics[:RECOMMEND_RECENT_TOPICS]],
+    }
+
+    if in_.engine == "local":
+        response.headers["X-Recommend-Engine"] = "local"
+        return local_recommendations(in_.room_id, topics, interests)
+
+    # 입력이 그대로면 이전 추천을 재사용(LLM 호출 없음)
+    cache_key = recommend_cache_key(in_.device_uuid, in_.room_id)
+    payload_fp = fingerprint({"prompt": prefix.version, "params": RECOMMEND_PARAMS, "payload": user_payload})
+    cached = recommend_cache.get(cache_key)
+    if cached is not None and cached[0] == payload_fp:
+        response.headers["X-Recommend-Engine"] = "cache"
+        return cached[1]
+
+    # 3) GPT 호출
+    #    auto: 예산 안에 안 오면 로컬 추천으로 먼저 응답하고, LLM 호출은 끝까지 진행시켜 결과를 캐시에 넣는다
+    task = asyncio.create_task(request_recommendations(llm, prefix, user_payload))
+    try:
+        if in_.engine == "auto":
+            parsed = await asyncio.wait_for(asyncio.shield(task), settings.RECOMMEND_LLM_BUDGET_SECONDS)
+        else:
+            parsed = await task
+    except Exception as e:
+        if in_.engine == "llm":
+            raise
+        if not task.done():
+            _pending_recommendations.add(task)
+            task.add_done_callback(lambda t: _store_late_recommendation(t, cache_key, payload_fp))
+        recommend_fallbacks.inc(type(e).__name__)
+        response.headers["X-Recommend-Engine"] = "local-fallback"
+        return local_recommendations(in_.room_id, topics, interests)
+
+    response.headers["X-Recommend-Engine"] = "llm"
+    recommend_cache.set(cache_key, (payload_fp, parsed))
+    return parsed
     # # 3) JSON 파싱 & 유효성 검사
     # try:
     #     data = json.loads(raw)
@@ -210,87 +500,49 @@ async def get_recommend_prompts(
 #     # return validated
 
 @router.post(path="/analyze-prompt1", summary="사용자가 입력한 프롬프트를 분석하여 개선안을 제안")
-async def analyze_prompt(in_: inputPrompt, db:Session = Depends(get_db)):
-    if not user_service.is_exist_user(in_.device_uuid, db):
-        user_service.create_user(in_.device_uuid, db)
+async def analyze_prompt(in_: inputPrompt, db:AsyncSession = Depends(get_async_db), llm: LLMClient = Depends(get_llm_client)):
+    await admit_async(in_.device_uuid, db)
+    await user_service.get_or_create_user_id_async(in_.device_uuid, db)
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": IMPROVE_SYS_PROMPT
-                },{"role": "user", "content": "도커에 대해 설명해줘"},
-                {"role": "assistant", "content": '''
-            {
-  "patches": [
-    { "tag": "문체/스타일 개선", "from": "도커", "to": "Docker", "occurrence": 1 },
-    { "tag": "모호/지시 불명확", "from": "설명해줘", "to": "컨테이너 개념과 이미지/레지스트리 중심으로 설명해줘", "occurrence": 1 }
-  ],
-  "full_suggestion": "Docker에 대해 컨테이너 개념과 이미지/레지스트리 중심으로 설명해줘."
-}
-                '''},
-                {"role": "user", "content": "인공지능에 대해 자세하고 상세하게 설명 해줬스면 좋겠어."},
-                {"role": "assistant", "content": '''{
-            patches: [
-                {“tag”:“모호/지시 불명확”.
-                        “from”: "설명",
-                        “to”: "기본 개념을 3가지 핵심 포인트로 설명"
-                    }
-                ,
-                {“tag”:구조/길이 중복”,
-                        “from”: "자세하고 상세하게",
-                        “to”: "자세하게"
-                    },
-               {“tag”: "오타/맞춤법”:,
-                        “from”: "해줬스면",
-                        “to”: "해주었으면”}
-            ],
-  "full_suggestion": "FastAPI 파일 업로드 단계별 코드 예시와 보안 고려사항을 포함해 알려줘"
-}'''
-},
-                {"role": "user", "content": in_.input_prompt}
-            ],response_format={
-        "type": "json_schema",
-        "json_schema": {
-            "name": "PromptEdit",
-            "strict": True,  # 스키마 강제
-            "schema": {
-                "type": "object",
-                "additionalProperties": False,
-                "properties": {
-                    "patches": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "additionalProperties": False,
-                            "properties": {
-                                "tag": { "type": "string", "minLength": 1 },
-                                "from": { "type": "string", "minLength": 1 },
-                                "to":   { "type": "string", "minLength": 1 }
-                            },
-                            "required": ["tag", "from", "to"]
-                        }
-                    },
-                    "full_suggestion": { "type": "string", "minLength": 1 }
-                },
-                "required": ["patches", "full_suggestion"]
-            }
-        }
-    },
-            max_tokens=800,
-            # 필요 시 파라미터: temperature=0.3, max_tokens=800 등
+        # system + few-shot은 파일에서 읽어 만든 고정 prefix(프롬프트 캐싱 대상), 사용자 입력은 맨 뒤
+        prefix = prompt_registry.prefix("analyze-fewshot", ANALYZE_SYS_PROMPT, ANALYZE_FEW_SHOTS,
+                                        extra=ANALYZE_RESPONSE_FORMAT)
+        route = get_model_router().route(in_.input_prompt)
+        redaction = redact_for_llm(in_.input_prompt)
+        started = time.perf_counter()
+        response = await llm.chat(
+            messages=prefix.build(redaction.text),
+            prompt=prefix,
+            response_format=prompt_registry.get(ANALYZE_RESPONSE_FORMAT).content,
+            timeout=settings.LLM_TIMEOUT_ANALYZE,
+            **route.params(),
+            # 필요 시 파라미터: temperature=0.3 등
         )
+        record_route(route, time.perf_counter() - started)
 
         raw = response.choices[0].message.content
-        res = json.loads(raw)
-        print(raw)
+        with stage_timer("parse"):
+            try:
+                res = redaction.restore_obj(parse_llm_json(raw, usage=response.usage))
+            except ValueError:
+                record_llm_error("parse")
+                raise HTTPException(status_code=502, detail="GPT 응답 JSON 파싱 실패")
+            # full_suggestion은 스키마에서 빠졌으므로 원문에 패치를 적용해 채운다
+            try:
+                res["full_suggestion"] = suggest(
+                    in_.input_prompt, [(p["from"], p["to"]) for p in res.get("patches") or []])
+            except (KeyError, TypeError, ValueError) as e:
+                record_llm_error("validation")
+                raise HTTPException(status_code=400, detail=f"스키마/규칙 위반: {e}")
         # 2) DB 저장 (event)
-        event_service.create_event(in_.device_uuid, in_.input_prompt, res, db)
+        await event_service.create_event_async(in_.device_uuid, in_.input_prompt, res, db)
 
         # 3) 그대로 클라이언트에 반환(topic/patches/full_suggestion 사용)
         return res
 
+    except HTTPException:
+        raise
     except Exception as e:
+        record_llm_error("internal")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,109 @@
+import secrets
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from app.db.session import SessionLocal, pool_stats
+from app.models.user import User
+from app.core.cache import cache_stats
+from app.core.config import settings
+from app.core.llm import LLMClient, get_llm_client
+from app.services.admission_service import rate_limiter
+from app.core.metrics import local_fix_stats, prompt_cache_stats
+from app.core.prompts.registry import prompt_registry
+from app.services.trace_buffer import trace_buffer
+from app.services.export_service import EXPORTS, ExportFilter, InvalidCursor, chunk_end, decode_cursor, \
+    encode_cursor, stream_export
+
+router = APIRouter(prefix="/ops")
+
+
+@router.get(path="/db-pool", summary="DB 커넥션 풀 checkout/대기 시간 통계(워커 단위)")
+def get_db_pool_stats():
+    return pool_stats()
+
+
+@router.get(path="/cache", summary="프로세스 내 응답 캐시 hit/miss 통계(워커 단위)")
+def get_cache_stats():
+    return cache_stats()
+
+
+@router.get(path="/local-fix", summary="분석 빠른 경로(LLM 없이 응답) hit rate와 넘긴 사유(워커 단위)")
+def get_local_fix_stats():
+    return local_fix_stats()
+
+
+@router.get(path="/trace-buffer", summary="trace write-behind 버퍼 상태")
+def get_trace_buffer_stats():
+    return trace_buffer.stats()
+
+
+@router.get(path="/llm", summary="LLM 호출 동시성/coalescing/수용 제어/서킷 브레이커 통계(워커 단위)")
+def get_llm_stats(llm: LLMClient = Depends(get_llm_client)):
+    return {
+        "in_flight": llm.in_flight,
+        "max_concurrency": llm.max_concurrency,
+        "singleflight": llm.singleflight.stats(),
+        "admission": {**llm.gate.stats(), "rate_limited_devices_tracked": len(rate_limiter)},
+        "circuit": llm.breaker.stats(),
+        # 엔드포인트별 현재 hedge 지연(표본이 모자라면 None = hedge 안 함)
+        "hedge_p95_s": {endpoint: window.percentile(settings.LLM_HEDGE_PERCENTILE)
+                        for endpoint, window in llm.latency.items()},
+    }
+
+
+@router.get(path="/prompts", summary="프롬프트 버전/토큰 수(tiktoken이 없으면 추정치)와 버전별 캐시 토큰 비율(워커 단위)")
+def get_prompt_stats():
+    return {**prompt_registry.stats(), "usage": prompt_cache_stats()}
+
+
+@router.get(path="/export/{table}", summary="events/histories를 gzip NDJSON/CSV로 스트리밍 내보내기(커서로 이어 받기)")
+def export_table(
+    table: Literal["events", "histories"],
+    format: Literal["ndjson", "csv"] = "ndjson",
+    since: Optional[datetime] = Query(None, description="created_at >= since"),
+    until: Optional[datetime] = Query(None, description="created_at < until"),
+    user_id: list[int] = Query([], description="여러 번 지정 가능"),
+    device_uuid: list[str] = Query([], description="user_id로 바꿔 필터(여러 번 지정 가능)"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Export-Next-Cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="이번 응답의 최대 행 수"),
+    x_export_token: Optional[str] = Header(None),
+):
+    if not settings.EXPORT_TOKEN:
+        raise HTTPException(status_code=404, detail="내보내기 API가 꺼져 있습니다(EXPORT_TOKEN 미설정).")
+    if not x_export_token or not secrets.compare_digest(x_export_token, settings.EXPORT_TOKEN):
+        raise HTTPException(status_code=403, detail="X-Export-Token이 올바르지 않습니다.")
+
+    spec = EXPORTS[table]
+    with SessionLocal() as db:
+        user_ids = set(user_id)
+        if device_uuid:
+            found = db.execute(select(User.user_id).where(User.device_uuid.in_(device_uuid))).scalars().all()
+            if not found:
+                raise HTTPException(status_code=404, detail="device_uuid에 해당하는 유저가 없습니다.")
+            user_ids.update(found)
+        filters = ExportFilter(since, until, tuple(sorted(user_ids)))
+
+        after = 0
+        if cursor:
+            # 이어 받을 때는 커서에 든 테이블/필터를 그대로 쓴다(다른 필터를 같이 주면 거절)
+            try:
+                cursor_spec, cursor_filters, after = decode_cursor(cursor)
+            except InvalidCursor as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if cursor_spec is not spec:
+                raise HTTPException(status_code=400, detail=f"{cursor_spec.table} 내보내기의 커서입니다.")
+            if filters != ExportFilter() and filters != cursor_filters:
+                raise HTTPException(status_code=400, detail="커서와 다른 필터를 함께 줄 수 없습니다.")
+            filters = cursor_filters
+
+        limit = min(limit or settings.EXPORT_CHUNK_ROWS, settings.EXPORT_MAX_CHUNK_ROWS)
+        end = chunk_end(db, spec, filters, after, limit)
+
+    headers = {"Content-Disposition": f'attachment; filename="{table}-{after}.{format}.gz"'}
+    if end is not None:
+        headers["X-Export-Next-Cursor"] = encode_cursor(spec, filters, end)
+    return StreamingResponse(stream_export(spec, format, filters, after, until_pk=end),
+                             media_type="application/gzip", headers=headers)
@@ -3,31 +3,20 @@
 from __future__ import annotations
 
 import json
-import re
+import time
 from typing import List, Optional, Literal, Dict, Any
 from app.core.config import settings
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field, ValidationError
-from openai import OpenAI
+from app.core.llm import LLMClient, get_llm_client
+from app.core.json_repair import parse_llm_json
+from app.core.model_router import get_model_router, record_route
+from app.core.pii import redact_for_llm
+from app.schemas.gpt import TaskType
 
 router = APIRouter(prefix="")
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
-TaskType = Literal[
-    "qa_fact",
-    "coding",
-    "debugging",
-    "data_analysis",
-    "summarization",
-    "translation_localization",
-    "brainstorming",
-    "planning",
-    "creative_writing",
-    "other",
-]
-
 class InputPrompt(BaseModel):
     prompt: str = Field(..., description="사용자가 LLM에 보낼 원본 질문/요청")
     language: Literal["ko", "en"] = Field("ko", description="개선 프롬프트와 보조출력을 생성할 언어")
@@ -39,7 +28,7 @@ class InputPrompt(BaseModel):
     )
     enable_rag: bool = Field(False, description="내부 RAG(조직 지식) 사용 의향만 신호로 전달")
     enable_web: bool = Field(False, description="웹검색/최신성 보강 필요 신호")
-    mask_pii: bool = Field(False, description="원문 내 PII(이메일/전화) 마스킹 후 모델에 전송")
+    mask_pii: bool = Field(False, description="PII_REDACTION_ENABLED가 꺼져 있어도 이 요청의 PII(이메일/전화/주민번호)를 가려서 전송")
     temperature: Optional[float] = Field(0.3, ge=0.0, le=2.0, description="모델 디코딩 온도")
     max_tokens: Optional[int] = Field(900, description="모델 최대 토큰 출력 값")
     # 고급 옵션(필요시 확장):
@@ -66,39 +55,6 @@ class AnalyzePromptResponse(BaseModel):
     raw_text: Optional[str] = None  # 디버깅용(필요시 프런트에서 숨김)
 
 
-# -----------------------------
-# Utilities
-# -----------------------------
-EMAIL_RE = re.compile(r"([A-Za-z0-9._%+-]+)@([A-Za-z0-9.-]+\.[A-Za-z]{2,})")
-PHONE_RE = re.compile(r"(?:(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{2,4}\)?[-.\s]?)?\d{3,4}[-.\s]?\d{4})")
-
-def mask_pii_text(text: str) -> str:
-    # Simple masking for emails and phone numbers
-    masked = EMAIL_RE.sub(lambda m: f"{m.group(1)[0]}***@***.{m.group(2).split('.')[-1]}", text)
-    masked = PHONE_RE.sub(lambda _: "XXX-XXXX-XXXX", masked)
-    return masked
-
-def coerce_json_from_text(text: str) -> dict:
-    """
-    Try to coerce a JSON object from model text output.
-    1) direct json.loads
-    2) trim to outermost {...} block
-    """
-    try:
-        return json.loads(text)
-    except Exception:
-        pass
-    # try to locate the first '{' and last '}'
-    try:
-        start = text.find("{")
-        end = text.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            snippet = text[start : end + 1]
-            return json.loads(snippet)
-    except Exception:
-        pass
-    raise ValueError("Failed to parse JSON from model output.")
-
 # -----------------------------
 # Templates/Guides injected to System Prompt
 # -----------------------------
@@ -199,15 +155,12 @@ Language: Mirror the user's requested language (ko/en). If not specified, use ko
     summary="사용자가 입력한 프롬프트를 분석하여 개선안을 제안",
     response_model=AnalyzePromptResponse,
 )
-async def analyze_prompt(in_: InputPrompt):
+async def analyze_prompt(in_: InputPrompt, llm: LLMClient = Depends(get_llm_client)):
     # 1) Prepare user content (context bundle)
     user_prompt_text = in_.prompt.strip()
     if not user_prompt_text:
         raise HTTPException(status_code=400, detail="prompt가 비어 있습니다.")
 
-    # Optional simple PII masking for transport (you can disable via in_.mask_pii=False)
-    transport_text = mask_pii_text(user_prompt_text) if in_.mask_pii else user_prompt_text
-
     # Build a compact "context card" for the model (kept short to save tokens)
     context_items = []
     if in_.domain:
@@ -244,20 +197,32 @@ async def analyze_prompt(in_: InputPrompt):
             "content": (
                 f"[language]: {in_.language}\n"
                 f"[context]:\n{context_block}\n"
-                f"[original_prompt]:\n{transport_text}"
+                f"[original_prompt]:\n{user_prompt_text}"
             ),
         },
     ]
+    # PII는 context/예시/스니펫까지 포함해 한 번에 자리표시자로 바꾸고, 응답에서 되돌린다
+    redaction = redact_for_llm(messages[1]["content"], force=in_.mask_pii)
+    messages[1]["content"] = redaction.text
 
     # 3) Call OpenAI (force JSON object output)
+    #    모델은 라우터가 고르고, max_tokens는 요청에 명시했을 때만 그 값을 쓴다
+    route = get_model_router().route(user_prompt_text)
+    max_tokens = in_.max_tokens if "max_tokens" in in_.model_fields_set and in_.max_tokens else route.max_tokens
     try:
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
+        started = time.perf_counter()
+        completion = await llm.chat(
+            model=route.model,
             messages=messages,
             temperature=in_.temperature or 0.3,
-            max_tokens=in_.max_tokens or 900,
+            max_tokens=max_tokens,
             response_format={"type": "json_object"},
+            timeout=settings.LLM_TIMEOUT_ANALYZE,
         )
+        record_route(route, time.perf_counter() - started)
+    except HTTPException:
+        # 기한 초과(504)/서킷 오픈·대기열 거절(503)은 그대로
+        raise
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"OpenAI API error: {e}")
 
@@ -267,12 +232,13 @@ async def analyze_prompt(in_: InputPrompt):
         raise HTTPException(status_code=502, detail="모델 응답이 비어 있습니다.")
 
     try:
-        parsed = coerce_json_from_text(raw_text)
-    except Exception:
-        # Retry once without response_format (fallback) to repair JSON
+        # 스마트 따옴표/쉼표/펜스/잘린 꼬리 등은 로컬에서 먼저 복구(재요청 없음)
+        parsed = parse_llm_json(raw_text, usage=completion.usage)
+    except ValueError:
+        # 로컬 복구도 실패한 경우에만 response_format 없이 한 번 더 요청
         try:
-            repair_try = client.chat.completions.create(
-                model="gpt-4o-mini",
+            repair_try = await llm.chat(
+                model=route.model,
                 messages=messages + [
                     {
                         "role": "system",
@@ -280,16 +246,17 @@ async def analyze_prompt(in_: InputPrompt):
                     }
                 ],
                 temperature=in_.temperature or 0.2,
-                max_tokens=in_.max_tokens or 900,
+                max_tokens=max_tokens,
+                timeout=settings.LLM_TIMEOUT_ANALYZE,
             )
             raw_text = repair_try.choices[0].message.content if repair_try.choices else ""
-            parsed = coerce_json_from_text(raw_text)
+            parsed = parse_llm_json(raw_text, usage=repair_try.usage)
         except Exception as e:
             raise HTTPException(status_code=502, detail=f"모델 JSON 파싱 실패: {e}")
 
     # Validate with Pydantic
     try:
-        payload = ImprovedPromptPayload(**parsed)
+        payload = ImprovedPromptPayload(**redaction.restore_obj(parsed))
     except ValidationError as ve:
         # Attach partial raw for debugging
         raise HTTPException(status_code=422, detail=f"스키마 검증 실패: {ve}")
@@ -311,9 +278,9 @@ async def analyze_prompt(in_: InputPrompt):
         status_code=200,
         content=AnalyzePromptResponse(
             result=payload,
-            model=getattr(completion, "model", "gpt-4o-mini"),
+            model=getattr(completion, "model", route.model),
             usage=usage_dict,
-            raw_text=raw_text,
+            raw_text=redaction.restore(raw_text),
         ).model_dump()
     )
 
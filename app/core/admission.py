@@ -0,0 +1,163 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.core.metrics import admission_requests, llm_queue_wait
+
+# 부하 시 요청 수용 제어.
+# - RateLimiter: 디바이스별 토큰 버킷. 초과하면 429
+# - PriorityGate: 워커당 LLM 동시 호출 예산. 자리가 없으면 우선순위 대기열(VIP 먼저)에 넣고,
+#   GENERAL은 예상 대기 시간이 SLO를 넘으면 줄을 세우지 않고 바로 503(Retry-After)으로 돌려보낸다.
+# 요청 등급은 contextvar로 LLM 호출까지 전달된다(app.services.admission_service.admit_async가 설정).
+
+VIP = "VIP"
+GENERAL = "GENERAL"
+_PRIORITY = {VIP: 0, GENERAL: 1}
+
+_grade: ContextVar[str] = ContextVar("request_grade", default=GENERAL)
+
+
+def set_request_grade(grade: str) -> None:
+    _grade.set(grade)
+
+
+def current_grade() -> str:
+    return _grade.get()
+
+
+class Rejected(HTTPException):
+    """429/503 + Retry-After. HTTPException이므로 라우터의 기존 예외 처리 경로를 그대로 탄다."""
+
+    def __init__(self, status_code: int, retry_after: float, detail: str):
+        super().__init__(status_code=status_code, detail=detail,
+                         headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+
+
+class RateLimiter:
+    """디바이스별 토큰 버킷. 이벤트 루프 안에서만 쓰므로 lock 없이 동작한다."""
+
+    def __init__(self, rate: float, burst: int, max_keys: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        # key -> [남은 토큰, 마지막 갱신 시각]
+        self._buckets: "OrderedDict[str, list[float]]" = OrderedDict()
+
+    def take(self, key: str, multiplier: float = 1.0, cost: float = 1.0) -> float:
+        """토큰 cost개를 쓴다. 허용이면 0, 아니면 cost개가 찰 때까지 남은 초(모자라면 하나도 쓰지 않는다).
+        cost는 burst * multiplier 이하여야 한다(넘으면 영원히 허용되지 않으므로 호출 측에서 거른다)."""
+        now = time.monotonic()
+        rate, burst = self.rate * multiplier, self.burst * multiplier
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [burst, now]
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return 0.0
+        return (cost - bucket[0]) / rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class PriorityGate:
+    """capacity개까지 동시에 통과시키는 우선순위 세마포어 + SLO 기반 load shedding."""
+
+    def __init__(self, capacity: int, slo: float, max_queue: int, initial_service_time: float = 1.0):
+        self.capacity = capacity
+        self.slo = slo
+        self.max_queue = max_queue
+        self.in_use = 0
+        # 슬롯 점유 시간의 지수 이동 평균(예상 대기 시간 계산용)
+        self.service_time = initial_service_time
+        self._waiters: list = []
+        self._seq = itertools.count()
+        self.waiting = {VIP: 0, GENERAL: 0}
+
+    def estimated_wait(self, grade: str) -> float:
+        # 나보다 앞에 설 사람: VIP는 VIP 대기자만, GENERAL은 전부
+        ahead = self.waiting[VIP] + (self.waiting[GENERAL] if grade == GENERAL else 0)
+        return (ahead + 1) * self.service_time / self.capacity
+
+    def _reject(self, grade: str, outcome: str, retry_after: float, detail: str) -> Rejected:
+        admission_requests.inc("llm", grade, outcome)
+        return Rejected(503, retry_after, detail)
+
+    async def acquire(self, grade: str) -> None:
+        if self.in_use < self.capacity and not (self.waiting[VIP] or self.waiting[GENERAL]):
+            self.in_use += 1
+            admission_requests.inc("llm", grade, "admitted")
+            llm_queue_wait.observe(0.0, grade)
+            return
+
+        estimate = self.estimated_wait(grade)
+        if self.waiting[VIP] + self.waiting[GENERAL] >= self.max_queue:
+            raise self._reject(grade, "shed_queue_full", estimate, "LLM 대기열이 가득 찼습니다.")
+        if grade != VIP and estimate > self.slo:
+            raise self._reject(grade, "shed_slo", estimate, "요청이 많아 잠시 후 다시 시도해 주세요.")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (_PRIORITY[grade], next(self._seq), future))
+        self.waiting[grade] += 1
+        admission_requests.inc("llm", grade, "queued")
+        started = time.monotonic()
+        try:
+            # GENERAL은 SLO까지만 기다린다(예상이 빗나가도 꼬리 지연이 SLO를 크게 넘지 않도록)
+            await asyncio.wait_for(future, None if grade == VIP else self.slo)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # 슬롯을 넘겨받은 직후 취소/타임아웃된 경우 바로 반납
+                self._release_slot()
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject(grade, "shed_timeout", self.service_time, "LLM 대기 시간이 초과되었습니다.")
+            raise
+        finally:
+            self.waiting[grade] -= 1
+            llm_queue_wait.observe(time.monotonic() - started, grade)
+        admission_requests.inc("llm", grade, "admitted")
+
+    def _release_slot(self) -> None:
+        # 살아 있는 대기자에게 슬롯을 그대로 넘기고, 없으면 반납
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_use -= 1
+
+    def release(self, held: float) -> None:
+        self.service_time = 0.8 * self.service_time + 0.2 * held
+        self._release_slot()
+
+    @asynccontextmanager
+    async def slot(self, grade: Optional[str] = None):
+        await self.acquire(grade or current_grade())
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "in_use": self.in_use,
+            "waiting": dict(self.waiting),
+            "service_time_ewma_s": round(self.service_time, 4),
+            "slo_seconds": self.slo,
+            "estimated_wait_general_s": round(self.estimated_wait(GENERAL), 4),
+        }
@@ -0,0 +1,84 @@
+import re
+from typing import Callable, Iterable, Iterator, Optional
+
+
+class AhoCorasick:
+    """여러 패턴을 텍스트 한 번 훑기로 찾는 Aho-Corasick 오토마톤.
+
+    루트 상태에서는 패턴 첫 글자 집합 정규식으로 다음 후보 위치까지 건너뛰므로
+    매칭이 드문 긴 텍스트에서는 대부분을 C 속도로 지나간다.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        # 같은 패턴은 하나로 합치고, id는 self.patterns의 인덱스
+        self.patterns: list[str] = [p for p in dict.fromkeys(patterns) if p]
+        self.ids = {p: i for i, p in enumerate(self.patterns)}
+        goto: list[dict[str, int]] = [{}]
+        out: list[list[int]] = [[]]
+        for pid, pattern in enumerate(self.patterns):
+            node = 0
+            for ch in pattern:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                node = nxt
+            out[node].append(pid)
+
+        # BFS로 실패 링크 계산, 출력은 실패 링크를 따라 합쳐 둔다(긴 패턴이 먼저)
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for node in queue:
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+        self._goto = goto
+        self._fail = fail
+        self._out = [tuple(o) for o in out]
+        first = {p[0] for p in self.patterns}
+        self._skip = re.compile("[" + "".join(re.escape(c) for c in sorted(first)) + "]") if first else None
+
+    def iter(self, text: str, start: int = 0) -> Iterator[tuple[int, int]]:
+        """(시작 위치, 패턴 id)를 끝 위치 순서로 내보낸다(겹치는 매칭 포함)."""
+        if self._skip is None:
+            return
+        goto, fail, out, lens = self._goto, self._fail, self._out, [len(p) for p in self.patterns]
+        node = 0
+        i = start
+        n = len(text)
+        while i < n:
+            if node == 0:
+                m = self._skip.search(text, i)
+                if m is None:
+                    return
+                i = m.start()
+            ch = text[i]
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                for pid in out[node]:
+                    yield i - lens[pid] + 1, pid
+            i += 1
+
+    def find_leftmost_longest(self, text: str,
+                              accept: Optional[Callable[[int, int], bool]] = None) -> list[tuple[int, int]]:
+        """겹치지 않는 (시작 위치, 패턴 id) 목록. 같은 위치에서 시작하면 긴 패턴 우선.
+
+        accept(시작 위치, 패턴 id)를 주면 거기서 False인 매칭(단어 경계 위반 등)은 고르기 전에 뺀다.
+        """
+        matches = self.iter(text) if accept is None else (m for m in self.iter(text) if accept(*m))
+        matches = sorted(matches, key=lambda m: (m[0], -len(self.patterns[m[1]])))
+        result = []
+        end = 0
+        for pos, pid in matches:
+            if pos >= end:
+                result.append((pos, pid))
+                end = pos + len(self.patterns[pid])
+        return result
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.core.config import settings
+
+_MISSING = object()
+
+
+class TTLCache:
+    """크기(LRU)와 TTL 기준으로 비우는 프로세스 내 캐시.
+
+    sync 라우터는 스레드풀에서 돌기 때문에 lock으로 보호한다.
+    ttl이 None이면 만료 없이 LRU로만 동작한다.
+    """
+
+    def __init__(self, max_entries: int, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = item
+            if expires_at and expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0.0
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+        return item[1] if item else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def normalize_prompt(text: str) -> str:
+    # 유니코드 정규화 + 공백 축약: 눈에 안 보이는 차이로 캐시가 갈라지지 않도록
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def fingerprint(value: Any) -> str:
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+# /analyze-prompt2 결과 캐시: (정규화된 프롬프트, 시스템 프롬프트 해시, 모델 파라미터) -> outputPrompt dump
+analyze_cache = TTLCache(settings.ANALYZE_CACHE_MAX_ENTRIES, settings.ANALYZE_CACHE_TTL_SECONDS)
+
+# /recommended-prompts 결과 캐시: (device_uuid, room_id 또는 "new") -> (토픽 fingerprint, 응답)
+recommend_cache = TTLCache(settings.RECOMMEND_CACHE_MAX_ENTRIES, settings.RECOMMEND_CACHE_TTL_SECONDS)
+NEW_ROOM = "new"
+
+
+def recommend_cache_key(device_uuid: str, room_id: Optional[str]) -> tuple[str, str]:
+    return device_uuid, room_id or NEW_ROOM
+
+
+def invalidate_recommendations(device_uuid: str, room_id: Optional[str]) -> None:
+    # 히스토리가 쌓이면 해당 room과 새 채팅방(전체 room 기준) 추천이 모두 바뀐다
+    recommend_cache.pop(recommend_cache_key(device_uuid, room_id))
+    recommend_cache.pop(recommend_cache_key(device_uuid, None))
+
+
+def cache_stats() -> dict:
+    return {
+        "analyze": analyze_cache.stats(),
+        "recommend": recommend_cache.stats(),
+    }
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from datetime import timedelta
 from pydantic import computed_field
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -8,7 +9,11 @@ class Settings(BaseSettings):
 
     # .env에서 읽힐 실제 필드들
     OPENAI_API_KEY: str
+    # OpenAI 호환 서버 주소(부하 테스트용 mock 서버 등). 비우면 기본 api.openai.com
+    OPENAI_BASE_URL: Optional[str] = None
     DATABASE_URL: str
+    # 비어 있으면 DATABASE_URL의 드라이버만 비동기 드라이버로 바꿔 사용
+    ASYNC_DATABASE_URL: Optional[str] = None
     # SECRET_KEY: str
     # REFRESH_SECRET_KEY: str
 
@@ -16,12 +21,157 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_EXPIRE_DAYS: int = 14
     ALGORITHM: str= "HS256"
 
+    # DB 커넥션 풀 (sync/async 엔진 공통, 워커 프로세스 단위)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # OpenAI 비동기 클라이언트 (워커 프로세스당 1개, keep-alive 커넥션 풀 공유)
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    OPENAI_TIMEOUT: float = 60.0
+    OPENAI_MAX_RETRIES: int = 2
+    # 워커당 동시에 진행할 수 있는 LLM 호출 수
+    LLM_MAX_CONCURRENCY: int = 32
+    # 슬롯이 없을 때 GENERAL 요청이 기다릴 수 있는 최대 시간(초). 예상 대기가 이보다 길면 바로 503
+    ADMISSION_QUEUE_SLO_SECONDS: float = 2.0
+    # 워커당 LLM 대기열 길이 상한(VIP 포함)
+    ADMISSION_MAX_QUEUE: int = 500
+    # 디바이스별 요청 수 제한(LLM 라우트, 토큰 버킷). VIP는 rate/burst에 배수를 곱한다
+    # 배치 분석은 항목 수만큼 토큰을 쓰므로 한 배치의 항목 수는 RATE_LIMIT_BURST 이하로 받는다(BatchAnalyzeInput에서 422)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_PER_SECOND: float = 1.0
+    RATE_LIMIT_BURST: int = 10
+    RATE_LIMIT_VIP_MULTIPLIER: float = 3.0
+    RATE_LIMIT_MAX_DEVICES: int = 100000
+    # device_uuid -> 등급 캐시 TTL(초). 등급 변경은 이 시간 안에 반영된다
+    USER_GRADE_CACHE_TTL_SECONDS: float = 300.0
+    # 엔드포인트별 호출 기한(초). SDK 재시도와 hedge를 포함한 호출 전체에 걸린다(넘으면 504)
+    LLM_TIMEOUT_ANALYZE: float = 30.0
+    LLM_TIMEOUT_RECOMMEND: float = 20.0
+    # hedged request: 첫 요청이 엔드포인트별 최근 지연의 p95(최소 LLM_HEDGE_MIN_DELAY_SECONDS)를 넘기면
+    # 같은 요청을 하나 더 보내고 먼저 끝난 쪽을 쓴다. 표본이 LLM_HEDGE_MIN_SAMPLES개 모이기 전에는 보내지 않는다
+    LLM_HEDGE_ENABLED: bool = True
+    LLM_HEDGE_PERCENTILE: float = 0.95
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 0.5
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_LATENCY_WINDOW: int = 200
+    # 서킷 브레이커: 최근 CIRCUIT_WINDOW_SECONDS 동안 호출이 CIRCUIT_MIN_CALLS개 이상이고
+    # 업스트림 오류 비율이 CIRCUIT_ERROR_THRESHOLD 이상이면 CIRCUIT_OPEN_SECONDS 동안 바로 503
+    CIRCUIT_ERROR_THRESHOLD: float = 0.5
+    CIRCUIT_MIN_CALLS: int = 20
+    CIRCUIT_WINDOW_SECONDS: float = 30.0
+    CIRCUIT_OPEN_SECONDS: float = 15.0
+    # 분석 모델 라우터: heuristic(입력 특징 선형 점수) 또는 fixed(항상 default 경로)
+    MODEL_ROUTER: str = "heuristic"
+    # 경로별 모델/출력 토큰 예산. 환경변수로는 JSON 문자열로 덮어쓴다
+    MODEL_ROUTES: dict[str, dict] = {
+        "short": {"model": "gpt-4o-mini", "max_tokens": 400},
+        "default": {"model": "gpt-4o-mini", "max_tokens": 800},
+        "complex": {"model": "gpt-4o-mini", "max_tokens": 1200},
+    }
+    # 특징 가중치와 경계: 점수 < SHORT_BELOW -> short, >= COMPLEX_FROM -> complex, 그 사이 default
+    MODEL_ROUTER_WEIGHTS: dict[str, float] = {
+        "log_tokens": 1.0, "lines": 0.8, "code": 2.0, "list_items": 1.0,
+        "constraints": 0.6, "latin_ratio": 0.5, "heavy_task": 1.0,
+    }
+    MODEL_ROUTER_SHORT_BELOW: float = 5.0
+    MODEL_ROUTER_COMPLEX_FROM: float = 8.5
+    # 규칙 기반 빠른 경로(/analyze-prompt2): 요청이 이미 구체적이라(핵심 단어 LOCAL_FIX_MIN_TERMS개 이상,
+    # 모호한 표현/열린 질문 없음) 사전(local_fix_dictionary.json)의 오타/띄어쓰기/표기 치환만 필요할 때 LLM 없이 응답.
+    # 조건 없이 대상만 있는 요청("도커에 대해 설명해줘")과 너무 긴 입력은 LLM으로 넘긴다(python -m benchmarks.local_fixer로 검증)
+    LOCAL_FIX_ENABLED: bool = True
+    LOCAL_FIX_MIN_TERMS: int = 3
+    LOCAL_FIX_MAX_CHARS: int = 500
+    # LLM으로 보내는 텍스트의 이메일/전화번호/주민등록번호를 자리표시자([EMAIL_1] 등)로 바꾸고
+    # 응답(patches/full_suggestion 등)에서 원래 값으로 되돌린다(app.core.pii)
+    PII_REDACTION_ENABLED: bool = True
+    # /analyze-prompt2/batch 최대 항목 수와 요청당 동시에 진행할 LLM 호출 수
+    # 요청 수 제한이 켜져 있으면 실제 상한은 min(ANALYZE_BATCH_MAX_ITEMS, RATE_LIMIT_BURST)
+    ANALYZE_BATCH_MAX_ITEMS: int = 10
+    ANALYZE_BATCH_CONCURRENCY: int = 8
+    # engine=auto 추천에서 LLM을 기다리는 시간(초). 넘으면 로컬 추천으로 응답
+    RECOMMEND_LLM_BUDGET_SECONDS: float = 3.0
+    # 프롬프트 파일 디렉터리(비우면 app/core/prompts)와 변경 확인 간격(초). 0이면 hot reload 끔
+    PROMPT_DIR: Optional[str] = None
+    PROMPT_RELOAD_INTERVAL_SECONDS: float = 2.0
+
+    # 프롬프트 분석 결과 캐시 (워커 프로세스 단위)
+    ANALYZE_CACHE_MAX_ENTRIES: int = 2048
+    ANALYZE_CACHE_TTL_SECONDS: float = 3600.0
+    # 추천 프롬프트 캐시. 히스토리가 쌓이면 무효화되므로 TTL은 길게 둔다
+    RECOMMEND_CACHE_MAX_ENTRIES: int = 10000
+    RECOMMEND_CACHE_TTL_SECONDS: float = 86400.0
+    # 추천용 최근 토픽 윈도우 크기 (room별 / 유저 전체)
+    RECENT_TOPICS_ROOM_LIMIT: int = 5
+    RECENT_TOPICS_USER_LIMIT: int = 20
+    # 유저 관심사 프로필 (감쇠 반감기, 저장 term 수 상한, 추천 시 보낼 개수)
+    INTEREST_HALF_LIFE_DAYS: float = 14.0
+    INTEREST_PROFILE_MAX_TERMS: int = 200
+    INTEREST_TOP_K: int = 15
+    # device_uuid -> user_id LRU
+    USER_ID_CACHE_MAX_ENTRIES: int = 100000
+
+    # trace_input/trace_output_prompt write-behind 버퍼
+    TRACE_BUFFER_ENABLED: bool = True
+    TRACE_BUFFER_MAX_SIZE: int = 10000
+    TRACE_BUFFER_BATCH_SIZE: int = 500
+    TRACE_BUFFER_FLUSH_MS: int = 200
+    TRACE_BUFFER_PUT_TIMEOUT_MS: int = 100
+
+    # events/histories 내보내기(/api/ops/export/{table}, python -m app.jobs.export_rows)
+    # API는 EXPORT_TOKEN이 설정돼 있고 요청 헤더 X-Export-Token이 같을 때만 열린다(비우면 CLI만 사용)
+    EXPORT_TOKEN: Optional[str] = None
+    # 키셋 페이지 크기(= 읽기 트랜잭션 하나에서 읽는 행 수)와 yield_per fetch 크기
+    EXPORT_PAGE_ROWS: int = 5000
+    EXPORT_FETCH_ROWS: int = 1000
+    # API 응답 하나에 담는 행 수 기본값/상한. 남은 행이 있으면 X-Export-Next-Cursor로 이어 받는다
+    EXPORT_CHUNK_ROWS: int = 100000
+    EXPORT_MAX_CHUNK_ROWS: int = 1000000
+    EXPORT_GZIP_LEVEL: int = 6
+
+    # histories 보존 기간(일). 0이면 지우지 않는다. python -m app.jobs.purge_histories(크론)가 정리
+    HISTORY_RETENTION_DAYS: int = 180
+    # 한 트랜잭션에서 지우는 행 수와 배치 사이 쉬는 시간(ms). 잠금/복제 지연을 짧게 유지
+    PURGE_BATCH_SIZE: int = 2000
+    PURGE_BATCH_SLEEP_MS: int = 50
+    # MySQL 월 파티션을 이번 달 이후 몇 달치까지 미리 만들어 둘지
+    HISTORY_PARTITION_MONTHS_AHEAD: int = 3
+
+    # 응답에 Server-Timing 헤더(단계별 ms)를 붙일지 여부 (/api 하위 라우트)
+    SERVER_TIMING_ENABLED: bool = True
+    # 느린 요청 샘플링 프로파일러. ENABLED가 꺼져 있으면 헤더/샘플링 모두 무시
+    PROFILER_ENABLED: bool = False
+    PROFILER_ALLOW_HEADER: bool = True
+    PROFILER_HEADER: str = "X-Profile"
+    PROFILER_SAMPLE_RATE: float = 0.0
+    # 이 시간(ms) 이상 걸린 요청만 파일로 남긴다
+    PROFILER_THRESHOLD_MS: int = 1000
+    PROFILER_INTERVAL_MS: int = 5
+    PROFILER_OUTPUT_DIR: str = "profiles"
+
     # .env 로딩 이후의 파생값들 -> computed_field로 안전하게
     @computed_field(return_type=str)
     @property
     def SQLALCHEMY_DATABASE_URL(self) -> str:
         return self.DATABASE_URL
 
+    @computed_field(return_type=str)
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URL(self) -> str:
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        scheme, sep, rest = self.DATABASE_URL.partition("://")
+        dialect = scheme.split("+", 1)[0]
+        async_driver = {"mysql": "aiomysql", "sqlite": "aiosqlite"}.get(dialect)
+        if async_driver is None:
+            return self.DATABASE_URL
+        return f"{dialect}+{async_driver}{sep}{rest}"
+
     @computed_field(return_type=timedelta)
     @property
     def access_expires(self) -> timedelta:
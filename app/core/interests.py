@@ -0,0 +1,113 @@
+import re
+from datetime import datetime
+from typing import Iterable
+
+from app.core.config import settings
+
+# 한글 덩어리 / 영문·숫자 식별자(c++, node.js, gpt-4o 등) 단위로 자른다
+TOKEN_RE = re.compile(r"[가-힣]+|[a-z][a-z0-9+#.\-]*[a-z0-9+#]|[a-z]")
+
+# 한국어 조사/어미 - 긴 것부터 떼어 낸다
+KO_SUFFIXES = sorted([
+    "에서는", "에게서", "으로는", "이라는", "에서", "에게", "으로", "라는", "이란", "까지", "부터", "처럼",
+    "해줘", "해주세요", "알려줘", "입니다", "습니다", "해요", "하는", "해", "은", "는", "이", "가", "을", "를", "에", "의", "로", "과", "와", "도", "만", "란",
+], key=len, reverse=True)
+
+STOPWORDS = {
+    # ko
+    "설명", "설명해줘", "알려줘", "해줘", "어떻게", "무엇", "뭐야", "뭐", "왜", "좀", "그리고", "그냥", "대해", "대한",
+    "관련", "방법", "하는", "있는", "없는", "같은", "정말", "진짜", "너무", "자세히", "자세하게", "예시", "내가", "나는",
+    "이거", "그거", "저거", "어떤", "싶어", "궁금해", "가능", "부탁", "쓰는", "사용", "사용법", "차이", "차이점",
+    # en
+    "the", "a", "an", "to", "of", "in", "on", "for", "and", "or", "is", "are", "be", "how", "what", "why", "can",
+    "you", "me", "my", "i", "it", "this", "that", "with", "about", "please", "explain", "tell", "do", "does",
+}
+
+# 유저 질문이 AI 답변보다 관심사를 더 잘 드러낸다
+ROLE_WEIGHTS = {"user": 1.0, "ai": 0.5}
+BIGRAM_WEIGHT = 1.5
+MIN_WEIGHT = 0.01
+
+
+def _strip_suffix(token: str) -> str:
+    for suffix in KO_SUFFIXES:
+        if len(token) > len(suffix) + 1 and token.endswith(suffix):
+            return token[: -len(suffix)]
+    return token
+
+
+def extract_terms(text: str) -> dict[str, float]:
+    """토픽 한 건에서 관심사 후보(단어 + 인접 단어 bigram)와 가중치를 뽑는다."""
+    tokens = []
+    for raw in TOKEN_RE.findall(text.lower()):
+        token = _strip_suffix(raw)
+        # 영문 뒤에 붙은 조사("fastapi에서")는 따로 잘려 나오므로 조사 단독 토큰도 버린다
+        if len(token) < 2 or token in STOPWORDS or token in KO_SUFFIXES:
+            tokens.append(None)  # bigram 경계
+        else:
+            tokens.append(token)
+
+    terms: dict[str, float] = {}
+    for i, token in enumerate(tokens):
+        if token is None:
+            continue
+        terms[token] = terms.get(token, 0.0) + 1.0
+        if i + 1 < len(tokens) and tokens[i + 1] is not None:
+            bigram = f"{token} {tokens[i + 1]}"
+            terms[bigram] = terms.get(bigram, 0.0) + BIGRAM_WEIGHT
+    return terms
+
+
+def decay_factor(since: datetime, now: datetime) -> float:
+    elapsed_days = max((now - since).total_seconds(), 0.0) / 86400
+    return 0.5 ** (elapsed_days / settings.INTEREST_HALF_LIFE_DAYS)
+
+
+def update_profile(
+    weights: dict[str, float],
+    last_updated: datetime | None,
+    topics: Iterable[tuple[str, str]],
+    now: datetime,
+) -> dict[str, float]:
+    """기존 가중치를 경과 시간만큼 감쇠시킨 뒤 새 토픽들의 term을 더한다.
+
+    topics: (role, topic) 목록. 결과는 INTEREST_PROFILE_MAX_TERMS개로 잘린다.
+    """
+    factor = decay_factor(last_updated, now) if last_updated else 1.0
+    updated = {term: w * factor for term, w in weights.items()}
+    for role, topic in topics:
+        role_weight = ROLE_WEIGHTS.get(role, 1.0)
+        for term, w in extract_terms(topic).items():
+            updated[term] = updated.get(term, 0.0) + w * role_weight
+
+    ranked = sorted(
+        ((term, w) for term, w in updated.items() if w >= MIN_WEIGHT),
+        key=lambda kv: kv[1],
+        reverse=True,
+    )
+    return {term: round(w, 4) for term, w in ranked[: settings.INTEREST_PROFILE_MAX_TERMS]}
+
+
+def top_interests(weights: dict[str, float], k: int | None = None) -> list[str]:
+    # 모든 term이 같은 비율로 감쇠하므로 순위는 저장된 가중치 그대로 정하면 된다
+    k = k or settings.INTEREST_TOP_K
+    ranked = sorted(weights.items(), key=lambda kv: kv[1], reverse=True)
+    picked: list[str] = []
+    for term, _ in ranked:
+        # bigram에 이미 포함된 단어는 건너뛰어 토큰을 아낀다
+        if any(term in p.split(" ") for p in picked if " " in p):
+            continue
+        picked.append(term)
+        if len(picked) >= k:
+            break
+    return picked
+
+
+def interests_from_topics(topics: list[str], k: int | None = None) -> list[str]:
+    """프로필이 없을 때(또는 room 단위) 최근 토픽만으로 관심사를 뽑는다. 앞쪽(최신)일수록 가중치가 높다."""
+    weights: dict[str, float] = {}
+    for rank, topic in enumerate(topics):
+        recency = 1.0 / (1.0 + rank)
+        for term, w in extract_terms(topic).items():
+            weights[term] = weights.get(term, 0.0) + w * recency
+    return top_interests(weights, k)
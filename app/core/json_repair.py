@@ -0,0 +1,326 @@
+import json
+import re
+from typing import Any
+
+from app.core.metrics import current_stage_time, json_repairs, json_repair_fixes, json_repair_saved, current_endpoint
+
+# LLM이 내놓는 "거의 JSON"을 한 번의 스캔으로 고치는 로컬 복구기.
+# 재요청(두 번째 completion) 전에 먼저 시도해서 왕복 한 번을 아낀다. 처리하는 경우:
+# - 코드펜스/앞뒤 설명 문장, 스마트 따옴표(“ ” ‘ ’)·작은따옴표 문자열
+# - 빠진/남는(trailing) 쉼표, 따옴표 없는 키와 값, 문자열 안의 이스케이프 안 된 따옴표
+# - 잘린 꼬리: 끝나지 않은 멤버는 버리고 열린 괄호를 닫는다(배열 안의 미완성 객체는 통째로 버림)
+
+# 여는 따옴표 -> 닫을 수 있는 따옴표. 같은 계열로만 닫는다: "..." 값 안의 “핵심” 같은 인용은 내용으로 남긴다
+OPEN_QUOTES = {'"': '"', "“": "”", "”": "”", "'": "'", "‘": "’"}
+QUOTE_CHARS = "\"“”'‘’"
+ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+LITERALS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+NUMBER_RE = re.compile(r"-?\d+(\.\d+)?([eE][+-]?\d+)?")
+FENCE_RE = re.compile(r"```[A-Za-z]*\s*\n?(.*?)(```|$)", re.S)
+
+
+class _Frame:
+    __slots__ = ("kind", "expect", "safe", "pending_comma")
+
+    def __init__(self, kind: str, safe: int):
+        self.kind = kind  # "{" 또는 "["
+        # 객체: key -> colon -> value -> after, 배열: value -> after
+        self.expect = "key" if kind == "{" else "value"
+        # 마지막으로 완성된 멤버 직후의 출력 길이(잘린 꼬리를 버릴 때 여기까지 되돌린다)
+        self.safe = safe
+        self.pending_comma = False
+
+
+class _Repairer:
+    def __init__(self, text: str):
+        self.text = text
+        self.n = len(text)
+        self.out: list[str] = []
+        self.size = 0
+        self.stack: list[_Frame] = []
+        self.fixes: set[str] = set()
+        self.done = False
+
+    def emit(self, s: str) -> None:
+        self.out.append(s)
+        self.size += len(s)
+
+    def cut(self, size: int) -> None:
+        joined = "".join(self.out)[:size]
+        self.out = [joined]
+        self.size = len(joined)
+
+    def next_char(self, j: int, skip: str = "") -> str:
+        while j < self.n and (self.text[j].isspace() or self.text[j] in skip):
+            j += 1
+        return self.text[j] if j < self.n else ""
+
+    def read_string(self, i: int) -> tuple[str, int, bool]:
+        """i의 여는 따옴표부터 문자열을 읽는다. (내용, 다음 위치, 닫혔는지)"""
+        opener = self.text[i]
+        closers = OPEN_QUOTES[opener]
+        if opener != '"':
+            self.fixes.add("smart_quote" if opener in "“”‘" else "single_quote")
+        buf = []
+        j = i + 1
+        while j < self.n:
+            ch = self.text[j]
+            if ch == "\\" and j + 1 < self.n:
+                esc = self.text[j + 1]
+                if esc == "u" and j + 6 <= self.n:
+                    try:
+                        buf.append(chr(int(self.text[j + 2:j + 6], 16)))
+                        j += 6
+                        continue
+                    except ValueError:
+                        pass
+                buf.append(ESCAPES.get(esc, esc))
+                j += 2
+                continue
+            if ch in closers:
+                # 뒤에 구분자/괄호/다른 문자열이 오면 닫는 따옴표, 아니면 내용 속 따옴표
+                # (닫는 따옴표 뒤에 붙은 "." ";" 같은 잡문자는 건너뛰고 본다)
+                nxt = self.next_char(j + 1, ".;")
+                if nxt == "" or nxt in ",:}]" or nxt in QUOTE_CHARS:
+                    if ch in "“”’":
+                        self.fixes.add("smart_quote")
+                    return "".join(buf), j + 1, True
+                if ch in "\"'":
+                    self.fixes.add("unescaped_quote")
+            buf.append(ch)
+            j += 1
+        return "".join(buf), j, False
+
+    def read_bare(self, i: int, stops: str) -> tuple[str, int]:
+        j = i
+        while j < self.n and self.text[j] not in stops:
+            j += 1
+        return self.text[i:j], j
+
+    def begin_member(self, frame: _Frame) -> None:
+        if frame.expect == "after":
+            # 값 뒤에 바로 다음 값/키가 오면 쉼표가 빠진 것
+            self.fixes.add("missing_comma")
+            frame.pending_comma = True
+            frame.expect = "key" if frame.kind == "{" else "value"
+        if frame.pending_comma:
+            self.emit(",")
+            frame.pending_comma = False
+
+    def complete_value(self, frame: _Frame) -> None:
+        frame.expect = "after"
+        frame.safe = self.size
+
+    def put_value(self, frame: _Frame, value_json: str) -> None:
+        if frame.kind == "{" and frame.expect == "colon":
+            self.fixes.add("missing_colon")
+            self.emit(":")
+            frame.expect = "value"
+        self.begin_member(frame)
+        self.emit(value_json)
+        self.complete_value(frame)
+
+    def close(self, closer: str) -> None:
+        frame = self.stack[-1]
+        if frame.kind == "{" and frame.expect in ("colon", "value"):
+            # 값 없이 끝난 키는 버린다
+            self.fixes.add("dangling_key")
+            self.cut(frame.safe)
+        if frame.pending_comma:
+            self.fixes.add("trailing_comma")
+        self.emit(closer)
+        self.stack.pop()
+        if self.stack:
+            self.complete_value(self.stack[-1])
+        else:
+            self.done = True
+
+    def start(self) -> int:
+        text = self.text
+        fence = FENCE_RE.search(text)
+        if fence and fence.group(1).lstrip()[:1] in ("{", "["):
+            self.fixes.add("fence")
+            self.text = text = fence.group(1)
+            self.n = len(text)
+        starts = [p for p in (text.find("{"), text.find("[")) if p >= 0]
+        if not starts:
+            raise ValueError("JSON 시작 괄호가 없습니다.")
+        i = min(starts)
+        if text[:i].strip():
+            self.fixes.add("prefix_text")
+        return i
+
+    def run(self) -> str:
+        i = self.start()
+        text = self.text
+        while i < self.n and not self.done:
+            c = text[i]
+            if c.isspace():
+                i += 1
+                continue
+            if not self.stack:
+                self.stack.append(_Frame(c, 1))
+                self.emit(c)
+                i += 1
+                continue
+            frame = self.stack[-1]
+
+            if c in "}]":
+                want = "{" if c == "}" else "["
+                if frame.kind != want:
+                    if not any(f.kind == want for f in self.stack):
+                        self.fixes.add("junk")
+                        i += 1
+                        continue
+                    # 안쪽 괄호를 닫지 않고 바깥을 닫은 경우: 안쪽부터 닫아 준다
+                    self.fixes.add("unclosed_bracket")
+                    while self.stack[-1].kind != want:
+                        self.close("}" if self.stack[-1].kind == "{" else "]")
+                self.close(c)
+                i += 1
+            elif c == ",":
+                if frame.expect == "after":
+                    frame.expect = "key" if frame.kind == "{" else "value"
+                    frame.pending_comma = True
+                else:
+                    self.fixes.add("junk")
+                i += 1
+            elif c == ":":
+                if frame.kind == "{" and frame.expect == "colon":
+                    self.emit(":")
+                    frame.expect = "value"
+                else:
+                    self.fixes.add("junk")
+                i += 1
+            elif c in QUOTE_CHARS:
+                content, i, closed = self.read_string(i)
+                if not closed:
+                    break  # 잘린 꼬리
+                if frame.kind == "{" and frame.expect in ("key", "after"):
+                    self.begin_member(frame)
+                    self.emit(json.dumps(content, ensure_ascii=False))
+                    frame.expect = "colon"
+                else:
+                    self.put_value(frame, json.dumps(content, ensure_ascii=False))
+            elif c in "{[":
+                if frame.kind == "{" and frame.expect in ("key", "after"):
+                    self.fixes.add("junk")
+                    i += 1
+                    continue
+                if frame.kind == "{" and frame.expect == "colon":
+                    self.fixes.add("missing_colon")
+                    self.emit(":")
+                self.begin_member(frame)
+                self.emit(c)
+                self.stack.append(_Frame(c, self.size))
+                i += 1
+            else:
+                i = self.bare(frame, i)
+
+        if not self.done:
+            self.finish()
+        elif text[i:].strip():
+            self.fixes.add("trailing_text")
+        return "".join(self.out)
+
+    def bare(self, frame: _Frame, i: int) -> int:
+        if frame.kind == "{" and frame.expect in ("key", "after"):
+            word, j = self.read_bare(i, ":,{}[]\n" + QUOTE_CHARS)
+            if j < self.n and self.text[j] == ":" and word.strip():
+                self.fixes.add("unquoted_key")
+                self.begin_member(frame)
+                self.emit(json.dumps(word.strip(), ensure_ascii=False))
+                frame.expect = "colon"
+            else:
+                self.fixes.add("junk")
+            return max(j, i + 1)
+
+        if frame.expect == "after":
+            # 값 뒤의 "." 같은 잡문자
+            word, j = self.read_bare(i, ",}]\n" + QUOTE_CHARS)
+            self.fixes.add("junk")
+            return max(j, i + 1)
+
+        word, j = self.read_bare(i, ",}]\n")
+        if j >= self.n:
+            return j  # 잘린 꼬리의 미완성 값
+        word = word.strip().strip(QUOTE_CHARS).strip()
+        parts = word.split()
+        if len(parts) > 1 and frame.kind == "[" and all(self.scalar(p) for p in parts):
+            # [1 2 3] 처럼 쉼표 없이 나열된 숫자/리터럴
+            self.fixes.add("missing_comma")
+            for part in parts:
+                self.put_value(frame, self.scalar(part))
+                frame.expect = "value"
+                frame.pending_comma = True
+            frame.expect = "after"
+            frame.pending_comma = False
+            return j
+        value = self.scalar(word)
+        if value is None:
+            self.fixes.add("bare_value")
+            value = json.dumps(word, ensure_ascii=False)
+        self.put_value(frame, value)
+        return j
+
+    def scalar(self, word: str):
+        if word in LITERALS:
+            if word not in ("true", "false", "null"):
+                self.fixes.add("python_literal")
+            return json.dumps(LITERALS[word])
+        if NUMBER_RE.fullmatch(word):
+            return word
+        return None
+
+    def finish(self) -> None:
+        if not self.stack:
+            raise ValueError("JSON 본문이 없습니다.")
+        self.fixes.add("truncated")
+        while self.stack:
+            frame = self.stack[-1]
+            parent = self.stack[-2] if len(self.stack) > 1 else None
+            if frame.kind == "{" and parent is not None and parent.kind == "[":
+                # 배열 안의 미완성 객체(패치 등)는 통째로 버린다
+                self.stack.pop()
+                self.cut(parent.safe)
+                parent.expect = "after"
+                parent.pending_comma = False
+                continue
+            self.cut(frame.safe)
+            frame.expect = "after"
+            frame.pending_comma = False
+            self.close("}" if frame.kind == "{" else "]")
+
+
+def repair_json(text: str) -> tuple[Any, list[str]]:
+    """깨진 JSON 텍스트를 고쳐서 (값, 적용한 수정 목록)을 돌려준다. 고칠 수 없으면 ValueError."""
+    repairer = _Repairer(text)
+    fixed = repairer.run()
+    return json.loads(fixed), sorted(repairer.fixes)
+
+
+def parse_llm_json(raw: str, usage=None) -> Any:
+    """LLM 응답 JSON 파싱: json.loads -> 실패하면 로컬 복구. 결과(clean/repaired/failed)를 지표로 남긴다.
+
+    복구에 성공하면 재요청 한 번을 아낀 것으로 보고, 이번 요청의 LLM 대기 시간과
+    usage.total_tokens를 절약분으로 집계한다.
+    """
+    endpoint = current_endpoint()
+    try:
+        value = json.loads(raw)
+        json_repairs.inc(endpoint, "clean")
+        return value
+    except (TypeError, ValueError):
+        pass
+    try:
+        value, fixes = repair_json(raw or "")
+    except ValueError:
+        json_repairs.inc(endpoint, "failed")
+        raise
+    json_repairs.inc(endpoint, "repaired")
+    for fix in fixes:
+        json_repair_fixes.inc(fix)
+    json_repair_saved.inc(endpoint, "seconds", amount=current_stage_time("llm"))
+    if usage is not None:
+        json_repair_saved.inc(endpoint, "tokens", amount=usage.total_tokens or 0)
+    return value
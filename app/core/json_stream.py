@@ -0,0 +1,38 @@
+from typing import Any
+
+import jiter
+
+
+class IncrementalJSON:
+    """스트리밍으로 도착하는 JSON 텍스트를 누적하면서 부분 파싱한다.
+
+    jiter의 partial_mode="on"은 닫히지 않은 마지막 문자열을 버리므로,
+    파싱 결과에 들어 있는 문자열 값은 모두 완결된 값이다.
+    """
+
+    def __init__(self):
+        self._chunks: list[str] = []
+        self._start = -1
+        self.value: Any = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> bool:
+        """청크를 추가하고, 파싱 결과가 바뀌었을 수 있으면 True를 돌려준다."""
+        self._chunks.append(chunk)
+        # 문자열/객체가 닫히는 시점에만 다시 파싱(그 외 청크로는 결과가 바뀌지 않음)
+        if '"' not in chunk and "}" not in chunk and "]" not in chunk:
+            return False
+        text = self.text
+        if self._start < 0:
+            # 코드펜스 등 JSON 앞에 붙은 텍스트는 건너뜀
+            self._start = text.find("{")
+            if self._start < 0:
+                return False
+        try:
+            self.value = jiter.from_json(text[self._start:].encode("utf-8"), partial_mode="on")
+        except ValueError:
+            return False
+        return True
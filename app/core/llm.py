@@ -0,0 +1,173 @@
+import asyncio
+import time
+from typing import AsyncIterator, Optional
+
+import httpx
+from fastapi import HTTPException
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from app.core.admission import PriorityGate
+from app.core.cache import fingerprint
+from app.core.config import settings
+from app.core.metrics import add_stage_time, current_endpoint, record_llm_error, record_usage, stage_timer
+from app.core.prompts.registry import PromptPrefix
+from app.core.resilience import CircuitBreaker, LatencyWindow, hedged
+from app.core.singleflight import SingleFlight
+
+
+class LLMClient:
+    """워커 프로세스당 하나만 만들어 공유하는 비동기 OpenAI 클라이언트.
+
+    keep-alive 커넥션 풀을 재사용하고, 동시에 진행되는 completion 수를
+    세마포어로 제한한다. 호출에는 엔드포인트별 기한, p95 기반 hedged request,
+    서킷 브레이커가 걸린다. 라우터에서는 Depends(get_llm_client)로 주입받는다.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        if http_client is None:
+            http_client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT),
+            )
+        self._client = AsyncOpenAI(
+            api_key=api_key or settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            http_client=http_client,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+        )
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        # 동시 호출 예산. 자리가 없으면 등급 우선순위 대기열, GENERAL은 SLO 초과 예상 시 503
+        self.gate = PriorityGate(
+            self.max_concurrency,
+            slo=settings.ADMISSION_QUEUE_SLO_SECONDS,
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+        )
+        self.in_flight = 0
+        self.singleflight = SingleFlight()
+        self.breaker = CircuitBreaker(
+            settings.CIRCUIT_ERROR_THRESHOLD,
+            settings.CIRCUIT_MIN_CALLS,
+            settings.CIRCUIT_WINDOW_SECONDS,
+            settings.CIRCUIT_OPEN_SECONDS,
+        )
+        # 엔드포인트 -> 최근 첫 요청 지연(hedge 지연 계산용)
+        self.latency: dict[str, LatencyWindow] = {}
+
+    async def chat(self, *, timeout: Optional[float] = None, coalesce: Optional[str] = None,
+                   prompt: Optional[PromptPrefix] = None, **kwargs):
+        """chat.completions.create를 동시성 제한과 호출별 타임아웃 아래에서 실행한다.
+
+        coalesce에 엔드포인트 이름을 주면 (엔드포인트, messages, 파라미터)가 같은 동시 호출을
+        업스트림 호출 하나로 묶는다. 이때 돌려받는 응답 객체는 호출자끼리 공유된다.
+        prompt에 messages를 만든 PromptPrefix를 주면 토큰 사용량을 프롬프트 버전별로도 집계한다.
+        """
+        label = (prompt.name, prompt.version) if prompt is not None else None
+        with stage_timer("llm"):
+            if coalesce is not None:
+                key = fingerprint({"endpoint": coalesce, "request": kwargs})
+                return await self.singleflight.do(key, lambda: self._chat(timeout, kwargs, label), label=coalesce)
+            return await self._chat(timeout, kwargs, label)
+
+    async def _chat(self, timeout: Optional[float], kwargs: dict, label: Optional[tuple[str, str]] = None):
+        timeout = timeout if timeout is not None else settings.OPENAI_TIMEOUT
+        endpoint = current_endpoint()
+        window = self.latency.setdefault(
+            endpoint, LatencyWindow(settings.LLM_LATENCY_WINDOW, settings.LLM_HEDGE_MIN_SAMPLES))
+
+        async def attempt(n: int):
+            started = time.perf_counter()
+            self.in_flight += 1
+            try:
+                return await self._client.chat.completions.create(timeout=timeout, **kwargs)
+            finally:
+                self.in_flight -= 1
+                if n == 0:
+                    # hedge에 져서 취소된 첫 요청도 "최소 이만큼 걸렸다"로 넣어 p95가 낮게 치우치지 않게 한다
+                    window.add(time.perf_counter() - started)
+
+        delay = None
+        if settings.LLM_HEDGE_ENABLED:
+            p = window.percentile(settings.LLM_HEDGE_PERCENTILE)
+            delay = None if p is None else max(p, settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+
+        try:
+            with self.breaker.guard():
+                async with self.gate.slot():
+                    resp = await asyncio.wait_for(
+                        hedged(attempt, delay, lambda: self.in_flight < self.max_concurrency, endpoint),
+                        timeout,
+                    )
+        except asyncio.TimeoutError:
+            record_llm_error("timeout")
+            raise HTTPException(status_code=504, detail="LLM 응답 시간이 초과되었습니다.")
+        # coalescing된 호출은 실제 업스트림 호출(leader) 쪽에서 한 번만 집계된다
+        record_usage(resp.usage, resp.model, label)
+        return resp
+
+    async def stream_chat(self, *, timeout: Optional[float] = None, prompt: Optional[PromptPrefix] = None,
+                          **kwargs) -> AsyncIterator[str]:
+        """스트리밍 completion의 content 조각을 순서대로 내보낸다.
+
+        호출 측에서 중간에 멈추면(break/aclose) 업스트림 연결도 함께 닫힌다.
+        """
+        timeout = timeout if timeout is not None else settings.OPENAI_TIMEOUT
+        try:
+            with self.breaker.guard():
+                async with self.gate.slot():
+                    self.in_flight += 1
+                    try:
+                        # 소비 측 처리 시간은 빼고 업스트림을 기다린 시간만 llm 단계로 잡는다
+                        started = time.perf_counter()
+                        # 스트림은 첫 응답(헤더)까지만 기한을 건다. 이후 청크 간격은 httpx read timeout
+                        stream = await asyncio.wait_for(self._client.chat.completions.create(
+                            stream=True,
+                            # 마지막 청크로 usage를 받는다(choices는 비어 있음)
+                            stream_options={"include_usage": True},
+                            timeout=timeout,
+                            **kwargs,
+                        ), timeout)
+                        async with stream:
+                            async for chunk in stream:
+                                add_stage_time("llm", time.perf_counter() - started)
+                                if chunk.usage is not None:
+                                    record_usage(chunk.usage, chunk.model,
+                                                 (prompt.name, prompt.version) if prompt is not None else None)
+                                if chunk.choices and chunk.choices[0].delta.content:
+                                    yield chunk.choices[0].delta.content
+                                started = time.perf_counter()
+                    finally:
+                        self.in_flight -= 1
+        except asyncio.TimeoutError:
+            # 서킷 브레이커에는 실패로 남긴 뒤(guard 안) 504로 바꾼다
+            record_llm_error("timeout")
+            raise HTTPException(status_code=504, detail="LLM 응답 시간이 초과되었습니다.")
+
+    async def aclose(self) -> None:
+        await self._client.close()
+
+
+_llm_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = LLMClient()
+    return _llm_client
+
+
+async def close_llm_client() -> None:
+    global _llm_client
+    if _llm_client is not None:
+        await _llm_client.aclose()
+        _llm_client = None
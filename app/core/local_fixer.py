@@ -0,0 +1,139 @@
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.aho_corasick import AhoCorasick
+from app.core.config import settings
+from app.core.interests import extract_terms
+from app.core.prompts.prompt_loader import load_prompt
+
+# LLM 없이 처리하는 분석 빠른 경로.
+# 흔한 오타/띄어쓰기/표기(도커 -> Docker 등) 사전을 Aho-Corasick 오토마톤 하나로 만들어 두고,
+# 원문을 한 번 훑어 왼→오, 비중첩 패치를 만든다(outputPrompt 교차 검증을 그대로 통과하는 형태).
+# 요청이 이미 구체적이라 오타/띄어쓰기/표기 수정만 필요할 때 응답한다: 핵심 단어가 LOCAL_FIX_MIN_TERMS개 이상이고
+# 모호한 표현(vague)이나 열린 질문(open_questions)이 없어야 한다.
+# 아니면 이유와 함께 None을 돌려 LLM으로 넘긴다(요청을 구체화하는 패치는 LLM만 만들 수 있다).
+
+DICTIONARY_FILE = "local_fix_dictionary.json"
+# 사전 섹션 -> 패치 태그
+SECTION_TAGS = {"typos": "오타/맞춤법", "spacing": "오타/맞춤법", "terms": "문체/스타일 개선", "ambiguous": ""}
+TOPIC_MAX_CHARS = 30
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+def _is_hangul(ch: str) -> bool:
+    return "가" <= ch <= "힣"
+
+
+@dataclass(frozen=True, slots=True)
+class _Entry:
+    to: str
+    section: str
+    # 영문: 앞뒤가 영숫자가 아니어야 함 / 한글 용어: 앞이 한글이 아니어야 함 / 오타·띄어쓰기: 제한 없음
+    boundary: str
+
+
+class LocalFixer:
+    def __init__(self, dictionary: dict):
+        entries: dict[str, _Entry] = {}
+        for section in SECTION_TAGS:
+            for item in dictionary.get(section, []):
+                key = item["from"].lower()
+                if key.isascii():
+                    boundary = "word"
+                elif section == "terms":
+                    boundary = "left"
+                else:
+                    boundary = ""
+                entries[key] = _Entry(item["to"], section, boundary)
+        # 띄어쓰기와 오타가 겹치는 경우("추천 해줬스면")는 겹친 글자로 이어 붙인 항목을 하나 더 만든다(최장 일치가 고른다)
+        for space in dictionary.get("spacing", []):
+            for typo in dictionary.get("typos", []):
+                overlap = next((n for n in range(len(typo["from"]) - 1, 0, -1)
+                                if space["from"].endswith(typo["from"][:n]) and space["to"].endswith(typo["from"][:n])), 0)
+                if overlap and typo["to"].startswith(typo["from"][:overlap]):
+                    key = (space["from"] + typo["from"][overlap:]).lower()
+                    entries.setdefault(key, _Entry(space["to"] + typo["to"][overlap:], "typos", ""))
+        self.automaton = AhoCorasick(entries)
+        self.entries = [entries[p] for p in self.automaton.patterns]
+        self.vague = AhoCorasick(v.lower() for v in dictionary.get("vague", []))
+        self.questions = AhoCorasick(q.lower() for q in dictionary.get("open_questions", []))
+
+    @classmethod
+    def from_file(cls, name: str = DICTIONARY_FILE) -> "LocalFixer":
+        return cls(json.loads(load_prompt(name)))
+
+    def _accept(self, text: str, start: int, pid: int) -> bool:
+        entry = self.entries[pid]
+        if not entry.boundary:
+            return True
+        end = start + len(self.automaton.patterns[pid])
+        before = text[start - 1] if start else ""
+        if entry.boundary == "left":
+            return not (before and _is_hangul(before))
+        after = text[end] if end < len(text) else ""
+        return not (before and _is_word_char(before)) and not (after and _is_word_char(after))
+
+    def _has_question(self, haystack: str) -> bool:
+        # 영문 표현은 단어 단위로만("how"가 "show"에 걸리지 않도록)
+        def accept(start: int, pid: int) -> bool:
+            phrase = self.questions.patterns[pid]
+            if not phrase.isascii() or not phrase[0].isalnum():
+                return True
+            end = start + len(phrase)
+            before = haystack[start - 1] if start else ""
+            after = haystack[end] if end < len(haystack) else ""
+            return not (before and _is_word_char(before)) and not (after and _is_word_char(after))
+
+        return any(accept(start, pid) for start, pid in self.questions.iter(haystack))
+
+    def analyze(self, original: str) -> tuple[Optional[dict], str]:
+        """(outputPrompt 형태의 결과 또는 None, 판정 사유). 사유는 hit 또는 LLM으로 넘긴 이유."""
+        if len(original) > settings.LOCAL_FIX_MAX_CHARS:
+            return None, "too_long"
+        # 영문 대소문자를 무시하고 찾는다(소문자화로 길이가 바뀌는 문자가 있으면 원문 그대로)
+        lowered = original.lower()
+        haystack = lowered if len(lowered) == len(original) else original
+        if any(True for _ in self.vague.iter(haystack)):
+            return None, "vague"
+        if self._has_question(haystack):
+            return None, "open_question"
+        # "도커 설명해줘"처럼 대상만 있고 조건이 없는 요청은 LLM이 구체화해야 한다
+        terms = extract_terms(original)
+        if sum(1 for t in terms if " " not in t) < settings.LOCAL_FIX_MIN_TERMS:
+            return None, "underspecified"
+
+        matches = self.automaton.find_leftmost_longest(haystack, lambda s, pid: self._accept(haystack, s, pid))
+        patches = []
+        search_from = 0
+        for start, pid in matches:
+            entry = self.entries[pid]
+            if entry.section == "ambiguous":
+                return None, "ambiguous"
+            frag = original[start:start + len(self.automaton.patterns[pid])]
+            # 경계 조건 때문에 버린 같은 문자열이 앞에 있으면 서버의 패치 적용 위치가 달라지므로 뺀다
+            if frag == entry.to or original.find(frag, search_from) != start:
+                continue
+            patches.append({"tag": SECTION_TAGS[entry.section], "from": frag, "to": entry.to})
+            search_from = start + len(frag)
+        if not patches:
+            return None, "no_match"
+        if len(patches) > 30:
+            return None, "too_many"
+        return {"topic": self._topic(original, terms, patches), "patches": patches}, "hit"
+
+    def _topic(self, original: str, terms: dict[str, float], patches: list[dict]) -> str:
+        # 표기를 고친 용어(Docker 등)가 있으면 그것, 없으면 원문의 첫 핵심 단어
+        for patch in patches:
+            if patch["tag"] == SECTION_TAGS["terms"]:
+                return patch["to"][:TOPIC_MAX_CHARS]
+        unigrams = [t for t in terms if " " not in t]
+        if unigrams:
+            return max(unigrams, key=lambda t: terms[t])[:TOPIC_MAX_CHARS]
+        return original.strip()[:TOPIC_MAX_CHARS]
+
+
+local_fixer = LocalFixer.from_file()
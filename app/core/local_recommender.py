@@ -0,0 +1,103 @@
+import json
+from typing import Optional
+
+import numpy as np
+
+from app.core.interests import extract_terms
+from app.core.prompts.prompt_loader import load_prompt
+from app.schemas.gpt import RecommendedPrompt
+
+# LLM 없이 추천을 만드는 로컬 엔진.
+# 템플릿 라이브러리(recommend_templates.json)를 TF-IDF 행렬로 만들어 두고,
+# 유저 최근 토픽/관심사 벡터와의 코사인 유사도 상위 템플릿을 돌려준다.
+# 행렬은 기동 시 한 번만 만들고 요청마다는 행렬-벡터 곱 한 번이라 수 ms 안에 끝난다.
+
+TEMPLATE_FILE = "recommend_templates.json"
+GENERIC = "generic"
+# 관심사 순위 가중치: 앞쪽 관심사가 더 중요
+INTEREST_WEIGHT = 2.0
+
+
+class LocalRecommender:
+    def __init__(self, templates: list[dict]):
+        self.templates = templates
+        self.items = [
+            RecommendedPrompt(id=t["id"], title=t["title"], content=t["content"]).model_dump(mode="json")
+            for t in templates
+        ]
+        self.categories = [t.get("category", GENERIC) for t in templates]
+        self.generic = [i for i, c in enumerate(self.categories) if c == GENERIC]
+
+        docs = []
+        for t in templates:
+            terms: dict[str, float] = {}
+            # 키워드는 제목/본문보다 강한 신호
+            for text, weight in ((" ".join(t.get("keywords", [])), 2.0), (t["title"], 1.0), (t["content"], 0.5)):
+                for term, w in extract_terms(text).items():
+                    terms[term] = terms.get(term, 0.0) + w * weight
+            for kw in t.get("keywords", []):
+                # 띄어쓰기가 있는 키워드("이벤트 루프")는 통째로도 넣는다
+                terms[kw.lower()] = terms.get(kw.lower(), 0.0) + 2.0
+            docs.append(terms)
+
+        self.vocab = {term: i for i, term in enumerate(sorted({t for d in docs for t in d}))}
+        tf = np.zeros((len(docs), len(self.vocab)), dtype=np.float32)
+        for row, terms in enumerate(docs):
+            for term, w in terms.items():
+                tf[row, self.vocab[term]] = w
+        df = np.count_nonzero(tf, axis=0)
+        self.idf = (np.log((1 + len(docs)) / (1 + df)) + 1).astype(np.float32)
+        matrix = tf * self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+
+    @classmethod
+    def from_file(cls, name: str = TEMPLATE_FILE) -> "LocalRecommender":
+        return cls(json.loads(load_prompt(name)))
+
+    def _query_vector(self, topics: list[str], interests: list[str]) -> np.ndarray:
+        q = np.zeros(len(self.vocab), dtype=np.float32)
+        # 최근 토픽: 앞쪽(최신)일수록 가중치가 높다
+        for rank, topic in enumerate(topics):
+            recency = 1.0 / (1.0 + rank)
+            for term, w in extract_terms(topic).items():
+                idx = self.vocab.get(term)
+                if idx is not None:
+                    q[idx] += w * recency
+        for rank, term in enumerate(interests):
+            idx = self.vocab.get(term)
+            if idx is not None:
+                q[idx] += INTEREST_WEIGHT / (1.0 + rank)
+        return q * self.idf
+
+    def scores(self, topics: list[str], interests: Optional[list[str]] = None) -> np.ndarray:
+        q = self._query_vector(topics, interests or [])
+        norm = np.linalg.norm(q)
+        if norm == 0:
+            return np.zeros(len(self.templates), dtype=np.float32)
+        return self.matrix @ (q / norm)
+
+    def recommend(self, topics: list[str], interests: Optional[list[str]] = None, k: int = 3) -> list[dict]:
+        """유사도 상위 k개 템플릿. 겹치는 단어가 없어 모자라면 범용 템플릿으로 채운다."""
+        scores = self.scores(topics, interests)
+        ranked = [int(i) for i in np.argsort(-scores, kind="stable") if scores[i] > 0]
+
+        picked: list[int] = []
+        seen_categories = set()
+        # 같은 카테고리만 3개 나오지 않도록 카테고리당 1개씩 먼저 고른다
+        for i in ranked:
+            if self.categories[i] not in seen_categories:
+                picked.append(i)
+                seen_categories.add(self.categories[i])
+            if len(picked) >= k:
+                break
+        for i in ranked + self.generic:
+            if len(picked) >= k:
+                break
+            if i not in picked:
+                picked.append(i)
+        return [self.items[i] for i in picked[:k]]
+
+
+local_recommender = LocalRecommender.from_file()
@@ -0,0 +1,321 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from sqlalchemy import event
+
+# Prometheus 텍스트 포맷(/metrics)으로 내보내는 프로세스 내 지표.
+# 외부 라이브러리 없이 카운터/히스토그램만 구현하고, 요청 단위 단계별 시간(LLM/DB/파싱)은
+# contextvar에 모아 두었다가 요청이 끝날 때 한 번에 히스토그램에 반영한다.
+# 지표는 워커 프로세스 단위이므로 멀티 워커 배포에서는 Prometheus 쪽에서 합산한다.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry: list = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def values(self) -> dict[tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_fmt(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [bucket별 개수(누적 아님)..., +Inf 개수, 합계]
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, *labels) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[i] += 1
+            row[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, list(row)) for labels, row in self._values.items()]
+        for labels, row in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), row):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _fmt(bound)
+                bucket_labels = _labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_fmt(round(row[-1], 6))}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """스크랩 시점에 콜백으로 값을 읽는 게이지."""
+
+    def __init__(self, name: str, help_: str, fn: Callable[[], float]):
+        self.name = name
+        self.help = help_
+        self.fn = fn
+        _registry.append(self)
+
+    def render(self) -> list[str]:
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {_fmt(value)}"]
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- 지표 정의 ---
+http_requests = Counter("http_requests_total", "HTTP 요청 수", ("endpoint", "method", "status"))
+request_latency = Histogram("http_request_duration_seconds", "엔드포인트 전체 처리 시간", ("endpoint",))
+stage_latency = Histogram("http_request_stage_seconds", "요청 내 단계별 누적 시간(user/local_fix/llm/parse/event/db)", ("endpoint", "stage"))
+llm_tokens = Counter("llm_tokens_total", "completion.usage 토큰 수(type=prompt/completion/cached)", ("endpoint", "model", "type"))
+llm_prompt_tokens = Counter("llm_prompt_tokens_by_version_total",
+                            "프롬프트 버전별 입력 토큰(type=prompt/cached)과 호출 수(type=calls)", ("prompt", "version", "type"))
+llm_errors = Counter("llm_response_errors_total", "LLM 응답 처리 실패(kind=parse/validation/timeout/internal)", ("endpoint", "kind"))
+admission_requests = Counter("admission_requests_total",
+                             "수용 제어 결과(kind=rate/llm, outcome=admitted/queued/limited/too_large/shed_*)", ("kind", "grade", "outcome"))
+llm_queue_wait = Histogram("llm_queue_wait_seconds", "LLM 동시 호출 슬롯 대기 시간", ("grade",))
+llm_hedges = Counter("llm_hedged_requests_total",
+                     "hedged request(outcome=sent/hedge_won/primary_won/both_failed)", ("endpoint", "outcome"))
+llm_circuit_transitions = Counter("llm_circuit_transitions_total", "서킷 브레이커 상태 전이", ("state",))
+llm_routes = Counter("llm_route_requests_total", "모델 라우터가 고른 경로(LLM을 부른 요청만)",
+                     ("endpoint", "route", "model", "task_type"))
+llm_route_latency = Histogram("llm_route_llm_seconds", "경로별 LLM 호출 시간", ("route",))
+local_fix_requests = Counter("analyze_local_fix_total",
+                             "로컬 빠른 경로 판정(outcome=hit 또는 LLM으로 넘긴 이유)", ("endpoint", "outcome"))
+pii_redactions = Counter("llm_pii_redactions_total",
+                         "LLM으로 보내기 전 자리표시자로 바꾼 PII 수(kind=email/phone/rrn)", ("endpoint", "kind"))
+export_rows = Counter("export_rows_total", "내보내기(API/CLI)로 쓴 행 수", ("table", "format"))
+recommend_fallbacks = Counter("recommend_local_fallback_total",
+                              "추천 LLM 실패/예산 초과로 로컬 추천으로 응답한 수(reason=예외 종류)", ("reason",))
+json_repairs = Counter("llm_json_parse_total", "LLM 응답 JSON 파싱 결과(outcome=clean/repaired/failed)", ("endpoint", "outcome"))
+json_repair_fixes = Counter("llm_json_repair_fixes_total", "로컬 JSON 복구에서 적용한 수정 종류", ("fix",))
+json_repair_saved = Counter("llm_json_repair_saved_total",
+                            "로컬 복구로 아낀 재요청 추정치(unit=seconds/tokens)", ("endpoint", "unit"))
+
+# user: 유저 조회/생성, event: 이벤트 저장 (db와 겹쳐서 잡힌다)
+STAGES = ("user", "local_fix", "llm", "parse", "event", "db")
+
+
+class _RequestContext:
+    __slots__ = ("scope", "stages")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.stages = dict.fromkeys(STAGES, 0.0)
+
+
+_current: ContextVar[Optional[_RequestContext]] = ContextVar("metrics_request", default=None)
+
+
+def endpoint_label(scope) -> str:
+    # 라우팅이 끝나면 scope["route"]에 매칭된 라우트가 들어온다(경로 템플릿 기준으로 집계)
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def current_endpoint() -> str:
+    ctx = _current.get()
+    return endpoint_label(ctx.scope) if ctx is not None else "background"
+
+
+def current_stage_time(stage: str) -> float:
+    ctx = _current.get()
+    return ctx.stages[stage] if ctx is not None else 0.0
+
+
+def add_stage_time(stage: str, seconds: float) -> None:
+    ctx = _current.get()
+    if ctx is not None:
+        ctx.stages[stage] += seconds
+
+
+@contextmanager
+def stage_timer(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_stage_time(stage, time.perf_counter() - started)
+
+
+def timed_stage(stage: str):
+    """async 함수 전체 실행 시간을 stage로 집계하는 데코레이터."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def server_timing(stages: dict, total: float) -> bytes:
+    parts = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in stages.items() if seconds]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+def record_usage(usage, model: str, prompt: Optional[tuple[str, str]] = None) -> None:
+    """prompt에 (prefix 이름, 버전)을 주면 버전별 캐시 토큰 비율도 집계한다."""
+    if usage is None:
+        return
+    endpoint = current_endpoint()
+    llm_tokens.inc(endpoint, model, "prompt", amount=usage.prompt_tokens or 0)
+    llm_tokens.inc(endpoint, model, "completion", amount=usage.completion_tokens or 0)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    if cached:
+        llm_tokens.inc(endpoint, model, "cached", amount=cached)
+    if prompt is not None:
+        llm_prompt_tokens.inc(*prompt, "calls")
+        llm_prompt_tokens.inc(*prompt, "prompt", amount=usage.prompt_tokens or 0)
+        llm_prompt_tokens.inc(*prompt, "cached", amount=cached or 0)
+
+
+def prompt_cache_stats() -> dict:
+    """{prefix 이름: {버전: {calls, prompt_tokens, cached_tokens, cached_ratio}}}"""
+    out: dict = {}
+    for (name, version, kind), value in llm_prompt_tokens.values().items():
+        row = out.setdefault(name, {}).setdefault(version, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0})
+        row["calls" if kind == "calls" else f"{kind}_tokens"] = int(value)
+    for versions in out.values():
+        for row in versions.values():
+            row["cached_ratio"] = round(row["cached_tokens"] / row["prompt_tokens"], 4) if row["prompt_tokens"] else 0.0
+    return out
+
+
+def local_fix_stats() -> dict:
+    """엔드포인트별 로컬 빠른 경로 hit rate와 LLM으로 넘긴 사유별 건수."""
+    out: dict[str, dict] = {}
+    for (endpoint, outcome), value in local_fix_requests.values().items():
+        out.setdefault(endpoint, {"outcomes": {}})["outcomes"][outcome] = int(value)
+    for row in out.values():
+        total = sum(row["outcomes"].values())
+        row["total"] = total
+        row["hit_rate"] = round(row["outcomes"].get("hit", 0) / total, 4) if total else 0.0
+    return out
+
+
+def record_llm_error(kind: str) -> None:
+    llm_errors.inc(current_endpoint(), kind)
+
+
+class MetricsMiddleware:
+    """요청 수/전체 시간/단계별 시간을 기록하는 순수 ASGI 미들웨어(BaseHTTPMiddleware보다 오버헤드가 작다).
+
+    server_timing_prefix로 시작하는 경로에는 응답 헤더에 Server-Timing(단계별 ms)을 붙인다.
+    헤더는 응답 시작 시점 기준이라 스트리밍 응답은 첫 바이트 전까지의 단계만 담긴다.
+    """
+
+    def __init__(self, app, skip_paths: tuple = ("/metrics",), server_timing_prefix: Optional[str] = None):
+        self.app = app
+        self.skip_paths = skip_paths
+        self.server_timing_prefix = server_timing_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        ctx = _RequestContext(scope)
+        token = _current.set(ctx)
+        status = 500
+        started = time.perf_counter()
+        timing = self.server_timing_prefix is not None and scope["path"].startswith(self.server_timing_prefix)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timing:
+                    header = server_timing(ctx.stages, time.perf_counter() - started)
+                    # 다른 origin의 프론트에서도 브라우저 개발자 도구로 볼 수 있도록 허용
+                    message["headers"] = [*message.get("headers", []),
+                                          (b"server-timing", header), (b"timing-allow-origin", b"*")]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # StreamingResponse는 본문을 다 보낸 뒤 여기로 오므로 스트림 전체 시간이 잡힌다
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            endpoint = endpoint_label(scope)
+            http_requests.inc(endpoint, scope["method"], status)
+            request_latency.observe(elapsed, endpoint)
+            for stage, seconds in ctx.stages.items():
+                if seconds:
+                    stage_latency.observe(seconds, endpoint, stage)
+
+
+def instrument_engine(sync_engine) -> None:
+    """커서 실행 시간을 현재 요청의 db 단계 시간에 더한다(async 엔진은 .sync_engine을 넘긴다)."""
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        add_stage_time("db", time.perf_counter() - conn.info["query_started"].pop())
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            add_stage_time("db", time.perf_counter() - conn.info["query_started"].pop())
@@ -0,0 +1,149 @@
+import math
+import re
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+from app.core.config import settings
+from app.core.metrics import current_endpoint, llm_route_latency, llm_routes
+from app.schemas.gpt import TaskType
+
+# 분석 요청별 모델/출력 토큰 예산 선택.
+# 입력에서 바로 뽑을 수 있는 특징(길이, 줄 수, 문자 체계, 코드/목록/제약 표현, 작업 유형)만 쓰고
+# 가중치 합(선형 점수)을 두 경계로 잘라 short/default/complex 경로를 고른다.
+# 경로별 모델/예산, 가중치, 경계는 모두 Settings에서 바꾼다(MODEL_ROUTES, MODEL_ROUTER_*).
+
+# 작업 유형 키워드(소문자 기준). 키워드 가중치 합이 가장 큰 유형, 동점이면 앞쪽 유형을 쓴다
+TASK_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "debugging": ("에러", "오류", "버그", "안 돼", "안돼", "안됨", "작동하지", "동작하지", "실패", "디버그", "고치",
+                  "traceback", "exception", "error", "bug", "fix", "stack trace", "왜 안"),
+    "coding": ("코드", "구현", "함수", "클래스", "스크립트", "프로그램", "짜줘", "리팩터", "리팩토링", "파이썬", "python",
+               "java", "javascript", "typescript", "sql", "쿼리", "api", "react", "fastapi", "django", "code",
+               "implement", "function", "refactor", "컴포넌트", "알고리즘"),
+    "planning": ("계획", "일정", "로드맵", "마일스톤", "우선순위", "전략", "플랜", "준비", "커리큘럼", "plan", "roadmap",
+                 "schedule", "여행"),
+    "data_analysis": ("데이터", "분석", "통계", "엑셀", "csv", "pandas", "그래프", "차트", "시각화", "회귀", "지표",
+                      "dataset", "analyze", "analysis"),
+    "summarization": ("요약", "정리해", "핵심만", "줄여", "summary", "summarize", "tl;dr", "회의록"),
+    "translation_localization": ("번역", "영어로", "한국어로", "일본어로", "중국어로", "translate", "현지화", "localize"),
+    "brainstorming": ("아이디어", "브레인스토밍", "추천해", "제안해", "이름 지어", "후보", "ideas", "brainstorm"),
+    "creative_writing": ("시를", "시 써", "소설", "이야기", "가사", "에세이", "편지", "카피", "슬로건", "story", "poem"),
+    "qa_fact": ("뭐야", "무엇", "누구", "언제", "어디", "차이", "설명해", "알려줘", "란?", "이란", "what is", "who",
+                "when", "why"),
+}
+# 오류 신호는 코드 키워드와 함께 나오는 경우가 대부분이라 더 무겁게 센다
+TASK_WEIGHTS = {"debugging": 2.0}
+_KEYWORD_TASK = {k: task for task, words in TASK_KEYWORDS.items() for k in words}
+# 모든 키워드를 정규식 하나로 한 번에 훑는다(긴 키워드 먼저).
+# 짧은 영문 키워드는 단어 경계로만 맞춘다("fix"가 "prefix"에, "api"가 "rapid"에 걸리지 않도록)
+_KEYWORD_RE = re.compile("|".join(
+    rf"\b{re.escape(k)}\b" if k.isascii() and len(k) <= 4 else re.escape(k)
+    for k in sorted(_KEYWORD_TASK, key=len, reverse=True)
+))
+HEAVY_TASKS = {"coding", "debugging", "data_analysis", "planning"}
+
+CODE_RE = re.compile(r"```|\bdef \w+\(|\bclass \w+|\bimport \w+|\bfunction\b|=>|\{[^{}\n]*;|Traceback|\bat \w+\.\w+\(")
+LIST_LINE_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+", re.M)
+CONSTRAINT_RE = re.compile(r"반드시|조건|형식|표로|json|단계별|최소|최대|이내|제외|포함해|must|format|at least|no more than",
+                           re.I)
+HANGUL_RE = re.compile(r"[가-힣]")
+LATIN_RE = re.compile(r"[A-Za-z]")
+
+
+def classify_task(text: str) -> TaskType:
+    scores: dict[str, float] = {}
+    for keyword in _KEYWORD_RE.findall(text.lower()):
+        task = _KEYWORD_TASK[keyword]
+        scores[task] = scores.get(task, 0.0) + TASK_WEIGHTS.get(task, 1.0)
+    best, best_score = "other", 0.0
+    for task in TASK_KEYWORDS:
+        if scores.get(task, 0.0) > best_score:
+            best, best_score = task, scores[task]
+    return best
+
+
+def extract_features(text: str) -> tuple[dict[str, float], TaskType]:
+    task = classify_task(text)
+    hangul = len(HANGUL_RE.findall(text))
+    latin = len(LATIN_RE.findall(text))
+    # 토큰 수는 UTF-8 3바이트당 1토큰 추정(환경에 따라 결과가 바뀌지 않도록 토크나이저는 쓰지 않는다)
+    tokens = (len(text.encode("utf-8")) + 2) // 3
+    features = {
+        "log_tokens": math.log2(1 + tokens),
+        "lines": min(text.count("\n"), 30) / 10,
+        "code": 1.0 if CODE_RE.search(text) else 0.0,
+        "list_items": min(len(LIST_LINE_RE.findall(text)), 10) / 5,
+        "constraints": float(min(len(CONSTRAINT_RE.findall(text)), 5)),
+        "latin_ratio": latin / (hangul + latin) if hangul + latin else 0.0,
+        "heavy_task": 1.0 if task in HEAVY_TASKS else 0.0,
+    }
+    return features, task
+
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    name: str
+    model: str
+    max_tokens: int
+    task_type: TaskType
+    score: float
+
+    def params(self) -> dict:
+        return {"model": self.model, "max_tokens": self.max_tokens}
+
+
+class ModelRouter(Protocol):
+    def route(self, text: str) -> Route: ...
+
+
+def _make_route(name: str, task: TaskType, score: float) -> Route:
+    spec = settings.MODEL_ROUTES[name]
+    return Route(name, spec["model"], int(spec["max_tokens"]), task, round(score, 3))
+
+
+class FixedRouter:
+    """항상 default 경로(라우팅 이전 동작)."""
+
+    def route(self, text: str) -> Route:
+        return _make_route("default", classify_task(text), 0.0)
+
+
+class HeuristicRouter:
+    """특징 가중치 합으로 short/default/complex 중 하나를 고른다."""
+
+    def __init__(self, weights: Optional[dict[str, float]] = None,
+                 short_below: Optional[float] = None, complex_from: Optional[float] = None):
+        self.weights = weights if weights is not None else settings.MODEL_ROUTER_WEIGHTS
+        self.short_below = short_below if short_below is not None else settings.MODEL_ROUTER_SHORT_BELOW
+        self.complex_from = complex_from if complex_from is not None else settings.MODEL_ROUTER_COMPLEX_FROM
+
+    def score(self, features: dict[str, float]) -> float:
+        return sum(self.weights.get(name, 0.0) * value for name, value in features.items())
+
+    def route(self, text: str) -> Route:
+        features, task = extract_features(text)
+        score = self.score(features)
+        if score < self.short_below:
+            name = "short"
+        elif score >= self.complex_from:
+            name = "complex"
+        else:
+            name = "default"
+        return _make_route(name, task, score)
+
+
+ROUTERS = {"fixed": FixedRouter, "heuristic": HeuristicRouter}
+
+_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    global _router
+    if _router is None:
+        _router = ROUTERS[settings.MODEL_ROUTER]()
+    return _router
+
+
+def record_route(route: Route, seconds: float) -> None:
+    """경로 선택과 그 경로의 LLM 호출 시간을 남긴다(LLM을 실제로 부른 요청만)."""
+    llm_routes.inc(current_endpoint(), route.name, route.model, route.task_type)
+    llm_route_latency.observe(seconds, route.name)
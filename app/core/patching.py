@@ -0,0 +1,51 @@
+from typing import Sequence
+
+# 프롬프트 패치 검증/적용.
+# 패치는 원문(S) 기준으로 왼→오 순서, 서로 겹치지 않게 배치되어야 하고,
+# full_suggestion은 그 위치에 to를 끼워 넣은 결과로 서버에서 만든다(LLM에게 출력시키지 않음).
+
+
+def _locate_error(original: str, frag: str, i: int) -> str:
+    # 실패했을 때만 원문 전체를 다시 훑어 어떤 규칙 위반인지 구분한다
+    if frag not in original:
+        return f'patches[{i}].from("{frag}")가 원문에 존재하지 않습니다.'
+    return f'순서/비중첩 위반: "{frag}"를 이전 패치 이후 위치에서 비중첩으로 배치할 수 없습니다.'
+
+
+def locate_patch(original: str, frag: str, search_from: int, i: int) -> int:
+    """patches[i].from이 원문의 search_from 이후에 처음 나타나는 위치를 돌려준다.
+
+    스트리밍 응답에서도 패치가 도착할 때마다 같은 규칙으로 검사할 수 있도록 분리해 둔다.
+    """
+    idx = original.find(frag, search_from)
+    if idx == -1:
+        raise ValueError(_locate_error(original, frag, i))
+    return idx
+
+
+def locate_patches(original: str, frags: Sequence[str]) -> list[int]:
+    """모든 from의 원문 내 시작 위치. 탐색 시작점이 이전 매칭 끝으로만 전진하므로
+    성공 경로에서는 원문을 왼→오로 한 번만 훑는다(순서/비중첩 검사 포함)."""
+    positions = []
+    search_from = 0
+    for i, frag in enumerate(frags):
+        idx = locate_patch(original, frag, search_from, i)
+        positions.append(idx)
+        search_from = idx + len(frag)
+    return positions
+
+
+def apply_patches(original: str, positions: Sequence[int], edits: Sequence[tuple[str, str]]) -> str:
+    """locate_patches로 찾은 위치에 (from, to)를 적용한 결과 문자열."""
+    parts = []
+    prev = 0
+    for pos, (frag, to) in zip(positions, edits):
+        parts.append(original[prev:pos])
+        parts.append(to)
+        prev = pos + len(frag)
+    parts.append(original[prev:])
+    return "".join(parts)
+
+
+def suggest(original: str, edits: Sequence[tuple[str, str]]) -> str:
+    return apply_patches(original, locate_patches(original, [frag for frag, _ in edits]), edits)
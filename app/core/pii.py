@@ -0,0 +1,167 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.core.metrics import current_endpoint, pii_redactions
+
+# LLM으로 보내는 텍스트의 PII(이메일/전화번호/주민등록번호) 가림과 복원.
+# 정규식 하나로 원문을 왼→오 한 번 훑는다. 후보는 토큰 경계에서만 시작하고(뒤보기) 반복은 모두 소유(possessive)
+# 수량자라 되추적이 없다 -> 숫자/@가 길게 이어진 입력에서도 길이에 선형.
+# 숫자 후보는 구분자(공백 . -)로 이어진 숫자 묶음 전체를 한 번에 잡고, 어떤 묶음이 전화/주민번호인지는 파이썬에서 판정한다.
+# 같은 값은 같은 자리표시자([EMAIL_1], [PHONE_1], [RRN_1])로 바꾸고, 응답에 남은 자리표시자는 원래 값으로 되돌린다.
+
+_LOCAL = r"A-Za-z0-9._%+\-"
+_SCAN_RE = re.compile(
+    rf"(?<![{_LOCAL}])(?P<email>[{_LOCAL}]++@[A-Za-z0-9\-]++(?:\.[A-Za-z0-9\-]++)++)"
+    r"|(?<![0-9A-Za-z+])(?P<num>\+?+\d++(?:[ .\-]\d++)*+)"
+)
+_SEP_RE = re.compile(r"[ .\-]")
+_PLACEHOLDER_RE = re.compile(r"\[(EMAIL|PHONE|RRN)_(\d+)\]")
+KINDS = {"email": "EMAIL", "phone": "PHONE", "rrn": "RRN"}
+# 대표번호(1588-xxxx 등) 앞자리
+_REPRESENTATIVE = ("15", "16", "18")
+# 번호 하나를 이루는 마지막 묶음 자릿수: 한 덩어리면 전화 10~11/주민 13, 여러 묶음이면 전화 4/주민 7
+_LAST_WIDTHS = ({10, 11, 13}, {4, 7})
+_ANY_LAST_WIDTH = _LAST_WIDTHS[0] | _LAST_WIDTHS[1]
+
+
+def _classify(groups: list[str], widths: tuple[int, ...], plus: bool) -> Optional[str]:
+    if plus:  # +82 10 1234 5678 등 국가번호로 시작
+        return "phone" if len(widths) >= 2 and 9 <= sum(widths) <= 15 else None
+    if widths == (6, 7) or widths == (13,):
+        digits = "".join(groups)
+        month, day = int(digits[2:4]), int(digits[4:6])
+        if 1 <= month <= 12 and 1 <= day <= 31 and digits[6] in "12345678":
+            return "rrn"
+    first = groups[0]
+    if len(widths) == 1:
+        return "phone" if first[0] == "0" and 10 <= widths[0] <= 11 else None
+    if widths == (4, 4):
+        return "phone" if first.startswith(_REPRESENTATIVE) else None
+    if len(widths) == 3 and first[0] == "0" and 2 <= widths[0] <= 3 and 3 <= widths[1] <= 4 and widths[2] == 4:
+        return "phone"
+    return None
+
+
+def _number_spans(candidate: str, offset: int):
+    """숫자 후보 안에서 전화/주민번호 구간 (kind, start, end). 앞에서부터 가장 긴 묶음 조합을 고른다."""
+    plus = candidate[0] == "+"
+    groups = _SEP_RE.split(candidate[1:] if plus else candidate)
+    if len(groups) == 1:  # 구분자 없는 한 덩어리(가장 흔한 경우)
+        kind = _classify(groups, (len(groups[0]),), plus)
+        if kind:
+            yield kind, offset, offset + len(candidate)
+        return
+
+    widths = [len(g) for g in groups]
+    # 번호가 끝날 수 있는 묶음(4/7자리 등). 없으면 1-1-1-... 같은 후보는 여기서 끝난다
+    ends = [j for j, w in enumerate(widths) if w in _ANY_LAST_WIDTH]
+    if not ends and not plus:
+        return
+    starts = []
+    pos = offset + plus
+    for w in widths:
+        starts.append(pos)
+        pos += w + 1  # 구분자는 한 글자
+    i = 0
+    e = 0
+    while i < len(groups):
+        has_plus = plus and i == 0
+        if not has_plus:
+            # 다음으로 끝날 수 있는 묶음까지 3개 넘게 떨어져 있으면 그 앞까지 건너뛴다
+            while e < len(ends) and ends[e] < i:
+                e += 1
+            if e == len(ends):
+                return
+            i = max(i, ends[e] - 2)
+        # 묶음 k개(국가번호면 4개, 아니면 3개까지)를 긴 것부터. 마지막 묶음 자릿수로 먼저 거른다
+        for k in range(min(4 if has_plus else 3, len(groups) - i), 0, -1):
+            if not has_plus and widths[i + k - 1] not in _LAST_WIDTHS[k > 1]:
+                continue
+            kind = _classify(groups[i:i + k], tuple(widths[i:i + k]), has_plus)
+            if kind:
+                yield kind, offset if has_plus else starts[i], starts[i + k - 1] + widths[i + k - 1]
+                i += k
+                break
+        else:
+            i += 1
+
+
+def scan(text: str):
+    """PII 구간 (kind, start, end)을 왼→오 순서로."""
+    for m in _SCAN_RE.finditer(text):
+        email = m.group("email")
+        if email:
+            tld = email.rsplit(".", 1)[1]
+            if len(tld) >= 2 and tld.isalpha():
+                yield "email", m.start(), m.end()
+        else:
+            yield from _number_spans(m.group("num"), m.start())
+
+
+@dataclass(slots=True)
+class Redaction:
+    """가린 텍스트와 자리표시자 -> 원래 값."""
+    text: str
+    values: dict[str, str] = field(default_factory=dict)
+
+    def counts(self) -> dict[str, int]:
+        out: dict[str, int] = {}
+        for placeholder in self.values:
+            kind = placeholder[1:placeholder.index("_")].lower()
+            out[kind] = out.get(kind, 0) + 1
+        return out
+
+    def restore(self, text: str) -> str:
+        if not self.values or "[" not in text:
+            return text
+        return _PLACEHOLDER_RE.sub(lambda m: self.values.get(m.group(0), m.group(0)), text)
+
+    def restore_obj(self, obj: Any) -> Any:
+        """LLM 응답(dict/list/str)에 들어 있는 자리표시자를 모두 원래 값으로."""
+        if not self.values:
+            return obj
+        if isinstance(obj, str):
+            return self.restore(obj)
+        if isinstance(obj, dict):
+            return {k: self.restore_obj(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [self.restore_obj(v) for v in obj]
+        return obj
+
+
+def redact(text: str) -> Redaction:
+    # 원문에 이미 [EMAIL_3] 같은 문자열이 있으면 그보다 큰 번호부터 써서 복원 때 섞이지 않게 한다
+    counters = dict.fromkeys(KINDS.values(), 0)
+    if "[" in text:
+        for m in _PLACEHOLDER_RE.finditer(text):
+            counters[m.group(1)] = max(counters[m.group(1)], int(m.group(2)))
+
+    placeholders: dict[str, str] = {}  # 원래 값 -> 자리표시자
+    parts = []
+    prev = 0
+    for kind, start, end in scan(text):
+        value = text[start:end]
+        placeholder = placeholders.get(value)
+        if placeholder is None:
+            label = KINDS[kind]
+            counters[label] += 1
+            placeholder = placeholders[value] = f"[{label}_{counters[label]}]"
+        parts.append(text[prev:start])
+        parts.append(placeholder)
+        prev = end
+    if not placeholders:
+        return Redaction(text)
+    parts.append(text[prev:])
+    return Redaction("".join(parts), {p: v for v, p in placeholders.items()})
+
+
+def redact_for_llm(text: str, force: bool = False) -> Redaction:
+    """PII_REDACTION_ENABLED(또는 force)일 때만 가리고, 가린 수를 엔드포인트/종류별로 센다."""
+    if not (settings.PII_REDACTION_ENABLED or force):
+        return Redaction(text)
+    redaction = redact(text)
+    for kind, n in redaction.counts().items():
+        pii_redactions.inc(current_endpoint(), kind, amount=n)
+    return redaction
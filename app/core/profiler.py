@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 느린 요청용 샘플링 프로파일러(opt-in).
+# 프로파일 대상 요청이 진행되는 동안 별도 스레드가 interval마다 요청 태스크의 스택을 찍는다.
+# - 태스크가 이벤트 루프에서 실행 중이면: 루프 스레드의 실제 파이썬 스택(CPU 사용 구간)
+# - 태스크가 await로 멈춰 있으면: 코루틴 await 체인 + 기다리는 대상(LLM/DB 대기 구간)
+# 요청이 threshold보다 오래 걸렸을 때만 folded stack("a;b;c 개수") 파일로 남기며,
+# flamegraph.pl / speedscope 에 그대로 넣을 수 있다.
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+
+
+def _thread_stack(frame) -> list[str]:
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.reverse()
+    return names
+
+
+def _await_chain(task: asyncio.Task) -> list[str]:
+    names = []
+    awaitable = task.get_coro()
+    # 코루틴/제너레이터/async 제너레이터를 따라 가장 안쪽 대기 지점까지 내려간다
+    while awaitable is not None:
+        frame = (getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+                 or getattr(awaitable, "ag_frame", None))
+        if frame is None:
+            names.append(f"<await {type(awaitable).__name__}>")
+            break
+        names.append(_frame_name(frame))
+        awaitable = (getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+                     or getattr(awaitable, "ag_await", None))
+    return names
+
+
+class _Session:
+    __slots__ = ("task", "loop", "thread_id", "samples", "started")
+
+    def __init__(self, task: asyncio.Task, loop, thread_id: int):
+        self.task = task
+        self.loop = loop
+        self.thread_id = thread_id
+        self.samples: Counter = Counter()
+        self.started = time.perf_counter()
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._sessions: set[_Session] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def begin(self) -> _Session:
+        session = _Session(asyncio.current_task(), asyncio.get_running_loop(), threading.get_ident())
+        with self._lock:
+            self._sessions.add(session)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        return session
+
+    def end(self, session: _Session) -> None:
+        with self._lock:
+            self._sessions.discard(session)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            # 샘플링 중에는 end()가 끼어들지 못하게 해 끝난 세션에 샘플이 더해지지 않도록 한다
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+                frames = sys._current_frames()
+                for s in self._sessions:
+                    try:
+                        running = asyncio.current_task(s.loop) is s.task
+                        if running and s.thread_id in frames:
+                            stack = _thread_stack(frames[s.thread_id])
+                        else:
+                            stack = ["<awaiting>", *_await_chain(s.task)]
+                    except Exception:
+                        # 샘플링 도중 코루틴 상태가 바뀌면 해당 샘플만 버린다
+                        continue
+                    s.samples[";".join(stack)] += 1
+                del frames
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", value).strip("_")[:80] or "root"
+
+
+def write_folded(directory: str, method: str, path: str, elapsed: float, samples: Counter) -> str:
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    filename = os.path.join(directory, f"{stamp}_{method}_{_slug(path)}_{int(elapsed * 1000)}ms.folded")
+    with open(filename, "w", encoding="utf-8") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+    return filename
+
+
+class ProfilerMiddleware:
+    """PROFILER_HEADER 헤더가 있거나 PROFILER_SAMPLE_RATE 확률에 걸린 요청을 샘플링한다."""
+
+    def __init__(self, app):
+        self.app = app
+        self.header = settings.PROFILER_HEADER.lower().encode("latin-1")
+        self.profiler = SamplingProfiler(settings.PROFILER_INTERVAL_MS / 1000)
+
+    def _wanted(self, scope) -> bool:
+        if settings.PROFILER_ALLOW_HEADER:
+            for name, value in scope.get("headers", ()):
+                if name == self.header and value not in (b"", b"0", b"false"):
+                    return True
+        return settings.PROFILER_SAMPLE_RATE > 0 and random.random() < settings.PROFILER_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.PROFILER_ENABLED or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        session = self.profiler.begin()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.end(session)
+            elapsed = time.perf_counter() - session.started
+            if elapsed * 1000 >= settings.PROFILER_THRESHOLD_MS and session.samples:
+                try:
+                    filename = await asyncio.to_thread(
+                        write_folded, settings.PROFILER_OUTPUT_DIR, scope["method"], scope["path"],
+                        elapsed, session.samples,
+                    )
+                    logger.info("profile written: %s (%d samples)", filename, sum(session.samples.values()))
+                except OSError as e:
+                    logger.warning("profile write failed: %s", e)
@@ -2,11 +2,22 @@ from importlib.resources import files
 
 # 패키지 인지용 __init__.py 필요 (app/core/prompts/__init__.py)
 from app.core import prompts as prompts_pkg
+from app.core.prompts.registry import prompt_registry
 
 
 def load_prompt(name:str)->str:
     return files(prompts_pkg).joinpath(name).read_text(encoding="utf-8")
 
-IMPROVE_SYS_PROMPT = load_prompt("improve_sys_prompt.txt")
-REC_SYS_PROMPT1 = load_prompt("recommend_sys_prompt1.txt")
-REC_SYS_PROMPT2 = load_prompt("recommend_sys_prompt2.txt")
+# 예전 상수 이름 호환: 모듈 속성으로 읽을 때마다 레지스트리의 현재 버전을 돌려준다.
+# (from ... import 로 가져가면 import 시점 값으로 고정되므로 새 코드는 prompt_registry를 직접 쓸 것)
+_LEGACY_NAMES = {
+    "IMPROVE_SYS_PROMPT": "improve_sys_prompt.txt",
+    "REC_SYS_PROMPT1": "recommend_sys_prompt1.txt",
+    "REC_SYS_PROMPT2": "recommend_sys_prompt2.txt",
+}
+
+
+def __getattr__(name: str) -> str:
+    if name in _LEGACY_NAMES:
+        return prompt_registry.text(_LEGACY_NAMES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
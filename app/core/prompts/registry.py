@@ -0,0 +1,219 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core.config import settings
+
+try:  # 정확한 토큰 수는 tiktoken이 있을 때만. 없으면 바이트 길이로 추정
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# 버전 관리되는 프롬프트 레지스트리.
+# - 파일 내용의 sha256 앞 12자리를 버전으로 쓰고, 로드 시점에 토큰 수를 미리 세 둔다.
+# - get() 호출 시 PROMPT_RELOAD_INTERVAL_SECONDS 간격으로 mtime/size를 확인해 바뀌었으면 다시 읽는다
+#   (재시작 없이 프롬프트 교체). 읽기/파싱에 실패하면 이전 버전을 계속 쓴다.
+# - prefix()는 system + few-shot 메시지를 한 번만 만들어 재사용한다. 매 요청 같은 바이트로 시작해야
+#   OpenAI 프롬프트 캐싱(1024 토큰 이상 동일 prefix)에 걸리므로, 사용자 입력은 항상 맨 뒤에 붙인다.
+
+logger = logging.getLogger(__name__)
+
+PROMPT_DIR = Path(__file__).resolve().parent
+# OpenAI 프롬프트 캐싱이 적용되는 최소 prefix 길이
+CACHEABLE_MIN_TOKENS = 1024
+# 메시지 하나당 role/구분자에 붙는 토큰(대략)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and tiktoken is not None and not _encoding_failed:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")  # gpt-4o 계열
+        except Exception as e:  # 인코딩 파일 다운로드 실패 등
+            _encoding_failed = True
+            logger.warning("tiktoken unavailable, falling back to estimate: %s", e)
+    return _encoding
+
+
+def count_tokens(text: str) -> tuple[int, bool]:
+    """(토큰 수, 정확한 값인지). 추정치는 UTF-8 3바이트당 1토큰(한글 1자 ≈ 1토큰)."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text)), True
+    return (len(text.encode("utf-8")) + 2) // 3, False
+
+
+def _version(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+@dataclass(frozen=True, slots=True)
+class PromptVersion:
+    name: str
+    version: str
+    # .txt는 문자열, .json은 파싱된 값
+    content: Any
+    tokens: int
+    exact_tokens: bool
+    loaded_at: float
+
+
+@dataclass(frozen=True, slots=True)
+class PromptPrefix:
+    """요청마다 그대로 재사용하는 메시지 앞부분(system + few-shot)."""
+    name: str
+    version: str
+    messages: tuple
+    tokens: int
+    parts: tuple
+
+    def build(self, user_content: str) -> list[dict]:
+        return [*self.messages, {"role": "user", "content": user_content}]
+
+    @property
+    def cacheable(self) -> bool:
+        return self.tokens >= CACHEABLE_MIN_TOKENS
+
+    @property
+    def exact_tokens(self) -> bool:
+        return all(p.exact_tokens for p in self.parts)
+
+
+class _Entry:
+    __slots__ = ("path", "current", "mtime_ns", "size", "next_check")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.current: Optional[PromptVersion] = None
+        self.mtime_ns = -1
+        self.size = -1
+        self.next_check = 0.0
+
+
+def _content_tokens(content: Any) -> tuple[int, bool]:
+    if isinstance(content, str):
+        return count_tokens(content)
+    if isinstance(content, list):  # few-shot 메시지 목록
+        total, exact = 0, True
+        for m in content:
+            n, e = count_tokens(m.get("content") or "")
+            total += n + MESSAGE_OVERHEAD_TOKENS
+            exact = exact and e
+        return total, exact
+    return count_tokens(json.dumps(content, ensure_ascii=False, separators=(",", ":")))
+
+
+class PromptRegistry:
+    def __init__(self, directory: Optional[str] = None, reload_interval: Optional[float] = None):
+        self.directory = Path(directory) if directory else PROMPT_DIR
+        self.reload_interval = (settings.PROMPT_RELOAD_INTERVAL_SECONDS
+                                if reload_interval is None else reload_interval)
+        self._entries: dict[str, _Entry] = {}
+        self._prefixes: dict[str, PromptPrefix] = {}
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.reload_errors = 0
+
+    def _load(self, entry: _Entry, stat: os.stat_result) -> None:
+        data = entry.path.read_bytes()
+        version = _version(data)
+        if entry.current is not None and entry.current.version == version:
+            # touch 등으로 mtime만 바뀐 경우
+            entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+            return
+        text = data.decode("utf-8")
+        content = json.loads(text) if entry.path.suffix == ".json" else text
+        tokens, exact = _content_tokens(content)
+        previous = entry.current
+        entry.current = PromptVersion(entry.path.name, version, content, tokens, exact, time.time())
+        entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+        if previous is not None:
+            self.reloads += 1
+            logger.info("prompt reloaded: %s %s -> %s (%d tokens)", entry.path.name, previous.version, version, tokens)
+
+    def _refresh(self, entry: _Entry, now: float) -> None:
+        entry.next_check = now + self.reload_interval
+        try:
+            stat = entry.path.stat()
+            if stat.st_mtime_ns != entry.mtime_ns or stat.st_size != entry.size:
+                self._load(entry, stat)
+        except (OSError, ValueError) as e:
+            # 첫 로드 실패는 그대로 올리고, 이후 실패는 이전 버전 유지
+            if entry.current is None:
+                raise
+            self.reload_errors += 1
+            logger.warning("prompt reload failed, keeping %s: %s %s", entry.current.version, entry.path.name, e)
+
+    def get(self, name: str) -> PromptVersion:
+        entry = self._entries.get(name)
+        now = time.monotonic()
+        if entry is not None and entry.current is not None and (
+                self.reload_interval <= 0 or now < entry.next_check):
+            return entry.current
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._entries[name] = _Entry(self.directory / name)
+            if entry.current is None or (self.reload_interval > 0 and now >= entry.next_check):
+                self._refresh(entry, now)
+            return entry.current
+
+    def text(self, name: str) -> str:
+        return self.get(name).content
+
+    def prefix(self, name: str, system: str, few_shots: Optional[str] = None,
+               extra: Optional[str] = None) -> PromptPrefix:
+        """name으로 라벨링된 메시지 prefix. 구성 파일 중 하나라도 버전이 바뀌면 새로 만든다.
+
+        extra는 메시지에는 들어가지 않지만 버전에 포함할 파일(response_format 스키마 등)."""
+        parts = tuple(self.get(n) for n in (system, few_shots, extra) if n)
+        cached = self._prefixes.get(name)
+        # 파일이 다시 로드되면 PromptVersion 객체가 바뀌므로 동일성만 비교
+        if cached is not None and len(cached.parts) == len(parts) and all(
+                a is b for a, b in zip(cached.parts, parts)):
+            return cached
+
+        system_prompt = parts[0]
+        messages = [{"role": "system", "content": system_prompt.content}]
+        tokens = system_prompt.tokens + MESSAGE_OVERHEAD_TOKENS
+        if few_shots:
+            shots = parts[1]
+            messages.extend({"role": m["role"], "content": m["content"]} for m in shots.content)
+            tokens += shots.tokens
+        version = _version(":".join(f"{p.name}={p.version}" for p in parts).encode())
+        prefix = PromptPrefix(name, version, tuple(messages), tokens, parts)
+        self._prefixes[name] = prefix
+        return prefix
+
+    def stats(self) -> dict:
+        return {
+            "directory": str(self.directory),
+            "reload_interval_seconds": self.reload_interval,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+            # tiktoken은 선택 의존성이라 없으면 모든 토큰 수가 추정치다(exact_tokens로 항목별 구분)
+            "token_counter": "tiktoken" if _get_encoding() is not None else "estimate",
+            "files": {
+                name: {"version": e.current.version, "tokens": e.current.tokens,
+                       "exact_tokens": e.current.exact_tokens, "loaded_at": e.current.loaded_at}
+                for name, e in list(self._entries.items()) if e.current is not None
+            },
+            "prefixes": {
+                name: {"version": p.version, "tokens": p.tokens, "exact_tokens": p.exact_tokens, "cacheable": p.cacheable,
+                       "parts": {part.name: part.version for part in p.parts}}
+                for name, p in list(self._prefixes.items())
+            },
+        }
+
+
+prompt_registry = PromptRegistry(settings.PROMPT_DIR)
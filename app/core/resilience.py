@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Optional
+
+import openai
+
+from app.core.admission import Rejected
+from app.core.metrics import llm_circuit_transitions, llm_hedges
+
+logger = logging.getLogger(__name__)
+
+# LLM 업스트림 호출 복원력.
+# - deadline: 호출 전체(SDK 재시도, hedge 포함)에 거는 기한. httpx timeout은 읽기 간격 기준이라
+#   조금씩 흘러나오는 응답이나 재시도가 겹치면 설정값을 훨씬 넘길 수 있다(LLMClient에서 asyncio.wait_for로 건다)
+# - hedged: 첫 요청이 최근 p95 지연을 넘기면 같은 요청을 하나 더 보내고 먼저 성공한 쪽을 쓴다(진 쪽은 취소)
+# - CircuitBreaker: 최근 구간의 업스트림 오류율이 임계값을 넘으면 한동안 호출하지 않고 바로 503
+
+# 업스트림 상태가 나쁘다는 신호로 보는 오류. 400 같은 요청 오류는 업스트림이 살아 있다는 뜻이므로 성공으로 센다
+UPSTREAM_ERRORS = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError, asyncio.TimeoutError)
+
+
+class LatencyWindow:
+    """최근 N개 호출 지연(초). hedge 지연을 정하는 분위수 계산용."""
+
+    def __init__(self, size: int, min_samples: int):
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+async def hedged(call: Callable[[int], Awaitable], delay: Optional[float],
+                 can_hedge: Callable[[], bool], label: str):
+    """call(0)을 보내고 delay 안에 끝나지 않으면 call(1)을 하나 더 보낸다.
+
+    먼저 성공한 결과를 돌려주고 나머지는 취소한다. 한쪽이 실패하면 다른 쪽을 끝까지 기다리고,
+    둘 다 실패하면 첫 요청의 예외를 올린다. delay가 None이면 hedge 없이 call(0)만 기다린다.
+    """
+    primary = asyncio.ensure_future(call(0))
+    tasks = [primary]
+    try:
+        if delay is None:
+            return await primary
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        # 업스트림이 꽉 찬 상황에서 hedge는 부하만 늘리므로 호출 측이 허락할 때만 보낸다
+        if done or not can_hedge():
+            return await primary
+        llm_hedges.inc(label, "sent")
+        backup = asyncio.ensure_future(call(1))
+        tasks.append(backup)
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    llm_hedges.inc(label, "hedge_won" if task is backup else "primary_won")
+                    return task.result()
+        llm_hedges.inc(label, "both_failed")
+        return primary.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+class CircuitBreaker:
+    """closed -> (오류율 초과) open -> (open_seconds 경과) half_open -> 탐색 호출 1개 결과로 closed/open.
+
+    이벤트 루프 안에서만 쓰므로 lock 없이 동작한다.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+    def __init__(self, threshold: float, min_calls: int, window: float, open_seconds: float):
+        self.threshold = threshold
+        self.min_calls = min_calls
+        self.window = window
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        # (시각, 실패 여부)
+        self._events: deque[tuple[float, bool]] = deque()
+        self._failures = 0
+        self._probing = False
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            logger.warning("llm circuit %s -> %s", self.state, state)
+            llm_circuit_transitions.inc(state)
+        self.state = state
+        self._events.clear()
+        self._failures = 0
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+
+    def before_call(self) -> None:
+        if self.state == self.OPEN:
+            if self.retry_after() > 0:
+                raise Rejected(503, self.retry_after(), "LLM 업스트림 오류가 많아 잠시 호출을 멈췄습니다.")
+            self._transition(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            # 탐색 호출 하나만 내보내고 나머지는 결과가 나올 때까지 거절
+            if self._probing:
+                raise Rejected(503, 1.0, "LLM 업스트림 상태를 확인하는 중입니다.")
+            self._probing = True
+
+    def record(self, failed: bool) -> None:
+        now = time.monotonic()
+        if self.state == self.HALF_OPEN:
+            self._probing = False
+            if failed:
+                self.opened_at = now
+                self._transition(self.OPEN)
+            else:
+                self._transition(self.CLOSED)
+            return
+        if self.state == self.OPEN:
+            return
+        self._events.append((now, failed))
+        self._failures += failed
+        while self._events and self._events[0][0] < now - self.window:
+            self._failures -= self._events.popleft()[1]
+        if len(self._events) >= self.min_calls and self._failures / len(self._events) >= self.threshold:
+            self.opened_at = now
+            self._transition(self.OPEN)
+
+    @contextmanager
+    def guard(self):
+        """with 안의 업스트림 호출 결과를 기록한다. 취소/대기열 거절 등은 결과로 치지 않는다."""
+        self.before_call()
+        try:
+            yield
+        except UPSTREAM_ERRORS:
+            self.record(True)
+            raise
+        except openai.APIError:
+            self.record(False)
+            raise
+        except BaseException:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+            raise
+        else:
+            self.record(False)
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "window_calls": len(self._events),
+            "window_failures": self._failures,
+            "retry_after_s": round(self.retry_after(), 2) if self.state == self.OPEN else 0.0,
+        }
@@ -0,0 +1,66 @@
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class _Call:
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight:
+    """같은 key로 동시에 들어온 호출을 하나의 진행 중 태스크에 묶는다(request coalescing).
+
+    - 첫 호출(leader)이 태스크를 만들고, 끝나기 전에 같은 key로 온 호출은 그 결과를 같이 기다린다.
+    - 결과/예외는 모든 대기자에게 그대로 전달된다. 결과 객체는 공유되므로 호출 측에서 수정하지 말 것.
+    - 대기자 한 명이 취소돼도 공유 태스크는 계속 진행되고, 마지막 대기자까지 취소되면 그때 태스크를 취소한다.
+    - 태스크가 끝나면 key를 지우므로 결과를 캐시하지는 않는다(캐시는 app.core.cache 담당).
+    """
+
+    def __init__(self):
+        self._calls: dict[str, _Call] = {}
+        self._stats = defaultdict(lambda: {"leaders": 0, "coalesced": 0, "failures": 0, "cancelled": 0})
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]], label: str = "default") -> T:
+        stats = self._stats[label]
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.create_task(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            stats["leaders"] += 1
+        else:
+            stats["coalesced"] += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except Exception:
+            stats["failures"] += 1
+            raise
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # 기다리는 쪽이 아무도 없으면 업스트림 호출도 중단
+                call.task.cancel()
+                stats["cancelled"] += 1
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # 대기자가 모두 취소된 뒤 끝난 태스크의 예외는 아무도 꺼내지 않으므로 여기서 소비
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight_keys": len(self._calls),
+            "by_label": {
+                label: {**s, "coalesce_ratio": round(s["coalesced"] / max(s["leaders"] + s["coalesced"], 1), 4)}
+                for label, s in self._stats.items()
+            },
+        }
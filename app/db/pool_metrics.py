@@ -0,0 +1,114 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Type
+
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+# 풀 대기 시간 분포 버킷(초). 마지막 구간은 +Inf
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolStats:
+    """커넥션 풀 하나의 checkout/대기/점유 시간 통계.
+
+    워커당 풀 크기(DB_POOL_SIZE/DB_MAX_OVERFLOW)를 정할 때 참고한다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Pool | None = None
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self.hold_total = 0.0
+        self.hold_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+            self.wait_buckets[bisect_left(WAIT_BUCKETS, seconds)] += 1
+
+    def _on_connect(self, dbapi_conn, record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_conn, record, proxy):
+        record.info["checkout_at"] = time.perf_counter()
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            if self.in_use > self.peak_in_use:
+                self.peak_in_use = self.in_use
+
+    def _on_checkin(self, dbapi_conn, record):
+        started = record.info.pop("checkout_at", None)
+        with self._lock:
+            self.checkins += 1
+            if started is None:
+                return
+            self.in_use -= 1
+            held = time.perf_counter() - started
+            self.hold_total += held
+            if held > self.hold_max:
+                self.hold_max = held
+
+    def _on_invalidate(self, dbapi_conn, record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def attach(self, sync_engine) -> None:
+        self.pool = sync_engine.pool
+        event.listen(sync_engine, "connect", self._on_connect)
+        event.listen(sync_engine, "checkout", self._on_checkout)
+        event.listen(sync_engine, "checkin", self._on_checkin)
+        event.listen(sync_engine, "invalidate", self._on_invalidate)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            buckets = {f"le_{b}": n for b, n in zip(WAIT_BUCKETS, self.wait_buckets)}
+            buckets["le_inf"] = self.wait_buckets[-1]
+            data = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "wait_avg_ms": round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "wait_buckets": buckets,
+                "hold_avg_ms": round(self.hold_total / self.checkins * 1000, 3) if self.checkins else 0.0,
+                "hold_max_ms": round(self.hold_max * 1000, 3),
+            }
+        if self.pool is not None:
+            data["status"] = self.pool.status()
+        return data
+
+
+def timed_pool_class(base: Type[Pool], stats: PoolStats) -> Type[Pool]:
+    """checkout 대기 시간(새 커넥션 생성 포함)을 재는 풀 클래스를 만든다.
+
+    dispose() 시 풀은 같은 클래스로 재생성되므로 stats는 클래스에 묶어 둔다.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return base._do_get(self)
+        finally:
+            stats.record_wait(time.perf_counter() - started)
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
@@ -1,8 +1,12 @@
 from sqlalchemy import create_engine, MetaData
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from dotenv import load_dotenv
 import os
 from app.core.config import settings
+from app.db.pool_metrics import PoolStats, timed_pool_class
+from app.core.metrics import instrument_engine
 
 
 naming_convention = {
@@ -14,10 +18,55 @@ naming_convention = {
 }
 metadata = MetaData(naming_convention=naming_convention)
 
-engine = create_engine(settings.DATABASE_URL)
+# 서비스의 upsert(INSERT ... ON DUPLICATE KEY UPDATE / ON CONFLICT)는 이 dialect들로만 만든다.
+# 다른 DB로 띄우면 요청 처리 중이 아니라 엔진을 만들 때 바로 실패한다
+SUPPORTED_DIALECTS = ("mysql", "sqlite")
+
+
+def _check_dialect(bind) -> None:
+    if bind.dialect.name not in SUPPORTED_DIALECTS:
+        raise RuntimeError(f"지원하지 않는 DB dialect: {bind.dialect.name} (지원: {', '.join(SUPPORTED_DIALECTS)})")
+
+
+def _pool_kwargs(url: str, base_pool, stats: PoolStats) -> dict:
+    # sqlite(로컬/벤치마크)는 SQLAlchemy 기본 풀을 그대로 사용.
+    # 동시 쓰기는 DB 파일 잠금으로 직렬화되므로 잠금 대기 한도만 풀 대기 시간과 맞춘다(기본 5초)
+    if url.startswith("sqlite"):
+        return {"connect_args": {"timeout": settings.DB_POOL_TIMEOUT}}
+    return {
+        "poolclass": timed_pool_class(base_pool, stats),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+sync_pool_stats = PoolStats("sync")
+async_pool_stats = PoolStats("async")
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    **_pool_kwargs(settings.DATABASE_URL, QueuePool, sync_pool_stats),
+)
+_check_dialect(engine)
+sync_pool_stats.attach(engine)
+
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URL,
+    **_pool_kwargs(settings.SQLALCHEMY_ASYNC_DATABASE_URL, AsyncAdaptedQueuePool, async_pool_stats),
+)
+_check_dialect(async_engine)
+async_pool_stats.attach(async_engine.sync_engine)
+# 요청별 DB 시간(/metrics의 db 단계)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base(metadata=metadata)
 
 def get_db():
@@ -26,3 +75,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def pool_stats() -> dict:
+    return {
+        "sync": sync_pool_stats.snapshot(),
+        "async": async_pool_stats.snapshot(),
+    }
@@ -0,0 +1,92 @@
+"""
+events/histories를 gzip NDJSON/CSV 파일로 내보낸다(분석용 덤프).
+pk 키셋 페이지 + yield_per로 읽어 행 수와 상관없이 메모리는 페이지 하나 분량이고,
+페이지마다 gzip 멤버 하나를 붙여 쓴 뒤 <out>.cursor에 커서 토큰과 파일 크기를 남긴다.
+--resume은 그 지점부터(잘린 멤버는 잘라내고) 이어 쓰므로, 중단된 덤프 재개나 새로 쌓인 행만 덧붙이는 데 쓴다.
+
+    python -m app.jobs.export_rows events --format csv --since 2025-01-01 --until 2025-02-01
+    python -m app.jobs.export_rows histories --user-id 42 --out histories-42.ndjson.gz
+    python -m app.jobs.export_rows histories --out histories.ndjson.gz --resume
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.metrics import export_rows
+from app.db.session import SessionLocal
+from app.services.export_service import EXPORTS, FORMATS, ExportFilter, decode_cursor, encode_cursor, encode_rows, \
+    iter_pages
+
+
+def _save_state(path: str, cursor: str, size: int) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"cursor": cursor, "bytes": size}, f)
+    os.replace(tmp, path)
+
+
+def export(table: str, fmt: str, filters: ExportFilter, out: str, cursor: str | None, resume: bool,
+           page_size: int, fetch_size: int) -> dict:
+    spec = EXPORTS[table]
+    state_path = out + ".cursor"
+    after, size = 0, 0
+    if resume and os.path.exists(state_path):
+        with open(state_path) as f:
+            state = json.load(f)
+        cursor, size = state["cursor"], state["bytes"]
+    elif os.path.exists(out) and os.path.getsize(out) > 0:
+        raise SystemExit(f"{out}이(가) 이미 있습니다. 이어 쓰려면 --resume")
+    if cursor:
+        cursor_spec, filters, after = decode_cursor(cursor)
+        if cursor_spec is not spec:
+            raise SystemExit(f"{cursor_spec.table} 내보내기의 커서입니다.")
+
+    started = time.perf_counter()
+    rows_written = pages = 0
+    with SessionLocal() as db, open(out, "ab") as f:
+        # 마지막 체크포인트 뒤에 덜 써진 멤버가 있으면 잘라낸다
+        f.truncate(size)
+        f.seek(size)
+        header = fmt == "csv" and size == 0
+        for rows, last in iter_pages(db, spec, filters, after, page_size=page_size, fetch_size=fetch_size):
+            f.write(gzip.compress(encode_rows(spec, fmt, rows, header=header), settings.EXPORT_GZIP_LEVEL))
+            f.flush()
+            header = False
+            rows_written += len(rows)
+            pages += 1
+            export_rows.inc(table, fmt, amount=len(rows))
+            cursor = encode_cursor(spec, filters, last)
+            _save_state(state_path, cursor, f.tell())
+        if header:  # 빈 CSV도 헤더는 남긴다
+            f.write(gzip.compress(encode_rows(spec, fmt, [], header=True), settings.EXPORT_GZIP_LEVEL))
+            _save_state(state_path, cursor or encode_cursor(spec, filters, after), f.tell())
+        size = f.tell()
+    return {"table": table, "format": fmt, "rows": rows_written, "pages": pages, "bytes": size, "out": out,
+            "filters": filters.to_dict(), "cursor": cursor, "elapsed_s": round(time.perf_counter() - started, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="events/histories gzip 내보내기")
+    parser.add_argument("table", choices=sorted(EXPORTS))
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="created_at >= since")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="created_at < until")
+    parser.add_argument("--user-id", type=int, action="append", default=[], help="지정한 유저만(여러 번 지정 가능)")
+    parser.add_argument("--out", help="출력 파일(기본 <table>.<format>.gz)")
+    parser.add_argument("--cursor", help="이 커서 토큰(API의 X-Export-Next-Cursor 등) 다음부터")
+    parser.add_argument("--resume", action="store_true", help="<out>.cursor에 남은 지점부터 이어 쓰기")
+    parser.add_argument("--page-size", type=int, default=settings.EXPORT_PAGE_ROWS, help="키셋 페이지(트랜잭션) 크기")
+    parser.add_argument("--fetch-size", type=int, default=settings.EXPORT_FETCH_ROWS, help="yield_per fetch 크기")
+    args = parser.parse_args()
+
+    out = args.out or f"{args.table}.{args.format}.gz"
+    filters = ExportFilter(args.since, args.until, tuple(sorted(set(args.user_id))))
+    print(export(args.table, args.format, filters, out, args.cursor, args.resume, args.page_size, args.fetch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+histories 보존 기간(HISTORY_RETENTION_DAYS) 정리와 월 파티션 관리. 크론으로 하루 한 번 정도 돌린다.
+
+1) (MySQL 파티션 테이블) 통째로 기한이 지난 달의 파티션은 DROP PARTITION으로 바로 지운다(행 삭제 없음)
+2) 남은 기한 지난 행(기준 시각이 걸친 달 등)은 created_at 인덱스로 PURGE_BATCH_SIZE개씩 지우고 배치마다 커밋
+3) --optimize면 행을 지운 파티션(파티션이 아니면 테이블)을 재구성해 빈 공간을 돌려받는다
+4) 이번 달 + HISTORY_PARTITION_MONTHS_AHEAD까지의 파티션을 pmax에서 나눠 미리 만든다
+5) 히스토리가 지워진 유저의 파생 데이터에서 지운 토픽을 걷어 낸다: recent_topics 윈도우는 지우고
+   (다음 읽기/쓰기 때 남은 히스토리로 다시 계산된다), user_interests는 남은 히스토리로 재구성한다(app.jobs.rebuild_interests)
+지운 행 수와 테이블 크기(data + index) 변화를 출력한다.
+
+    python -m app.jobs.purge_histories
+    python -m app.jobs.purge_histories --retention-days 90 --dry-run
+    python -m app.jobs.purge_histories --optimize
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, select, text
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.jobs.rebuild_interests import rebuild as rebuild_interests
+from app.models.history import History
+from app.models.recent_topic import RecentTopic
+
+TABLE = History.__tablename__
+
+
+def _month_start(dt: datetime) -> datetime:
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(dt: datetime, n: int) -> datetime:
+    years, month = divmod(dt.month - 1 + n, 12)
+    return dt.replace(year=dt.year + years, month=month + 1)
+
+
+def _db_now(db) -> datetime:
+    # created_at은 DB의 CURRENT_TIMESTAMP로 채워지므로 기준 시각도 DB 시계로 잡는다
+    now = db.execute(select(func.current_timestamp())).scalar()
+    return datetime.fromisoformat(now) if isinstance(now, str) else now
+
+
+def _partitions(db) -> list[dict]:
+    """(name, upper(미만 경계, pmax는 None), rows)를 경계 순서로. 파티션 테이블이 아니면 빈 목록."""
+    rows = db.execute(text(
+        "SELECT PARTITION_NAME AS name, PARTITION_DESCRIPTION AS bound FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION"), {"t": TABLE}).mappings().all()
+    return [{"name": r["name"],
+             "upper": None if r["bound"] == "MAXVALUE" else datetime.fromisoformat(r["bound"].strip("'"))}
+            for r in rows]
+
+
+def _table_bytes(db) -> int:
+    return int(db.execute(text(
+        "SELECT DATA_LENGTH + INDEX_LENGTH FROM information_schema.TABLES "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t"), {"t": TABLE}).scalar() or 0)
+
+
+def _refresh_stats(db) -> None:
+    # information_schema 크기 값은 캐시/샘플링 통계라 측정 전에 갱신한다
+    db.execute(text(f"ANALYZE TABLE {TABLE}"))
+    try:
+        db.execute(text("SET SESSION information_schema_stats_expiry = 0"))
+    except Exception:
+        pass  # MySQL 8 이전/MariaDB에는 없는 변수
+
+
+def _drop_expired_partitions(db, partitions: list[dict], cutoff: datetime, dry_run: bool,
+                             users: set[int]) -> tuple[list[str], int]:
+    dropped, rows = [], 0
+    # 마지막 일반 파티션은 남긴다(빈 테이블이 되어도 경계 정의가 유지되도록)
+    for p in partitions[:-2]:
+        if p["upper"] is None or p["upper"] > cutoff:
+            break
+        rows += db.execute(text(f"SELECT COUNT(*) FROM {TABLE} PARTITION ({p['name']})")).scalar()
+        users.update(db.execute(text(f"SELECT DISTINCT user_id FROM {TABLE} PARTITION ({p['name']})")).scalars())
+        if not dry_run:
+            db.execute(text(f"ALTER TABLE {TABLE} DROP PARTITION {p['name']}"))
+        dropped.append(p["name"])
+    return dropped, rows
+
+
+def _delete_batches(cutoff: datetime, batch_size: int, sleep_ms: int, users: set[int]) -> tuple[int, int]:
+    deleted = batches = 0
+    while True:
+        # 배치마다 새 트랜잭션: 잠그는 행 수와 시간이 배치 크기로 묶인다
+        with SessionLocal() as db:
+            rows = db.execute(select(History.history_id, History.user_id).where(History.created_at < cutoff)
+                              .order_by(History.created_at).limit(batch_size)).all()
+            if not rows:
+                break
+            ids = [r.history_id for r in rows]
+            users.update(r.user_id for r in rows)
+            # created_at 조건을 같이 주면 MySQL이 해당 파티션만 본다
+            db.execute(delete(History).where(History.history_id.in_(ids), History.created_at < cutoff)
+                       .execution_options(synchronize_session=False))
+            db.commit()
+        deleted += len(ids)
+        batches += 1
+        if len(ids) < batch_size:
+            break
+        time.sleep(sleep_ms / 1000)
+    return deleted, batches
+
+
+def _refresh_derived(users: set[int], batch_size: int) -> dict:
+    """지운 토픽이 남아 있을 수 있는 파생 데이터(recent_topics, user_interests)를 유저 배치 단위로 정리한다."""
+    ordered = sorted(users)
+    windows = 0
+    for i in range(0, len(ordered), batch_size):
+        with SessionLocal() as db:
+            windows += db.execute(delete(RecentTopic).where(RecentTopic.user_id.in_(ordered[i:i + batch_size]))
+                                  .execution_options(synchronize_session=False)).rowcount
+            db.commit()
+    profiles = rebuild_interests(ordered, batch_size) if ordered else {"users": 0, "stale_deleted": 0}
+    return {"users": len(ordered), "windows_cleared": windows,
+            "profiles_rebuilt": profiles["users"], "profiles_deleted": profiles["stale_deleted"]}
+
+
+def _compact(db, partitions: list[dict], cutoff: datetime) -> list[str]:
+    if not partitions:
+        db.execute(text(f"OPTIMIZE TABLE {TABLE}"))
+        return [TABLE]
+    # 행 단위로 지운 곳은 기준 시각이 걸친 파티션(과 그 앞에 남긴 파티션)뿐
+    touched = [p["name"] for p in partitions if p["upper"] is not None and p["upper"] <= _add_months(cutoff, 1)]
+    if touched:
+        db.execute(text(f"ALTER TABLE {TABLE} REBUILD PARTITION {', '.join(touched)}"))
+    return touched
+
+
+def _add_future_partitions(db, partitions: list[dict], now: datetime, months_ahead: int) -> list[str]:
+    bounded = [p for p in partitions if p["upper"] is not None]
+    if not bounded or partitions[-1]["upper"] is not None:
+        return []
+    target = _add_months(_month_start(now), months_ahead + 1)
+    upper = bounded[-1]["upper"]
+    added, clauses = [], []
+    while upper < target:
+        added.append(f"p{upper:%Y%m}")
+        upper = _add_months(upper, 1)
+        clauses.append(f"PARTITION {added[-1]} VALUES LESS THAN ('{upper:%Y-%m-%d}')")
+    if added:
+        clauses.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+        db.execute(text(f"ALTER TABLE {TABLE} REORGANIZE PARTITION pmax INTO ({', '.join(clauses)})"))
+    return added
+
+
+def purge(retention_days: int, batch_size: int, sleep_ms: int, months_ahead: int,
+          dry_run: bool = False, optimize: bool = False) -> dict:
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        mysql = db.get_bind().dialect.name == "mysql"
+        now = _db_now(db)
+        cutoff: Optional[datetime] = now - timedelta(days=retention_days) if retention_days > 0 else None
+        partitions = _partitions(db) if mysql else []
+        if mysql:
+            _refresh_stats(db)
+        bytes_before = _table_bytes(db) if mysql else None
+        report = {"table": TABLE, "dry_run": dry_run, "retention_days": retention_days,
+                  "cutoff": cutoff.isoformat(sep=" ") if cutoff else None, "partitioned": bool(partitions)}
+
+        dropped, partition_rows, users = [], 0, set()
+        if cutoff is not None:
+            dropped, partition_rows = _drop_expired_partitions(db, partitions, cutoff, dry_run, users)
+            partitions = [p for p in partitions if p["name"] not in dropped] if not dry_run else partitions
+        db.commit()
+
+    deleted = batches = 0
+    if cutoff is not None:
+        if dry_run:
+            with SessionLocal() as db:
+                expired = db.execute(select(func.count()).select_from(History)
+                                     .where(History.created_at < cutoff)).scalar()
+            deleted = expired - partition_rows
+        else:
+            deleted, batches = _delete_batches(cutoff, batch_size, sleep_ms, users)
+
+    derived = None
+    if cutoff is not None and not dry_run:
+        derived = _refresh_derived(users, batch_size)
+
+    with SessionLocal() as db:
+        compacted, added = [], []
+        if mysql and not dry_run:
+            if optimize and cutoff is not None and (deleted or dropped):
+                compacted = _compact(db, partitions, cutoff)
+            added = _add_future_partitions(db, partitions, now, months_ahead)
+            _refresh_stats(db)
+        bytes_after = _table_bytes(db) if mysql else None
+        db.commit()
+
+    report.update({
+        "dropped_partitions": dropped,
+        "rows_in_dropped_partitions": partition_rows,
+        "rows_deleted_in_batches": deleted,
+        "batches": batches,
+        "rows_reclaimed": partition_rows + deleted,
+        # 배치 삭제만으로는 InnoDB 파일이 줄지 않는다(빈 페이지로 남음). 돌려받으려면 --optimize
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_reclaimed": bytes_before - bytes_after if mysql and not dry_run else None,
+        "compacted": compacted,
+        "partitions_added": added,
+        # 히스토리가 지워진 유저 수, 지운 윈도우 수, 재구성/삭제한 관심사 프로필 수
+        "derived": derived,
+        "elapsed_s": round(time.perf_counter() - started, 2),
+    })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="histories 보존 기간 정리/월 파티션 관리")
+    parser.add_argument("--retention-days", type=int, default=settings.HISTORY_RETENTION_DAYS,
+                        help="이보다 오래된 행을 지운다(0이면 지우지 않고 파티션만 관리)")
+    parser.add_argument("--batch-size", type=int, default=settings.PURGE_BATCH_SIZE)
+    parser.add_argument("--sleep-ms", type=int, default=settings.PURGE_BATCH_SLEEP_MS, help="배치 사이 쉬는 시간")
+    parser.add_argument("--months-ahead", type=int, default=settings.HISTORY_PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--dry-run", action="store_true", help="지울 행 수만 센다")
+    parser.add_argument("--optimize", action="store_true", help="행을 지운 파티션/테이블을 재구성해 공간 회수")
+    args = parser.parse_args()
+    print(purge(args.retention_days, args.batch_size, args.sleep_ms, args.months_ahead, args.dry_run, args.optimize))
+
+
+if __name__ == "__main__":
+    main()
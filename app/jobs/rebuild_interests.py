@@ -0,0 +1,116 @@
+"""
+histories 테이블 전체(또는 일부 유저)를 시간순으로 다시 읽어 user_interests를 재구성한다.
+가중치 규칙(app/core/interests.py)을 바꿨거나 프로필이 어긋났을 때 사용.
+유저를 user_id 키셋으로 --batch-size명씩 끊어 그 유저들의 히스토리만 다시 읽고, 프로필을 덮어쓴 뒤(upsert) 배치마다 커밋한다.
+읽기/쓰기 트랜잭션과 잠금이 배치 크기로 묶이고, 재구성 중에도 아직 차례가 오지 않은 유저는 기존 프로필로 추천된다.
+히스토리가 하나도 남지 않은 유저의 프로필은 마지막에 같은 배치 크기로 지운다.
+
+    python -m app.jobs.rebuild_interests
+    python -m app.jobs.rebuild_interests --user-id 42 --user-id 43
+"""
+import argparse
+import time
+
+from sqlalchemy import delete, exists, select
+
+from app.core.interests import update_profile
+from app.db.session import SessionLocal
+from app.models.history import History
+from app.models.user_interest import UserInterest
+from app.services.interest_service import upsert_profiles
+
+FETCH_SIZE = 5000
+
+
+def _user_batches(db, user_ids: list[int], batch_size: int):
+    """재구성할 user_id를 batch_size개씩. 지정이 없으면 histories의 user_id를 키셋으로 훑는다."""
+    if user_ids:
+        ordered = sorted(set(user_ids))
+        for i in range(0, len(ordered), batch_size):
+            yield ordered[i:i + batch_size]
+        return
+    after = 0
+    while True:
+        batch = db.execute(select(History.user_id).where(History.user_id > after).distinct()
+                           .order_by(History.user_id).limit(batch_size)).scalars().all()
+        if not batch:
+            return
+        yield batch
+        after = batch[-1]
+
+
+def _replay(db, user_ids: list[int], fetch_size: int):
+    """(user_id, weights, 마지막 created_at)를 유저 단위로 흘려보낸다."""
+    query = (select(History.user_id, History.role, History.topic, History.created_at)
+             .where(History.user_id.in_(user_ids))
+             .order_by(History.user_id, History.created_at, History.history_id)
+             .execution_options(yield_per=fetch_size))
+
+    current, weights, last = None, {}, None
+    for row in db.execute(query):
+        if row.user_id != current:
+            if current is not None:
+                yield current, weights, last
+            current, weights, last = row.user_id, {}, None
+        # 각 히스토리 시점 기준으로 감쇠시키며 누적 -> 점진 갱신과 같은 결과
+        weights = update_profile(weights, last, [(row.role.value, row.topic)], row.created_at)
+        last = row.created_at
+    if current is not None:
+        yield current, weights, last
+
+
+def _delete_profiles(db, user_ids) -> int:
+    return db.execute(delete(UserInterest).where(UserInterest.user_id.in_(user_ids))).rowcount
+
+
+def _delete_stale(db, batch_size: int) -> int:
+    """히스토리가 하나도 없는 유저의 프로필을 배치 단위로 지운다(전체 재구성용)."""
+    no_history = ~exists().where(History.user_id == UserInterest.user_id)
+    deleted = 0
+    while True:
+        stale = db.execute(select(UserInterest.user_id).where(no_history)
+                           .order_by(UserInterest.user_id).limit(batch_size)).scalars().all()
+        if not stale:
+            return deleted
+        _delete_profiles(db, stale)
+        db.commit()
+        deleted += len(stale)
+        if len(stale) < batch_size:
+            return deleted
+
+
+def rebuild(user_ids: list[int], batch_size: int, fetch_size: int = FETCH_SIZE) -> dict:
+    started = time.perf_counter()
+    users = batches = stale = 0
+    with SessionLocal() as db:
+        dialect = db.get_bind().dialect.name
+        for batch in _user_batches(db, user_ids, batch_size):
+            rows = [{"user_id": user_id, "weights": weights, "updated_at": last}
+                    for user_id, weights, last in _replay(db, batch, fetch_size)]
+            if rows:
+                db.execute(upsert_profiles(dialect, rows))
+            if user_ids:
+                # 지정한 유저 중 히스토리가 남지 않은 유저는 같은 배치에서 지운다
+                gone = set(batch) - {row["user_id"] for row in rows}
+                if gone:
+                    stale += _delete_profiles(db, gone)
+            db.commit()
+            users += len(rows)
+            batches += 1
+        if not user_ids:
+            stale = _delete_stale(db, batch_size)
+    return {"users": users, "batches": batches, "stale_deleted": stale,
+            "elapsed_s": round(time.perf_counter() - started, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="user_interests 재구성")
+    parser.add_argument("--user-id", type=int, action="append", default=[], help="지정한 유저만 재구성(여러 번 지정 가능)")
+    parser.add_argument("--batch-size", type=int, default=500, help="upsert 한 번에 쓰는 유저 수")
+    parser.add_argument("--fetch-size", type=int, default=FETCH_SIZE, help="histories 스트리밍 fetch 크기")
+    args = parser.parse_args()
+    print(rebuild(args.user_id, args.batch_size, args.fetch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,37 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from app.api.v1.api import router as v1_router
+from app.core import llm as llm_module
+from app.core.config import settings
+from app.core.llm import get_llm_client, close_llm_client
+from app.core.metrics import Gauge, MetricsMiddleware, render_metrics
+from app.core.profiler import ProfilerMiddleware
+from app.db.session import async_engine, async_pool_stats
+from app.services.trace_buffer import trace_buffer
 from starlette.middleware.cors import CORSMiddleware
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # OpenAI 클라이언트는 워커 프로세스당 한 번만 생성
+    get_llm_client()
+    if settings.TRACE_BUFFER_ENABLED:
+        trace_buffer.start()
+    try:
+        yield
+    finally:
+        # 남은 trace를 모두 flush한 뒤 DB 엔진 정리
+        await trace_buffer.stop()
+        await close_llm_client()
+        await async_engine.dispose()
+
+
 app = FastAPI(
     title="CLiCK API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS 설정 추가#
@@ -16,4 +43,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(v1_router)
\ No newline at end of file
+# 느린 요청 샘플링 프로파일러(PROFILER_ENABLED일 때만 동작)
+app.add_middleware(ProfilerMiddleware)
+# 요청 수/지연/단계별 시간 수집 + Server-Timing 헤더. CORS보다 바깥에 두어 전체 처리 시간을 잰다
+app.add_middleware(
+    MetricsMiddleware,
+    server_timing_prefix="/api" if settings.SERVER_TIMING_ENABLED else None,
+)
+
+app.include_router(v1_router)
+
+Gauge("llm_in_flight", "진행 중인 LLM 호출 수", lambda: llm_module._llm_client.in_flight)
+Gauge("llm_queue_depth", "LLM 슬롯을 기다리는 요청 수", lambda: sum(llm_module._llm_client.gate.waiting.values()))
+Gauge("llm_circuit_open", "LLM 서킷 브레이커가 열려 있으면 1", lambda: int(llm_module._llm_client.breaker.state == "open"))
+Gauge("db_pool_in_use", "async DB 풀에서 사용 중인 커넥션 수", lambda: async_pool_stats.in_use)
+Gauge("trace_buffer_queue_size", "trace 버퍼 대기열 길이", lambda: trace_buffer.stats()["queue_size"])
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -1,4 +1,6 @@
 from .user import User
 from .event import Event
 from .history import History
-__all__ = ["User", "Event", "History"]
\ No newline at end of file
+from .recent_topic import RecentTopic
+from .user_interest import UserInterest
+__all__ = ["User", "Event", "History", "RecentTopic", "UserInterest"]
\ No newline at end of file
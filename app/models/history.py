@@ -9,17 +9,23 @@ class MessageRole(str, Enum):
 
 class History(Base):
     __tablename__ = 'histories'
+    # MySQL에서는 월 파티션 때문에 DB의 PK가 (history_id, created_at)이고 users 외래 키가 없다(c3f1a9d5e7b2).
+    # ORM은 history_id만으로 식별하고(auto_increment라 유일), 관계 조인을 위해 ForeignKey는 모델에만 둔다
     history_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
     room_id = Column(String(200), nullable=False)
     role = Column(SAEnum(MessageRole, name='message_role'), nullable=False, server_default='user')
     topic = Column(String(255), nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     user = relationship("User", back_populates="histories")
 
     __table_args__ = (
         Index("idx_hist_user_room_created", "user_id", "room_id", desc("created_at")),
+        # room 구분 없이 유저의 최근 히스토리를 읽을 때 사용
+        Index("idx_hist_user_created", "user_id", desc("created_at")),
+        # 보존 기간 정리(app.jobs.purge_histories)의 범위 배치 삭제
+        Index("idx_hist_created", "created_at"),
         # 3) (선택) 같은 유저가 같은 토픽을 중복 저장 못 하게 하려면 활성화
         # UniqueConstraint("user_id", "topic", name="uq_hist_user_topic"),
     )
\ No newline at end of file
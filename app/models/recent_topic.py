@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+# scope 값: room_id 또는 유저 전체(room 구분 없음)
+ALL_ROOMS = "*"
+
+
+class RecentTopic(Base):
+    """(user, room) / (user, 전체) 별 최근 토픽 윈도우. histories 쓰기 시 함께 갱신된다."""
+    __tablename__ = "recent_topics"
+
+    user_id = Column(Integer, ForeignKey("users.user_id"), primary_key=True)
+    scope = Column(String(200), primary_key=True)
+    # 최신 토픽이 앞에 오는 문자열 배열
+    topics = Column(JSON, nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, JSON
+from app.db.session import Base
+
+
+class UserInterest(Base):
+    """유저별 관심사 프로필: {term: 감쇠 가중치}. histories 쓰기 시 점진적으로 갱신된다."""
+    __tablename__ = "user_interests"
+
+    user_id = Column(Integer, ForeignKey("users.user_id"), primary_key=True)
+    weights = Column(JSON, nullable=False)
+    # 가중치가 마지막으로 감쇠/갱신된 시각(감쇠 기준점)
+    updated_at = Column(DateTime, nullable=False)
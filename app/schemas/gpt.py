@@ -1,7 +1,23 @@
 import re
 from pydantic import model_validator, BaseModel, constr, Field, ConfigDict, ValidationInfo
 from pydantic.types import conlist, UUID
-from typing import Optional
+from typing import Optional, Literal
+from app.core.config import settings
+from app.core.patching import locate_patches, apply_patches
+
+# 프롬프트 작업 유형(/analyze-prompt22 응답, 모델 라우터 특징)
+TaskType = Literal[
+    "qa_fact",
+    "coding",
+    "debugging",
+    "data_analysis",
+    "summarization",
+    "translation_localization",
+    "brainstorming",
+    "planning",
+    "creative_writing",
+    "other",
+]
 
 class RoomTrace(BaseModel):
     device_uuid: str
@@ -11,10 +27,25 @@ class RoomTrace(BaseModel):
 class RecommendInput(BaseModel):
     device_uuid: str
     room_id: Optional[str]
+    # llm: 항상 LLM / local: 로컬 추천만 / auto: LLM이 예산 안에 못 오거나 실패하면 로컬 추천
+    engine: Literal["llm", "local", "auto"] = "auto"
 
 class inputPrompt(BaseModel):
     device_uuid: str
     input_prompt: str
+    # true면 캐시를 건너뛰고 LLM을 새로 호출(결과는 다시 캐시에 저장)
+    bypass_cache: bool = False
+
+class BatchPromptItem(BaseModel):
+    input_prompt: str
+    bypass_cache: bool = False
+
+class BatchAnalyzeInput(BaseModel):
+    device_uuid: str
+    # 배치는 항목 수만큼 요청 수 제한 토큰을 쓰므로 GENERAL burst보다 크게 받으면 통과할 수 없다 -> 스키마에서 422로 막는다
+    items: conlist(BatchPromptItem, min_length=1,
+                   max_length=min(settings.ANALYZE_BATCH_MAX_ITEMS, settings.RATE_LIMIT_BURST)
+                   if settings.RATE_LIMIT_ENABLED else settings.ANALYZE_BATCH_MAX_ITEMS)
 
 class Patch(BaseModel):
     tag: constr(strip_whitespace=True, min_length=1)
@@ -27,7 +58,8 @@ class Patch(BaseModel):
 class outputPrompt(BaseModel):
     topic: constr(strip_whitespace=True, min_length=1, max_length=30)
     patches: conlist(Patch, min_length=1, max_length=30)
-    full_suggestion: constr(strip_whitespace=True, min_length=1)
+    # LLM에게는 받지 않고 원문에 patches를 적용해 서버에서 채운다(모델이 보낸 값은 무시)
+    full_suggestion: Optional[str] = None
 
     @model_validator(mode="after")
     def corss_checks(self, info: ValidationInfo):
@@ -35,25 +67,10 @@ class outputPrompt(BaseModel):
         if not original:
             raise ValueError("원문 프롬프트가 누락되어 교차 검증을 수행할 수 없습니다.")
 
-        search_from = 0
-        # 모든 from_이 원문에 실제 존재 + 원문 내 매칭 구간 비중첩 검사
-        for i, p in enumerate(self.patches):
-            # 1) 모든 from_이 원문에 실제 존재
-            frag= p.from_
-            if frag not in original:
-                raise ValueError(f'patches[{i}].from("{frag}")가 원문에 존재하지 않습니다.')
-
-            # 2) 원문 내 매칭 구간 비중첩 검사
-            # 왼→오 순서 및 비중첩 강제: 이전 매칭 끝 이후에서만 탐색
-            idx = original.find(frag, search_from)
-            if idx == -1:
-                # 원문엔 존재하지만, 이전 점유 이후엔 더 이상 같은 구절이 없음 → 순서/비중첩 위반
-                raise ValueError(
-                    f'순서/비중첩 위반: "{frag}"를 이전 패치 이후 위치에서 비중첩으로 배치할 수 없습니다.'
-                )
-
-            # 다음 탐색 시작점을 현재 매칭의 끝으로 이동 (비중첩 보장)
-            search_from = idx + len(frag)
+        # 모든 from_이 원문에 실제 존재 + 원문 내 매칭 구간 비중첩 검사 (왼→오 한 번 스캔)
+        edits = [(p.from_, p.to) for p in self.patches]
+        positions = locate_patches(original, [frag for frag, _ in edits])
+        self.full_suggestion = apply_patches(original, positions, edits)
 
         return self
 
@@ -0,0 +1,31 @@
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.admission import RateLimiter, Rejected, VIP, set_request_grade
+from app.core.config import settings
+from app.core.metrics import admission_requests
+from app.services import user_service
+
+rate_limiter = RateLimiter(settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST, settings.RATE_LIMIT_MAX_DEVICES)
+
+
+async def admit_async(device_uuid: str, db: AsyncSession, cost: int = 1) -> str:
+    """LLM 라우트 진입 시 호출: 등급 조회(캐시) -> 디바이스별 요청 수 제한(429) -> 요청 등급 설정.
+
+    cost는 이 요청이 쓰는 토큰 수(배치는 항목 수). 등급의 burst보다 크면 기다려도 통과할 수 없으므로 413.
+    설정한 등급은 같은 요청 안의 LLM 호출 대기열 우선순위로 쓰인다.
+    """
+    grade = await user_service.get_grade_async(device_uuid, db)
+    if settings.RATE_LIMIT_ENABLED:
+        multiplier = settings.RATE_LIMIT_VIP_MULTIPLIER if grade == VIP else 1.0
+        if cost > rate_limiter.burst * multiplier:
+            admission_requests.inc("rate", grade, "too_large")
+            raise HTTPException(status_code=413,
+                                detail=f"한 번에 보낼 수 있는 항목 수({int(rate_limiter.burst * multiplier)}개)를 넘었습니다.")
+        wait = rate_limiter.take(device_uuid, multiplier, cost)
+        if wait:
+            admission_requests.inc("rate", grade, "limited")
+            raise Rejected(429, wait, "요청이 너무 잦습니다. 잠시 후 다시 시도해 주세요.")
+    admission_requests.inc("rate", grade, "admitted")
+    set_request_grade(grade)
+    return grade
@@ -1,28 +1,37 @@
+import logging
+
 from app.models.event import Event
-from app.models.user import User
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services import user_service
-from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import insert
+from app.core.metrics import timed_stage
 
+logger = logging.getLogger(__name__)
 
-def create_event(device_uuid:str, input_prompt, result, db:Session) -> Event:
-    user = db.execute(
-        select(User).where(User.device_uuid == device_uuid)
-    ).scalar_one_or_none()
-    if user is None:
-        raise HTTPException(status_code=404, detail="존재하지 않는 device_uuid")
 
-    # tag_list = [p.tag for p in getattr(result, "patches", [])]
-    # tags_distinct_list = list(dict.fromkeys(tag_list))
+def event_values(user_id: int, input_prompt, result) -> dict:
     patches = result.get("patches", [])
     tags = [p["tag"] for p in patches if "tag" in p]
-    new_event = Event(user_id=user.user_id,
-                      input_prompt=input_prompt,
-                      fixed_prompt=result["full_suggestion"],
-                      reason = ''.join(tags))
+    return {"user_id": user_id,
+            "input_prompt": input_prompt,
+            "fixed_prompt": result["full_suggestion"],
+            "reason": ''.join(tags)}
+
+@timed_stage("event")
+async def create_event_async(device_uuid:str, input_prompt, result, db:AsyncSession) -> Event:
+    user_id = await user_service.get_or_create_user_id_async(device_uuid, db)
+
+    new_event = Event(**event_values(user_id, input_prompt, result))
     db.add(new_event)
-    db.commit()
-    db.refresh(new_event)
-    print(f"created events : {new_event.user_id}")
-    return new_event
\ No newline at end of file
+    await db.commit()
+    await db.refresh(new_event)
+    logger.debug("created event: user_id=%s", new_event.user_id)
+    return new_event
+
+@timed_stage("event")
+async def create_events_async(user_id: int, items: list[tuple[str, dict]], db: AsyncSession) -> int:
+    """(input_prompt, result) 목록을 executemany 한 번 + commit 한 번으로 저장한다."""
+    await db.execute(insert(Event), [event_values(user_id, input_prompt, result) for input_prompt, result in items])
+    await db.commit()
+    logger.debug("created events: user_id=%s x%d", user_id, len(items))
+    return len(items)
@@ -0,0 +1,162 @@
+import base64
+import csv
+import io
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import export_rows
+from app.db.session import SessionLocal
+from app.models.event import Event
+from app.models.history import History
+
+# events/histories 내보내기.
+# pk 키셋 페이지(WHERE pk > 마지막 pk ORDER BY pk LIMIT n)를 yield_per(서버 측 커서)로 읽는다.
+# 메모리는 행 수와 상관없이 페이지 하나 분량이고, 페이지마다 트랜잭션을 끝내 긴 스냅샷/잠금을 잡지 않는다(OFFSET 없음).
+# 출력은 gzip NDJSON/CSV. 커서 토큰(테이블 + 필터 + 마지막 pk)으로 끊긴 지점부터 이어 받는다.
+
+FORMATS = ("ndjson", "csv")
+
+
+@dataclass(frozen=True, slots=True)
+class ExportSpec:
+    table: str
+    model: type
+    pk: str
+    columns: tuple[str, ...]
+
+    def column(self, name: str):
+        return getattr(self.model, name)
+
+
+EXPORTS = {
+    "events": ExportSpec("events", Event, "event_id",
+                         ("event_id", "user_id", "input_prompt", "fixed_prompt", "reason", "created_at")),
+    "histories": ExportSpec("histories", History, "history_id",
+                            ("history_id", "user_id", "room_id", "role", "topic", "created_at")),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ExportFilter:
+    """created_at 구간 [since, until)과 user_id 목록. 비어 있으면 제한 없음."""
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    user_ids: tuple[int, ...] = ()
+
+    def conditions(self, spec: ExportSpec) -> list:
+        out = []
+        if self.since is not None:
+            out.append(spec.column("created_at") >= self.since)
+        if self.until is not None:
+            out.append(spec.column("created_at") < self.until)
+        if self.user_ids:
+            out.append(spec.column("user_id").in_(self.user_ids))
+        return out
+
+    def to_dict(self) -> dict:
+        return {"since": self.since.isoformat() if self.since else None,
+                "until": self.until.isoformat() if self.until else None,
+                "user_ids": list(self.user_ids)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ExportFilter":
+        return cls(datetime.fromisoformat(data["since"]) if data.get("since") else None,
+                   datetime.fromisoformat(data["until"]) if data.get("until") else None,
+                   tuple(sorted(int(u) for u in data.get("user_ids") or ())))
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(spec: ExportSpec, filters: ExportFilter, after: int) -> str:
+    raw = json.dumps({"table": spec.table, "after": after, "filters": filters.to_dict()}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[ExportSpec, ExportFilter, int]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return EXPORTS[data["table"]], ExportFilter.from_dict(data["filters"]), int(data["after"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"잘못된 커서 토큰: {e}") from e
+
+
+def chunk_end(db: Session, spec: ExportSpec, filters: ExportFilter, after: int, limit: int) -> Optional[int]:
+    """after 이후 limit번째 행의 pk. 그보다 적게 남았으면 None(이번 조각이 마지막).
+    pk 인덱스만 limit개 건너뛰므로 응답 헤더에 다음 커서를 먼저 실어 보낼 수 있다."""
+    pk = spec.column(spec.pk)
+    end = db.execute(
+        select(pk).where(pk > after, *filters.conditions(spec)).order_by(pk).offset(limit - 1).limit(1)
+    ).scalar()
+    db.rollback()
+    return end
+
+
+def iter_pages(db: Session, spec: ExportSpec, filters: ExportFilter, after: int = 0, until_pk: Optional[int] = None,
+               page_size: Optional[int] = None, fetch_size: Optional[int] = None) -> Iterator[tuple[list[tuple], int]]:
+    """(행 목록, 그 페이지의 마지막 pk)를 pk 순서로. until_pk가 있으면 그 pk까지만."""
+    page_size = page_size or settings.EXPORT_PAGE_ROWS
+    fetch_size = fetch_size or settings.EXPORT_FETCH_ROWS
+    pk = spec.column(spec.pk)
+    columns = [spec.column(name) for name in spec.columns]
+    conditions = filters.conditions(spec)
+    if until_pk is not None:
+        conditions.append(pk <= until_pk)
+    while True:
+        query = (select(*columns).where(pk > after, *conditions).order_by(pk).limit(page_size)
+                 .execution_options(yield_per=fetch_size))
+        rows = [tuple(row) for row in db.execute(query)]
+        # 페이지마다 읽기 트랜잭션을 끝낸다(MySQL purge 지연/메타데이터 잠금 방지)
+        db.rollback()
+        if not rows:
+            return
+        after = rows[-1][0]
+        yield rows, after
+        if len(rows) < page_size:
+            return
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def encode_rows(spec: ExportSpec, fmt: str, rows: list[tuple], header: bool = False) -> bytes:
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps(dict(zip(spec.columns, map(_plain, row))), ensure_ascii=False) + "\n" for row in rows
+        ).encode("utf-8")
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if header:
+        writer.writerow(spec.columns)
+    writer.writerows([_plain(v) for v in row] for row in rows)
+    return buf.getvalue().encode("utf-8")
+
+
+def stream_export(spec: ExportSpec, fmt: str, filters: ExportFilter, after: int = 0,
+                  until_pk: Optional[int] = None, header: bool = True) -> Iterator[bytes]:
+    """gzip 한 멤버로 압축한 내보내기 바이트 스트림(API 응답용). 페이지마다 sync flush해서 바로 흘려보낸다."""
+    compressor = zlib.compressobj(settings.EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31)
+    with SessionLocal() as db:
+        first = True
+        for rows, _ in iter_pages(db, spec, filters, after, until_pk):
+            data = encode_rows(spec, fmt, rows, header=header and first)
+            first = False
+            export_rows.inc(spec.table, fmt, amount=len(rows))
+            yield compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if first and header and fmt == "csv":
+            yield compressor.compress(encode_rows(spec, fmt, [], header=True))
+    yield compressor.flush()
@@ -1,49 +1,22 @@
 from app.models.history import History, MessageRole
-from sqlalchemy.orm import Session
-from app.models.user import User
-from typing import List, Sequence
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services import user_service, topic_window_service, interest_service
+from app.core.cache import invalidate_recommendations
 
-def create_history(in_, role:MessageRole, db:Session):
-    if role == MessageRole.USER.value:
-        query = select(User).where(User.device_uuid == in_.device_uuid)
-        user = db.execute(query).scalar()
+async def create_history_async(in_, role:MessageRole, db:AsyncSession):
+    user_id = await user_service.get_or_create_user_id_async(in_.device_uuid, db)
 
-        new_history = History(
-                user_id=user.user_id,
-                room_id=in_.room_id,
-                role=MessageRole.USER.value,
-                topic=in_.input_prompt)
-        db.add(new_history)
-        db.commit()
-        db.refresh(new_history)
-        return new_history
-    else:
-        query = select(User).where(User.device_uuid == in_.device_uuid)
-        user = db.execute(query).scalar()
+    new_history = History(
+        user_id=user_id,
+        room_id=in_.room_id,
+        role=MessageRole.USER if role == MessageRole.USER.value else MessageRole.AI,
+        topic=in_.input_prompt)
+    db.add(new_history)
+    await db.flush()
+    await topic_window_service.push_topics_async([(user_id, in_.room_id, in_.input_prompt)], db)
+    await interest_service.record_topics_async([(user_id, role, in_.input_prompt)], db)
+    await db.commit()
+    await db.refresh(new_history)
+    invalidate_recommendations(in_.device_uuid, in_.room_id)
+    return new_history
 
-        new_history = History(
-            user_id=user.user_id,
-            room_id=in_.room_id,
-            role=MessageRole.AI,
-            topic=in_.input_prompt)
-        db.add(new_history)
-        db.commit()
-        db.refresh(new_history)
-        return new_history
-
-
-def get_histories(device_uuid: str, room_id: str, db: Session):
-    query = select(User).where(User.device_uuid == device_uuid)
-    user = db.execute(query).scalar()
-    query = select(History).where(History.user_id == user.user_id and History.room_id == room_id).order_by(History.created_at.desc()).limit(5)
-    histories : Sequence[History] = db.execute(query).scalars().all()
-    return histories
-
-def get_histories_new(device_uuid: str, db: Session):
-    query = select(User).where(User.device_uuid == device_uuid)
-    user = db.execute(query).scalar()
-    query = select(History).where(History.user_id == user.user_id).order_by(
-        History.created_at.desc()).limit(20)
-    histories: Sequence[History] = db.execute(query).scalars().all()
-    return histories
\ No newline at end of file
@@ -0,0 +1,86 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.interests import update_profile, top_interests
+from app.models.user_interest import UserInterest
+from app.services import user_service
+
+# 추천 요청마다 원문 토픽 20개를 보내는 대신, histories 쓰기 시점에 유저별 관심사 가중치를
+# 점진적으로 갱신해 두고 추천 때는 상위 K개 term만 보낸다.
+# entries: (user_id, role, topic) 목록. commit은 호출 측 책임.
+# 감쇠 기준 시각은 DB 시계(CURRENT_TIMESTAMP)로 잡는다. histories.created_at도 DB 시계로 채워지므로
+# 점진 갱신과 재구성(app.jobs.rebuild_interests, created_at 기준)이 같은 시간축에서 감쇠된다.
+
+
+def _group(entries: Iterable[tuple[int, str, str]]) -> dict[int, list[tuple[str, str]]]:
+    grouped = defaultdict(list)
+    for user_id, role, topic in entries:
+        grouped[user_id].append((getattr(role, "value", role), topic))
+    return grouped
+
+
+def _profiles_query(user_ids):
+    # 같은 유저의 동시 쓰기가 서로의 갱신을 덮어쓰지 않도록 행 잠금(sqlite는 무시)
+    return (select(UserInterest.user_id, UserInterest.weights, UserInterest.updated_at)
+            .where(UserInterest.user_id.in_(user_ids))
+            .with_for_update())
+
+
+def _as_datetime(value) -> datetime:
+    # sqlite는 CURRENT_TIMESTAMP를 문자열로 돌려준다
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _merge(grouped, existing: dict, now: datetime) -> list[dict]:
+    rows = []
+    for user_id, topics in grouped.items():
+        weights, updated_at = existing.get(user_id, ({}, None))
+        rows.append({
+            "user_id": user_id,
+            "weights": update_profile(weights or {}, updated_at, topics, now),
+            "updated_at": now,
+        })
+    return rows
+
+
+def upsert_profiles(dialect: str, rows: list[dict]):
+    if dialect == "mysql":
+        stmt = mysql_insert(UserInterest).values(rows)
+        return stmt.on_duplicate_key_update(weights=stmt.inserted.weights, updated_at=stmt.inserted.updated_at)
+    # sqlite(지원 dialect는 app.db.session.SUPPORTED_DIALECTS에서 엔진 생성 시 확인)
+    stmt = sqlite_insert(UserInterest).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={"weights": stmt.excluded.weights, "updated_at": stmt.excluded.updated_at},
+    )
+
+
+async def record_topics_async(entries: Iterable[tuple[int, str, str]], db: AsyncSession,
+                              now: Optional[datetime] = None) -> None:
+    grouped = _group(entries)
+    if not grouped:
+        return
+    result = await db.execute(_profiles_query(list(grouped)))
+    existing = {r.user_id: (r.weights, r.updated_at) for r in result}
+    if now is None:
+        now = _as_datetime((await db.execute(select(func.current_timestamp()))).scalar())
+    rows = _merge(grouped, existing, now)
+    await db.execute(upsert_profiles(db.get_bind().dialect.name, rows))
+
+
+async def get_profile_async(user_id: int, db: AsyncSession) -> dict[str, float]:
+    query = select(UserInterest.weights).where(UserInterest.user_id == user_id)
+    return (await db.execute(query)).scalar() or {}
+
+
+async def get_top_interests_async(device_uuid: str, db: AsyncSession, k: Optional[int] = None) -> list[str]:
+    user_id = await user_service.find_user_id_async(device_uuid, db)
+    if user_id is None:
+        return []
+    return top_interests(await get_profile_async(user_id, db), k)
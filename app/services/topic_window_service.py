@@ -0,0 +1,108 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.history import History
+from app.models.recent_topic import RecentTopic, ALL_ROOMS
+from app.services import user_service
+
+# 추천 화면은 히스토리 전체가 아니라 최근 N개 토픽만 필요하다.
+# 쓰기 시점에 바뀐 (user, room)/(user, 전체) 윈도우에 새 토픽을 앞에 붙이고 한도로 잘라 recent_topics에 저장하고,
+# 읽기는 recent_topics PK 한 건 조회로 끝낸다.
+# 배치 하나의 윈도우 갱신은 기존 윈도우 조회(잠금) 한 번 + upsert 한 번. 아직 윈도우가 없는 scope만 인덱스로 계산한다.
+
+
+def _limit(scope: str) -> int:
+    return settings.RECENT_TOPICS_USER_LIMIT if scope == ALL_ROOMS else settings.RECENT_TOPICS_ROOM_LIMIT
+
+
+def _window_query(user_id: int, scope: str):
+    if scope == ALL_ROOMS:
+        # idx_hist_user_created
+        return (select(History.topic).where(History.user_id == user_id)
+                .order_by(History.created_at.desc(), History.history_id.desc())
+                .limit(settings.RECENT_TOPICS_USER_LIMIT))
+    # idx_hist_user_room_created
+    return (select(History.topic).where(History.user_id == user_id, History.room_id == scope)
+            .order_by(History.created_at.desc(), History.history_id.desc())
+            .limit(settings.RECENT_TOPICS_ROOM_LIMIT))
+
+
+def _new_topics(entries: Iterable[tuple[int, str, str]]) -> dict[tuple[int, str], list[str]]:
+    """(user_id, scope) -> 이번에 들어온 토픽(최신순). entries는 삽입 순서."""
+    added: dict[tuple[int, str], list[str]] = {}
+    for user_id, room_id, topic in entries:
+        added.setdefault((user_id, room_id), []).append(topic)
+        added.setdefault((user_id, ALL_ROOMS), []).append(topic)
+    for topics in added.values():
+        topics.reverse()
+    return added
+
+
+def _windows_query(scopes: list[tuple[int, str]]):
+    # 같은 윈도우를 동시에 갱신하는 트랜잭션이 서로의 토픽을 덮어쓰지 않도록 행 잠금(sqlite는 무시)
+    return (select(RecentTopic.user_id, RecentTopic.scope, RecentTopic.topics)
+            .where(tuple_(RecentTopic.user_id, RecentTopic.scope).in_(scopes))
+            .with_for_update())
+
+
+def _upsert_windows(dialect: str, rows: list[dict]):
+    if dialect == "mysql":
+        stmt = mysql_insert(RecentTopic).values(rows)
+        return stmt.on_duplicate_key_update(topics=stmt.inserted.topics, updated_at=func.now())
+    # sqlite(지원 dialect는 app.db.session.SUPPORTED_DIALECTS에서 엔진 생성 시 확인)
+    stmt = sqlite_insert(RecentTopic).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=["user_id", "scope"],
+        set_={"topics": stmt.excluded.topics, "updated_at": func.now()},
+    )
+
+
+async def _refresh_scopes_async(scopes: Iterable[tuple[int, str]], db: AsyncSession) -> list[dict]:
+    rows = [
+        {"user_id": user_id, "scope": scope, "topics": list((await db.execute(_window_query(user_id, scope))).scalars())}
+        for user_id, scope in scopes
+    ]
+    if rows:
+        await db.execute(_upsert_windows(db.get_bind().dialect.name, rows))
+    return rows
+
+
+async def push_topics_async(entries: Iterable[tuple[int, str, str]], db: AsyncSession) -> None:
+    """새 히스토리 (user_id, room_id, topic)를 삽입 순서대로 받아 윈도우 앞에 붙인다.
+    히스토리를 flush한 뒤 같은 트랜잭션 안에서 호출한다. commit은 호출 측 책임."""
+    added = _new_topics(entries)
+    if not added:
+        return
+    existing = {(r.user_id, r.scope): r.topics for r in await db.execute(_windows_query(list(added)))}
+    rows = [
+        {"user_id": user_id, "scope": scope, "topics": (topics + list(existing[user_id, scope]))[:_limit(scope)]}
+        for (user_id, scope), topics in added.items() if (user_id, scope) in existing
+    ]
+    if rows:
+        await db.execute(_upsert_windows(db.get_bind().dialect.name, rows))
+    # 처음 생기는 scope(새 room, 윈도우 도입 이전 유저): 방금 flush한 행까지 인덱스로 계산
+    missing = [key for key in added if key not in existing]
+    if missing:
+        await _refresh_scopes_async(missing, db)
+
+
+async def get_recent_topics_async(device_uuid: str, room_id: Optional[str], db: AsyncSession) -> list[str]:
+    """최신순 토픽 목록. room_id가 None이면 유저 전체 기준."""
+    user_id = await user_service.find_user_id_async(device_uuid, db)
+    if user_id is None:
+        return []
+    scope = room_id if room_id is not None else ALL_ROOMS
+    query = select(RecentTopic.topics).where(RecentTopic.user_id == user_id, RecentTopic.scope == scope)
+    topics = (await db.execute(query)).scalar()
+    if topics is not None:
+        return list(topics)
+
+    # 윈도우 도입 이전 데이터: 처음 읽을 때 한 번만 인덱스로 계산해 채워 둔다
+    rows = await _refresh_scopes_async([(user_id, scope)], db)
+    await db.commit()
+    return rows[0]["topics"]
@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+
+from app.core.cache import invalidate_recommendations
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.history import History, MessageRole
+from app.models.user import User
+from app.services import user_service, topic_window_service, interest_service
+
+logger = logging.getLogger(__name__)
+
+# 배치 executemany가 한 행 때문에 통째로 실패하지 않도록 컬럼 길이를 큐에 넣기 전에 맞춘다
+TOPIC_MAX_CHARS = History.topic.type.length
+ROOM_ID_MAX_CHARS = History.room_id.type.length
+DEVICE_UUID_MAX_CHARS = User.device_uuid.type.length
+
+
+@dataclass(slots=True)
+class TraceItem:
+    device_uuid: str
+    room_id: str
+    role: MessageRole
+    topic: str
+
+
+class TraceBuffer:
+    """/trace_input, /trace_output_prompt 용 write-behind 버퍼.
+
+    요청은 큐에 넣고 바로 응답하며, 백그라운드 태스크가 batch_size개 또는
+    flush_interval초마다 모아서 users/histories에 bulk insert(executemany)한다.
+    큐가 가득 차면 put_timeout만큼 기다린 뒤 503으로 거절한다(backpressure).
+    topic은 컬럼 길이로 자르고, 자를 수 없는 키(device_uuid/room_id)가 너무 길면 넣을 때 422로 거절한다.
+    배치가 재시도 후에도 실패하면 행 단위로 나눠 써서 문제 있는 행만 버린다.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        put_timeout: float,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._session_factory = session_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_rows = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._run(), name="trace-buffer")
+
+    async def stop(self) -> None:
+        """종료 시 큐에 남은 항목을 모두 flush한다."""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def put(self, device_uuid: str, room_id: str, role: MessageRole, topic: str) -> None:
+        if len(device_uuid) > DEVICE_UUID_MAX_CHARS or len(room_id) > ROOM_ID_MAX_CHARS:
+            raise HTTPException(status_code=422,
+                                detail=f"device_uuid는 {DEVICE_UUID_MAX_CHARS}자, room_id는 {ROOM_ID_MAX_CHARS}자 이하여야 합니다.")
+        item = TraceItem(device_uuid, room_id, role, topic[:TOPIC_MAX_CHARS])
+        try:
+            await asyncio.wait_for(self._queue.put(item), timeout=self.put_timeout)
+        except TimeoutError:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="trace 수집 대기열이 가득 찼습니다.",
+                headers={"Retry-After": "1"},
+            )
+        self.enqueued += 1
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+        # 종료 신호 이후 남은 항목 정리
+        rest = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                rest.append(item)
+        for i in range(0, len(rest), self.batch_size):
+            await self._flush(rest[i:i + self.batch_size])
+
+    async def _flush(self, batch: list[TraceItem]) -> None:
+        started = time.perf_counter()
+        # 일시적인 DB 오류(커넥션 끊김 등)에 대비해 한 번 재시도
+        for attempt in range(2):
+            try:
+                async with self._session_factory() as db:
+                    await self._write(batch, db)
+                break
+            except Exception:
+                if attempt == 1:
+                    logger.exception("trace buffer flush failed (%d rows), retrying row by row", len(batch))
+                    batch = await self._flush_rows(batch)
+        self.flushes += 1
+        self.flushed_rows += len(batch)
+        self.last_flush_ms = round((time.perf_counter() - started) * 1000, 3)
+        for key in {(t.device_uuid, t.room_id) for t in batch}:
+            invalidate_recommendations(*key)
+
+    async def _flush_rows(self, batch: list[TraceItem]) -> list[TraceItem]:
+        """행마다 따로 써서 DB가 거부한 행만 버린다. 저장된 행 목록을 돌려준다."""
+        written = []
+        for item in batch:
+            try:
+                async with self._session_factory() as db:
+                    await self._write([item], db)
+                written.append(item)
+            except Exception as e:
+                self.failed_rows += 1
+                logger.warning("trace row dropped (device_uuid=%s room_id=%s): %s", item.device_uuid, item.room_id, e)
+        return written
+
+    @staticmethod
+    async def _write(batch: list[TraceItem], db) -> None:
+        user_ids = await user_service.resolve_user_ids_async((t.device_uuid for t in batch), db)
+        await db.execute(insert(History), [
+            {"user_id": user_ids[t.device_uuid], "room_id": t.room_id, "role": t.role, "topic": t.topic}
+            for t in batch
+        ])
+        await topic_window_service.push_topics_async(
+            [(user_ids[t.device_uuid], t.room_id, t.topic) for t in batch], db
+        )
+        await interest_service.record_topics_async(
+            [(user_ids[t.device_uuid], t.role, t.topic) for t in batch], db
+        )
+        await db.commit()
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queue_size": self._queue.qsize() if self._queue else 0,
+            "max_size": self.max_size,
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failed_rows": self.failed_rows,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+trace_buffer = TraceBuffer(
+    max_size=settings.TRACE_BUFFER_MAX_SIZE,
+    batch_size=settings.TRACE_BUFFER_BATCH_SIZE,
+    flush_interval=settings.TRACE_BUFFER_FLUSH_MS / 1000,
+    put_timeout=settings.TRACE_BUFFER_PUT_TIMEOUT_MS / 1000,
+)
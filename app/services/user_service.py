@@ -1,19 +1,84 @@
-from sqlalchemy.orm import Session
-from app.models.user import User
-from sqlalchemy import select
-
-def is_exist_user(device_uuid:str, db: Session) -> bool:
-    query = select(User).where(User.device_uuid == device_uuid)
-    user = db.execute(query).scalar()
-    if user is None:
-        return False
+from typing import Iterable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import timed_stage
+from app.models.user import User, Grade
+from sqlalchemy import select, func
+
+# device_uuid -> user_id. 유저 row는 삭제하지 않으므로 TTL 없이 LRU 크기로만 제한
+user_id_cache = TTLCache(settings.USER_ID_CACHE_MAX_ENTRIES)
+
+
+# device_uuid -> 등급 이름(GENERAL/VIP). 수용 제어에서 매 요청 조회하므로 TTL 캐시
+user_grade_cache = TTLCache(settings.USER_ID_CACHE_MAX_ENTRIES, settings.USER_GRADE_CACHE_TTL_SECONDS)
+
+
+def _upsert_users(dialect: str, device_uuids: list[str]):
+    """이미 있는 device_uuid는 건드리지 않는 INSERT 문(동시 첫 요청의 unique 충돌 방지)."""
+    rows = [{"device_uuid": d} for d in device_uuids]
+    if dialect == "mysql":
+        # LAST_INSERT_ID(expr): 중복이어도 lastrowid로 기존 user_id를 돌려받는다
+        stmt = mysql_insert(User).values(rows)
+        return stmt.on_duplicate_key_update(user_id=func.last_insert_id(User.user_id))
+    # sqlite(지원 dialect는 app.db.session.SUPPORTED_DIALECTS에서 엔진 생성 시 확인)
+    return sqlite_insert(User).values(rows).on_conflict_do_nothing(index_elements=["device_uuid"])
+
+
+@timed_stage("user")
+async def get_or_create_user_id_async(device_uuid: str, db: AsyncSession) -> int:
+    user_id = user_id_cache.get(device_uuid)
+    if user_id is not None:
+        return user_id
+
+    dialect = db.get_bind().dialect.name
+    result = await db.execute(_upsert_users(dialect, [device_uuid]))
+    if dialect == "mysql":
+        user_id = result.lastrowid
     else:
-        return True
+        user_id = (await db.execute(select(User.user_id).where(User.device_uuid == device_uuid))).scalar_one()
+    await db.commit()
+    user_id_cache.set(device_uuid, user_id)
+    return user_id
+
+
+async def find_user_id_async(device_uuid: str, db: AsyncSession) -> Optional[int]:
+    user_id = user_id_cache.get(device_uuid)
+    if user_id is None:
+        user_id = (await db.execute(select(User.user_id).where(User.device_uuid == device_uuid))).scalar()
+        if user_id is not None:
+            user_id_cache.set(device_uuid, user_id)
+    return user_id
+
+
+async def resolve_user_ids_async(device_uuids: Iterable[str], db: AsyncSession) -> dict[str, int]:
+    """여러 device_uuid를 한 번에 user_id로 바꾼다(없으면 생성). 호출 측에서 commit한다."""
+    user_ids = {}
+    missing = []
+    for d in set(device_uuids):
+        user_id = user_id_cache.get(d)
+        if user_id is None:
+            missing.append(d)
+        else:
+            user_ids[d] = user_id
+    if missing:
+        dialect = db.get_bind().dialect.name
+        await db.execute(_upsert_users(dialect, missing))
+        rows = (await db.execute(select(User.device_uuid, User.user_id).where(User.device_uuid.in_(missing)))).all()
+        for d, user_id in rows:
+            user_ids[d] = user_id
+            user_id_cache.set(d, user_id)
+    return user_ids
 
-def create_user(device_uuid:str, db: Session):
-    new_user = User(device_uuid=device_uuid)
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    print(f"created users : {new_user.user_id}")
 
+@timed_stage("user")
+async def get_grade_async(device_uuid: str, db: AsyncSession) -> str:
+    """유저 등급 이름. 아직 없는 유저나 등급이 비어 있으면 GENERAL."""
+    grade = user_grade_cache.get(device_uuid)
+    if grade is None:
+        value = (await db.execute(select(User.grade).where(User.device_uuid == device_uuid))).scalar()
+        grade = (value or Grade.GENERAL).name
+        user_grade_cache.set(device_uuid, grade)
+    return grade
@@ -0,0 +1,76 @@
+"""
+LLM 응답 JSON 로컬 복구(app.core.json_repair) 회귀 검사 + 마이크로벤치마크.
+
+실제로 본 깨진 응답 모양(CASES)마다 복구 결과가 기대값과 같은지 확인하고(다르면 종료 코드 1),
+케이스별 복구 시간(p50/max)을 보여 준다.
+
+    python -m benchmarks.json_repair --repeat 500
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+from app.core.json_repair import repair_json
+
+# (이름, 깨진 응답, 기대 값)
+CASES = [
+    ("missing_comma",
+     '{"topic": "도커" "patches": []}',
+     {"topic": "도커", "patches": []}),
+    # "..." 값 안의 “…” 인용은 닫는 따옴표가 아니다(다른 곳의 쉼표 누락으로 복구 경로를 탈 때 잘리지 않아야 한다)
+    ("smart_quotes_inside_value",
+     '{"topic": "설명" "patches": [{"tag": "t", "from": "설명해줘", "to": "“핵심”, “예시”, “한계” 순서로 설명해줘"}]}',
+     {"topic": "설명", "patches": [{"tag": "t", "from": "설명해줘", "to": "“핵심”, “예시”, “한계” 순서로 설명해줘"}]}),
+    ("smart_quoted_keys",
+     '{“topic”: “도커”, "patches": []}',
+     {"topic": "도커", "patches": []}),
+    ("single_quotes_truncated",
+     "{'topic': '‘따옴표’ 안의 말', 'patches': []",
+     {"topic": "‘따옴표’ 안의 말", "patches": []}),
+    ("unescaped_quote",
+     '{"topic": "x", "to": "그는 "안녕"이라고 했다"}',
+     {"topic": "x", "to": '그는 "안녕"이라고 했다'}),
+    ("fence_trailing_comma",
+     '```json\n{"topic": "도커", "patches": [{"tag": "t", "from": "a", "to": "b"},],}\n```',
+     {"topic": "도커", "patches": [{"tag": "t", "from": "a", "to": "b"}]}),
+    ("truncated_patch",
+     '{"topic": "도커", "patches": [{"tag": "t", "from": "a", "to": "b"}, {"tag": "t", "from": "c", "to"',
+     {"topic": "도커", "patches": [{"tag": "t", "from": "a", "to": "b"}]}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    failures, timings = [], {}
+    for name, raw, expected in CASES:
+        try:
+            value, fixes = repair_json(raw)
+        except ValueError as e:
+            value, fixes = f"ValueError: {e}", []
+        if value != expected:
+            failures.append({"case": name, "got": value, "expected": expected})
+        samples = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            try:
+                repair_json(raw)
+            except ValueError:
+                pass
+            samples.append((time.perf_counter() - started) * 1e6)
+        samples.sort()
+        timings[name] = {"fixes": fixes, "p50_us": round(samples[len(samples) // 2], 1), "max_us": round(samples[-1], 1)}
+
+    print(json.dumps({"cases": len(CASES), "failures": failures, "timings": timings}, ensure_ascii=False, indent=2))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
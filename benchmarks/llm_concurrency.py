@@ -0,0 +1,88 @@
+"""
+N개의 동시 요청이 하나의 워커 안에서 LLM 호출을 겹쳐 진행하는지 확인하는 부하 테스트.
+
+실제 OpenAI 대신 고정 지연 후 응답하는 가짜 업스트림(httpx.MockTransport)을 붙이고,
+/api/analyze-prompt22 에 N개 요청을 동시에 보낸다. 호출이 이벤트 루프를 막지 않으면
+전체 소요 시간은 N * latency 가 아니라 latency 근처에 머문다.
+
+    python -m benchmarks.llm_concurrency --requests 20 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+import httpx
+
+from app.core.llm import LLMClient, get_llm_client
+from app.main import app
+
+FAKE_PAYLOAD = {
+    "improved_prompt": "Docker의 컨테이너 개념을 3가지 핵심 포인트로 설명해줘.",
+    "task_type": "qa_fact",
+}
+
+
+def make_fake_upstream(latency: float) -> httpx.AsyncClient:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json={
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o-mini",
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": json.dumps(FAKE_PAYLOAD, ensure_ascii=False)},
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        })
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def run(n: int, latency: float, concurrency: int) -> dict:
+    llm = LLMClient(max_concurrency=concurrency, http_client=make_fake_upstream(latency))
+    app.dependency_overrides[get_llm_client] = lambda: llm
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def one(i: int) -> float:
+            t0 = time.perf_counter()
+            r = await client.post("/api/analyze-prompt22", json={"prompt": f"도커에 대해 설명해줘 {i}"})
+            r.raise_for_status()
+            return time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        latencies = await asyncio.gather(*(one(i) for i in range(n)))
+        wall = time.perf_counter() - t0
+
+    app.dependency_overrides.pop(get_llm_client, None)
+    await llm.aclose()
+    return {
+        "requests": n,
+        "upstream_latency_s": latency,
+        "max_concurrency": concurrency,
+        "wall_s": round(wall, 3),
+        "serial_estimate_s": round(n * latency, 3),
+        # 1이면 완전 직렬, n이면 완전 병렬
+        "overlap_factor": round(sum(latencies) / wall, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.requests, args.latency, args.concurrency)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+LLM 호출 복원력(hedged request / 호출 기한 / 서킷 브레이커) 벤치마크.
+
+가짜 업스트림(httpx.MockTransport)에 지연을 주입해 LLMClient.chat을 직접 호출한다.
+- tail: 대부분 base 지연이고 일부(--stall-rate)가 --stall 초 동안 멈추는 업스트림에서
+  hedge 끔/켬의 p50/p95/p99와 추가 업스트림 호출 비율을 비교한다
+- deadline: 업스트림이 --stall 초 멈출 때 호출 기한(--deadline)에서 504로 끊기는지
+- circuit: 업스트림이 계속 500을 낼 때 서킷이 열린 뒤 거절이 얼마나 빨라지는지
+
+    python -m benchmarks.llm_resilience --requests 400 --stall-rate 0.03 --stall 2.0
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+import httpx
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.llm import LLMClient
+
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o-mini",
+    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "{}"}}],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+}
+
+
+def make_upstream(base: float, jitter: float, stall_rate: float, stall: float, error_rate: float,
+                  rng: random.Random, stats: dict) -> httpx.AsyncClient:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        stats["upstream_calls"] += 1
+        if rng.random() < error_rate:
+            await asyncio.sleep(base)
+            return httpx.Response(500, json={"error": {"message": "injected", "type": "server_error"}})
+        delay = stall if rng.random() < stall_rate else base + rng.random() * jitter
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json=COMPLETION)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def summary(latencies: list[float]) -> dict:
+    ordered = sorted(latencies)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1)
+    return {"p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": round(ordered[-1] * 1000, 1),
+            "mean_ms": round(statistics.fmean(ordered) * 1000, 1)}
+
+
+async def drive(llm: LLMClient, n: int, concurrency: int, timeout: float) -> tuple[list[float], dict]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], {}
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await llm.chat(model="gpt-4o-mini", messages=[{"role": "user", "content": f"q{i}"}], timeout=timeout)
+                status = 200
+            except HTTPException as e:
+                status = e.status_code
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return latencies, statuses
+
+
+async def tail(args, hedge: bool) -> dict:
+    settings.LLM_HEDGE_ENABLED = hedge
+    stats = {"upstream_calls": 0}
+    rng = random.Random(args.seed)
+    llm = LLMClient(max_concurrency=64, http_client=make_upstream(args.base, args.jitter, args.stall_rate,
+                                                                  args.stall, 0.0, rng, stats))
+    # p95 표본을 먼저 채운다(hedge는 표본이 LLM_HEDGE_MIN_SAMPLES개 모인 뒤부터)
+    await drive(llm, settings.LLM_HEDGE_MIN_SAMPLES * 2, args.concurrency, settings.LLM_TIMEOUT_ANALYZE)
+    stats["upstream_calls"] = 0
+    latencies, statuses = await drive(llm, args.requests, args.concurrency, settings.LLM_TIMEOUT_ANALYZE)
+    await llm.aclose()
+    window = next(iter(llm.latency.values()))
+    delay = max(window.percentile(settings.LLM_HEDGE_PERCENTILE), settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+    return {"hedge": hedge, **summary(latencies), "statuses": statuses,
+            "hedge_delay_ms": round(delay * 1000, 1) if hedge else None,
+            "extra_upstream_calls": f"{(stats['upstream_calls'] - args.requests) / args.requests * 100:.1f}%"}
+
+
+async def deadline(args) -> dict:
+    stats = {"upstream_calls": 0}
+    llm = LLMClient(http_client=make_upstream(args.stall, 0.0, 0.0, args.stall, 0.0, random.Random(0), stats))
+    latencies, statuses = await drive(llm, 10, 10, args.deadline)
+    await llm.aclose()
+    return {"upstream_latency_s": args.stall, "deadline_s": args.deadline, **summary(latencies), "statuses": statuses}
+
+
+async def circuit(args) -> dict:
+    stats = {"upstream_calls": 0}
+    llm = LLMClient(http_client=make_upstream(args.base, 0.0, 0.0, 0.0, 1.0, random.Random(0), stats))
+    n = settings.CIRCUIT_MIN_CALLS * 5
+    latencies, statuses = await drive(llm, n, 1, args.deadline)
+    await llm.aclose()
+    before, after = latencies[:settings.CIRCUIT_MIN_CALLS], latencies[settings.CIRCUIT_MIN_CALLS:]
+    return {"requests": n, "upstream_calls": stats["upstream_calls"], "statuses": statuses,
+            "failing_upstream_mean_ms": round(statistics.fmean(before) * 1000, 2),
+            "circuit_open_mean_ms": round(statistics.fmean(after) * 1000, 3), "breaker": llm.breaker.stats()}
+
+
+async def run(args) -> dict:
+    # 재시도는 SDK 기본값 대신 이 벤치마크에서 끈다(주입한 지연/오류가 그대로 보이도록)
+    settings.OPENAI_MAX_RETRIES = 0
+    settings.LLM_HEDGE_MIN_DELAY_SECONDS = args.hedge_min_delay
+    return {
+        "tail": [await tail(args, False), await tail(args, True)],
+        "deadline": await deadline(args),
+        "circuit": await circuit(args),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--base", type=float, default=0.05, help="정상 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.03)
+    parser.add_argument("--stall-rate", type=float, default=0.03, help="멈춘 연결 비율")
+    parser.add_argument("--stall", type=float, default=2.0, help="멈춘 연결의 지연(초)")
+    parser.add_argument("--deadline", type=float, default=1.0, help="deadline/circuit 단계의 호출 기한(초)")
+    parser.add_argument("--hedge-min-delay", type=float, default=settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
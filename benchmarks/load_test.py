@@ -0,0 +1,262 @@
+"""
+엔드투엔드 부하 테스트: mock OpenAI 서버 + uvicorn으로 띄운 app.main:app 에 실제 HTTP로 요청을 보낸다.
+
+1) benchmarks.mock_openai 를 지정한 지연/지터/에러율로 띄우고
+2) OPENAI_BASE_URL을 mock으로 돌린 app.main:app 을 sqlite(기본) 또는 MySQL(--database-url) 위에 띄운 뒤
+3) /api/analyze-prompt2, /api/trace_input, /api/trace_output_prompt, /api/recommended-prompts 를
+   목표 동시성으로 호출해 p50/p95/p99, RPS, 상태 코드 분포를 잰다.
+결과는 커밋 SHA와 설정을 포함한 JSON으로 benchmarks/results/ 에 저장되며, --baseline 으로
+이전 결과 파일을 주면 엔드포인트별 변화량을 함께 출력한다.
+
+    python -m benchmarks.load_test --concurrency 32 --requests 500
+    python -m benchmarks.load_test --database-url mysql+pymysql://user:pw@127.0.0.1:3306/bench --migrate
+    python -m benchmarks.load_test --baseline benchmarks/results/<이전 결과>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+ENDPOINTS = ("analyze-prompt2", "trace_input", "trace_output_prompt", "recommended-prompts")
+
+PROMPTS = [
+    "도커 컨테이너와 가상머신 차이 설명해줘",
+    "파이썬 asyncio 이벤트 루프 동작 원리 알려줘",
+    "mysql 인덱스 설계할 때 주의할 점",
+    "fastapi 의존성 주입 예제 보여줘",
+    "react 상태 관리 라이브러리 비교해줘",
+    "영어 회화 공부 루틴 짜줘",
+    "자취생 저녁 메뉴 추천해줘",
+    "git rebase와 merge 차이",
+]
+
+
+def git_sha() -> str:
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True).strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], cwd=ROOT).returncode != 0
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def prepare_database(database_url: str, migrate: bool) -> None:
+    env = {**os.environ, "DATABASE_URL": database_url, "OPENAI_API_KEY": "sk-bench"}
+    if migrate:
+        # MySQL 등 실제 스키마는 alembic 마이그레이션으로 맞춘다
+        subprocess.run(["alembic", "upgrade", "head"], cwd=ROOT, env=env, check=True)
+        return
+    code = "import app.models; from app.db.session import Base, engine; Base.metadata.create_all(engine)"
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True)
+
+
+def spawn(args: list[str], env: dict) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", *args], cwd=ROOT, env={**os.environ, **env})
+
+
+async def wait_ready(url: str, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{url} 프로세스가 종료됨 (exit {proc.returncode})")
+            try:
+                await client.get(url, timeout=1.0)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise TimeoutError(f"{url} 준비 대기 시간 초과")
+
+
+def request_for(endpoint: str, i: int, args) -> tuple[str, dict]:
+    device = f"load-device-{i % args.devices}"
+    room = f"room-{i % 3}"
+    prompt = PROMPTS[i % len(PROMPTS)]
+    if endpoint == "analyze-prompt2":
+        # unique_ratio 비율만큼은 캐시에 없는 새 프롬프트
+        if random.random() < args.unique_ratio:
+            prompt = f"{prompt} ({i})"
+        return "/api/analyze-prompt2", {"device_uuid": device, "input_prompt": prompt}
+    if endpoint in ("trace_input", "trace_output_prompt"):
+        return f"/api/{endpoint}", {"device_uuid": device, "room_id": room, "input_prompt": prompt}
+    return "/api/recommended-prompts", {
+        "device_uuid": device,
+        "room_id": None if i % 2 else room,
+        "engine": args.recommend_engine,
+    }
+
+
+async def drive(client: httpx.AsyncClient, endpoint: str, args) -> dict:
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    sem = asyncio.Semaphore(args.concurrency)
+
+    async def one(i: int) -> None:
+        path, body = request_for(endpoint, i, args)
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                r = await client.post(path, json=body)
+                status = str(r.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - t0)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    wall = time.perf_counter() - started
+    ok = statuses.get("200", 0)
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "rps": round(args.requests / wall, 1),
+        "ok_rps": round(ok / wall, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2),
+        "statuses": statuses,
+    }
+
+
+async def seed(client: httpx.AsyncClient, args) -> None:
+    # 추천 엔드포인트가 빈 배열로 끝나지 않도록 디바이스마다 히스토리를 몇 개씩 넣어 둔다
+    sem = asyncio.Semaphore(args.concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            await client.post("/api/trace_input", json={
+                "device_uuid": f"load-device-{i % args.devices}",
+                "room_id": f"room-{i % 3}",
+                "input_prompt": PROMPTS[i % len(PROMPTS)],
+            })
+
+    await asyncio.gather(*(one(i) for i in range(args.devices * 3)))
+    await asyncio.sleep(0.5)  # trace 버퍼 flush 대기
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    diff = {}
+    for endpoint, cur in current["results"].items():
+        base = baseline.get("results", {}).get(endpoint)
+        if not base:
+            continue
+        diff[endpoint] = {
+            key: f"{(cur[key] - base[key]) / base[key] * 100:+.1f}%"
+            for key in ("rps", "p50_ms", "p95_ms", "p99_ms") if base.get(key)
+        }
+    return diff
+
+
+async def main_async(args) -> dict:
+    database_url = args.database_url or f"sqlite:///{RESULTS_DIR / 'load_test.db'}"
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    if database_url.startswith("sqlite"):
+        Path(database_url.removeprefix("sqlite:///")).unlink(missing_ok=True)
+    prepare_database(database_url, args.migrate)
+
+    mock = spawn(["uvicorn", "benchmarks.mock_openai:app", "--port", str(args.mock_port), "--log-level", "warning"], {
+        "MOCK_LATENCY": str(args.latency),
+        "MOCK_JITTER": str(args.jitter),
+        "MOCK_ERROR_RATE": str(args.error_rate),
+        **({"MOCK_OUTPUTS": args.outputs} if args.outputs else {}),
+    })
+    server = spawn(["uvicorn", "app.main:app", "--port", str(args.app_port), "--log-level", "warning",
+                    "--workers", str(args.workers)], {
+        "OPENAI_API_KEY": "sk-bench",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.mock_port}/v1",
+        "DATABASE_URL": database_url,
+    })
+    try:
+        await wait_ready(f"http://127.0.0.1:{args.mock_port}/stats", mock)
+        await wait_ready(f"http://127.0.0.1:{args.app_port}/openapi.json", server)
+
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.app_port}", limits=limits,
+                                     timeout=args.timeout) as client:
+            await seed(client, args)
+            results = {}
+            for endpoint in args.endpoints:
+                results[endpoint] = await drive(client, endpoint, args)
+                print(endpoint, json.dumps(results[endpoint], ensure_ascii=False))
+            mock_stats = (await client.get(f"http://127.0.0.1:{args.mock_port}/stats")).json()
+    finally:
+        for proc in (server, mock):
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    return {
+        "commit": git_sha(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "database": database_url.split("://")[0],
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "devices": args.devices,
+            "upstream_latency_s": args.latency,
+            "upstream_jitter_s": args.jitter,
+            "upstream_error_rate": args.error_rate,
+            "unique_ratio": args.unique_ratio,
+            "recommend_engine": args.recommend_engine,
+        },
+        "upstream": mock_stats,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=300, help="엔드포인트별 요청 수")
+    parser.add_argument("--devices", type=int, default=50)
+    parser.add_argument("--unique-ratio", type=float, default=0.5, help="analyze 요청 중 캐시에 없는 프롬프트 비율")
+    parser.add_argument("--recommend-engine", choices=("llm", "local", "auto"), default="auto")
+    parser.add_argument("--latency", type=float, default=0.5, help="mock 업스트림 평균 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--outputs", help="mock 응답 JSON 파일({'analyze': ..., 'recommend': ...})")
+    parser.add_argument("--database-url", help="기본: benchmarks/results/load_test.db (sqlite)")
+    parser.add_argument("--migrate", action="store_true", help="create_all 대신 alembic upgrade head")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--app-port", type=int, default=8899)
+    parser.add_argument("--mock-port", type=int, default=8900)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--output", help="결과 JSON 경로(기본: benchmarks/results/<시각>_<sha>.json)")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    if args.baseline:
+        report["vs_baseline"] = compare(report, json.loads(Path(args.baseline).read_text(encoding="utf-8")))
+
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"{datetime.now().strftime('%Y%m%d-%H%M%S')}_{report['commit'][:12]}.json")
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"saved: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+분석 빠른 경로(app.core.local_fixer) 벤치마크.
+
+샘플 프롬프트(모델 라우터 라벨 샘플 + 오타/표기 위주 샘플)에 빠른 경로를 돌려
+hit rate, LLM으로 넘긴 사유, 판정 시간(p50/p99/max, outputPrompt 교차 검증 포함),
+그리고 hit 결과가 모두 교차 검증을 통과하는지를 보여 준다.
+오타/띄어쓰기/표기만 고치면 되는 실제 프롬프트(MUST_HIT)는 기대한 패치로 로컬에서 응답해야 하고,
+구체화가 필요한 프롬프트(MUST_ESCALATE)는 LLM으로 넘어가야 한다. 어긋나면 violations에 남기고 종료 코드 1.
+
+    python -m benchmarks.local_fixer --repeat 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+from app.core.local_fixer import local_fixer
+from app.schemas.gpt import outputPrompt
+from benchmarks.model_router import DEFAULT_SAMPLES, load_samples
+
+TYPO_SAMPLES = [
+    "도커 컨테이너와 이미지의 차이를 표로 정리 해줘. 각 항목은 두 문장 이내로.",
+    "python으로 csv 파일을 읽어서 월별 합계를 구하는 코드를 작성해줘. pandas는 쓰지 말고.",
+    "mysql 8에서 json 컬럼에 인덱스를 거는 방법을 예제 sql과 함께 보여줘",
+    "깃허브 액션으로 파이썬 패키지를 테스트하고 배포하는 워크플로 파일을 작성 해줘",
+    "쿠버네티스 파드가 CrashLoopBackOff 상태가 됬는데 확인할 순서를 단계별로 정리해줘",
+    "fastapi에서 jwt 인증을 붙이는 예제를 파일별로 나눠서 보여줘. 만료 처리도 포함해서.",
+    "신규 입사자 교육 자료를 요약 해줘. 각 장마다 핵심 문장 두 개씩만 뽑아줘.",
+    "이번 분기 매출 보고서 초안을 검토 해줘. 숫자 오류와 어색한 문장만 표시해줘.",
+    "타입스크립트 제네릭으로 api 응답 타입을 안전하게 다루는 패턴 세 가지를 비교 해줘",
+    "레디스를 캐시로 쓸 때 만료 정책을 어떻게 잡을지 트래픽 규모별로 정리해줘 금새 바뀌는 데이터도 있어",
+]
+
+# 조건이 이미 구체적이라 오타/띄어쓰기/표기만 고치면 되는 프롬프트 -> 기대 패치(from, to)
+MUST_HIT = {
+    "도커 컨테이너와 이미지의 차이를 표로 정리 해줘. 각 항목은 두 문장 이내로.":
+        {("도커", "Docker"), ("정리 해", "정리해")},
+    "python으로 csv 파일을 읽어서 월별 합계를 구하는 코드를 작성해줘. pandas는 쓰지 말고.":
+        {("python", "Python"), ("csv", "CSV")},
+    "쿠버네티스 파드가 CrashLoopBackOff 상태가 됬는데 확인할 순서를 단계별로 정리해줘":
+        {("쿠버네티스", "Kubernetes"), ("됬", "됐")},
+    "fastapi로 로그인 api 만들고 싶은데 jwt 인증까지 포함해서 코드 짜줘":
+        {("fastapi", "FastAPI"), ("api", "API"), ("jwt", "JWT")},
+    "인공지능 개론 수업의 기말 과제 주제 다섯 개를 난이도 순으로 추천 해줬스면 좋겠어.":
+        {("추천 해줬스면", "추천해주었으면")},
+    "도커 컴포즈 파일 버전 업그레이드 후 몇일째 컨테이너 재시작 안되요":
+        {("도커", "Docker"), ("몇일", "며칠"), ("안되요", "안 돼요")},
+}
+
+# 고칠 표기가 있어도 요청 자체를 LLM이 구체화해야 하는 프롬프트(모호한 표현/열린 질문/대상만 있는 요청/애매한 치환)
+MUST_ESCALATE = [
+    "도커에 대해 설명해줘",
+    "인공지능에 대해 자세하고 상세하게 설명 해줬스면 좋겠어.",
+    "파이썬 설명 해줘",
+    "mysql에서 인덱스를 어떻게 설계해야 조회가 빨라지는지 알려줘",
+    "What is the difference between docker and kubernetes?",
+    "장고로 게시판 만드는 코드를 단계별로 작성해줘",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", default=DEFAULT_SAMPLES)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    prompts = [s["prompt"] for s in load_samples(args.samples)] + TYPO_SAMPLES + list(MUST_HIT) + MUST_ESCALATE
+    outcomes = Counter()
+    invalid = []
+    timings = []
+    for prompt in prompts:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            candidate, outcome = local_fixer.analyze(prompt)
+            if candidate is not None:
+                outputPrompt.model_validate(candidate, context={"original": prompt})
+        timings.append((time.perf_counter() - started) / args.repeat * 1e6)
+        outcomes[outcome] += 1
+        if candidate is not None:
+            try:
+                outputPrompt.model_validate(candidate, context={"original": prompt})
+            except ValueError as e:
+                invalid.append({"prompt": prompt, "error": str(e)})
+
+    violations = []
+    for prompt, expected in MUST_HIT.items():
+        candidate, outcome = local_fixer.analyze(prompt)
+        got = {(p["from"], p["to"]) for p in candidate["patches"]} if candidate else set()
+        if got != expected:
+            violations.append({"prompt": prompt, "outcome": outcome, "patches": sorted(got), "expected": sorted(expected)})
+    for prompt in MUST_ESCALATE:
+        candidate, outcome = local_fixer.analyze(prompt)
+        if candidate is not None:
+            violations.append({"prompt": prompt, "outcome": outcome, "expected": "escalate"})
+
+    timings.sort()
+    pick = lambda q: round(timings[min(len(timings) - 1, int(q * len(timings)))], 1)
+    print(json.dumps({
+        "prompts": len(prompts),
+        "hit_rate": round(outcomes["hit"] / len(prompts), 3),
+        "outcomes": dict(outcomes),
+        "latency_us": {"p50": pick(0.5), "p99": pick(0.99), "max": round(timings[-1], 1)},
+        "invalid_hits": invalid,
+        "violations": violations,
+        "example_hits": [
+            {"prompt": p, **local_fixer.analyze(p)[0]} for p in TYPO_SAMPLES if local_fixer.analyze(p)[0] is not None
+        ][:3],
+    }, indent=2, ensure_ascii=False))
+    sys.exit(1 if invalid or violations else 0)
+
+
+if __name__ == "__main__":
+    main()
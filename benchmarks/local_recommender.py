@@ -0,0 +1,185 @@
+"""
+로컬 추천 엔진(TF-IDF) vs LLM 추천 비교.
+
+합성 히스토리 코퍼스: 유저마다 주 관심 카테고리 하나를 정하고, 그 카테고리 질문 70% +
+다른 카테고리/잡담 30%로 최근 토픽 목록을 만든다. 질문 문장은 템플릿 키워드와 별개로 작성한
+문장 풀에서 뽑는다.
+
+- 품질: 추천 3개 안에 주 관심 카테고리 템플릿이 있는지(hit@3), 1순위인지(hit@1).
+  비교 기준으로 항상 같은 범용 템플릿을 주는 경우(generic)와 무작위(random)를 같이 잰다.
+- 지연: 로컬 엔진 호출 자체, 그리고 가짜 업스트림(고정 지연)을 붙인 /api/recommended-prompts
+  엔드포인트의 engine=local / engine=llm 응답 시간.
+
+    python -m benchmarks.local_recommender --users 2000 --llm-latency 0.8
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+import httpx
+
+from app.core.config import settings
+from app.core.interests import interests_from_topics
+from app.core.llm import LLMClient, get_llm_client
+from app.core.local_recommender import local_recommender
+from app.db.session import Base, async_engine, engine
+from app.main import app
+
+CORPUS = {
+    "python": ["파이썬 리스트 컴프리헨션 쓰는 법", "python 클래스 상속 예제", "파이썬 딕셔너리 정렬하는 방법",
+               "파이썬 데코레이터가 뭐야", "asyncio gather랑 wait 차이", "파이썬 코루틴 예제 보여줘"],
+    "backend": ["fastapi 의존성 주입 설명", "rest api 설계할 때 주의점", "jwt 토큰 만료 처리",
+                "백엔드 서버 로그인 구현", "fastapi 라우터 분리하는 법"],
+    "database": ["mysql 인덱스 안 타는 이유", "sql 조인 종류 정리", "sqlalchemy 세션 commit 타이밍",
+                 "alembic 마이그레이션 충돌 해결", "데이터베이스 트랜잭션 격리 수준"],
+    "ml": ["딥러닝 과적합 막는 방법", "pytorch 학습 루프 예제", "머신러닝 모델 평가 지표", "신경망 학습률 정하는 법"],
+    "llm": ["gpt 프롬프트 잘 쓰는 팁", "chatgpt api 비용 줄이는 법", "rag 임베딩 모델 고르기", "llm 환각 줄이는 방법"],
+    "data": ["pandas groupby 사용 예제", "엑셀 데이터 시각화 그래프", "통계 분석 결과 해석", "데이터 전처리 순서"],
+    "frontend": ["react useEffect 무한 루프", "자바스크립트 클로저 설명", "리액트 컴포넌트 상태 공유"],
+    "devops": ["docker compose로 db 띄우기", "쿠버네티스 배포 전략", "github actions ci 설정", "git rebase 충돌 해결"],
+    "algorithm": ["코딩테스트 dp 문제 접근법", "그래프 탐색 bfs dfs 차이", "정렬 알고리즘 시간 복잡도"],
+    "career": ["신입 개발자 이력서 쓰는 법", "기술 면접 준비 방법", "포트폴리오에 넣을 프로젝트"],
+    "language": ["영어 회화 빨리 느는 법", "토익 단어 외우는 방법", "영어 문법 헷갈리는 부분"],
+    "writing": ["업무 메일 정중하게 쓰기", "보고서 요약 잘하는 법", "이메일로 일정 조율 요청"],
+    "health": ["헬스 초보 운동 루틴", "다이어트 식단 짜기", "러닝 무릎 통증"],
+    "food": ["자취 반찬 레시피", "냉장고 재료로 저녁 메뉴", "간단한 요리 추천"],
+    "travel": ["오사카 여행 일정 추천", "해외 여행 숙소 고르는 팁", "항공권 싸게 사는 법"],
+    "finance": ["etf 투자 시작하는 법", "금리 오르면 주식은", "사회초년생 재테크 방법"],
+    "productivity": ["공부 계획 세우는 법", "노션으로 할 일 관리", "집중력 높이는 습관"],
+    "math": ["선형대수 행렬 곱 의미", "확률 조건부 확률 예제", "미적분 극한 개념"],
+}
+NOISE = ["오늘 날씨 어때", "재밌는 얘기 해줘", "고마워", "이거 다시 설명해줘", "요약해줘"]
+
+
+def make_corpus(users: int, window: int, seed: int) -> list[tuple[str, list[str]]]:
+    rng = random.Random(seed)
+    categories = list(CORPUS)
+    corpus = []
+    for _ in range(users):
+        main = rng.choice(categories)
+        topics = []
+        for _ in range(window):
+            r = rng.random()
+            if r < 0.7:
+                topics.append(rng.choice(CORPUS[main]))
+            elif r < 0.9:
+                topics.append(rng.choice(CORPUS[rng.choice(categories)]))
+            else:
+                topics.append(rng.choice(NOISE))
+        corpus.append((main, topics))
+    return corpus
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def evaluate_quality(corpus, seed: int) -> dict:
+    rng = random.Random(seed)
+    by_title = {item["title"]: cat for item, cat in zip(local_recommender.items, local_recommender.categories)}
+    titles = list(by_title)
+    generic = [local_recommender.items[i]["title"] for i in local_recommender.generic][:3]
+
+    hits = {"local": [0, 0], "generic": [0, 0], "random": [0, 0]}
+    latencies = []
+    for main, topics in corpus:
+        t0 = time.perf_counter()
+        picked = [item["title"] for item in local_recommender.recommend(topics, interests_from_topics(topics))]
+        latencies.append(time.perf_counter() - t0)
+        for name, result in (("local", picked), ("generic", generic), ("random", rng.sample(titles, 3))):
+            cats = [by_title[t] for t in result]
+            hits[name][0] += cats[0] == main
+            hits[name][1] += main in cats
+
+    n = len(corpus)
+    return {
+        "users": n,
+        "quality": {name: {"hit@1": round(h1 / n, 3), "hit@3": round(h3 / n, 3)} for name, (h1, h3) in hits.items()},
+        "local_engine_ms": {
+            "p50": round(statistics.median(latencies) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+        },
+    }
+
+
+def make_fake_upstream(latency: float) -> httpx.AsyncClient:
+    content = {"local": [{"title": "t", "content": "c"}] * 3}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json={
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o-mini",
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": json.dumps(content, ensure_ascii=False)},
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        })
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def endpoint_latency(corpus, latency: float, requests: int) -> dict:
+    Base.metadata.create_all(engine)
+    settings.TRACE_BUFFER_ENABLED = False
+    llm = LLMClient(http_client=make_fake_upstream(latency))
+    app.dependency_overrides[get_llm_client] = lambda: llm
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        devices = []
+        for i, (_, topics) in enumerate(corpus[:requests]):
+            device = f"bench-rec-{i}"
+            devices.append(device)
+            for topic in reversed(topics):
+                r = await client.post("/api/trace_input", json={"device_uuid": device, "room_id": "r", "input_prompt": topic})
+                r.raise_for_status()
+
+        for mode in ("local", "llm"):
+            latencies = []
+            for device in devices:
+                t0 = time.perf_counter()
+                r = await client.post("/api/recommended-prompts",
+                                      json={"device_uuid": device, "room_id": "r", "engine": mode})
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - t0)
+            results[mode] = {
+                "p50_ms": round(statistics.median(latencies) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            }
+
+    app.dependency_overrides.pop(get_llm_client, None)
+    await llm.aclose()
+    await async_engine.dispose()
+    return {"upstream_latency_s": latency, "requests": len(devices), "endpoint": results}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--window", type=int, default=settings.RECENT_TOPICS_ROOM_LIMIT)
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--endpoint-requests", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.users, args.window, args.seed)
+    result = evaluate_quality(corpus, args.seed)
+    result.update(asyncio.run(endpoint_latency(corpus, args.llm_latency, args.endpoint_requests)))
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
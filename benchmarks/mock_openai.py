@@ -0,0 +1,135 @@
+"""
+부하 테스트용 OpenAI 호환 mock 서버 (POST /v1/chat/completions, stream 지원).
+
+지연/지터/에러율은 환경변수나 CLI 인자로 정한다. 응답 내용은
+- 분석 요청(/analyze-prompt*): 사용자 프롬프트의 첫 단어를 고치는 패치 1개 (교차 검증을 통과하는 형태,
+  full_suggestion은 서버가 만들므로 보내지 않음)
+- 추천 요청(/recommended-prompts): 고정 추천 3개
+이며, MOCK_OUTPUTS에 {"analyze": {...}, "recommend": {...}} JSON 파일을 주면 그 내용을 그대로 돌려준다.
+
+    python -m benchmarks.mock_openai --port 8900 --latency 0.6 --jitter 0.2 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY = float(os.environ.get("MOCK_LATENCY", "0.5"))
+JITTER = float(os.environ.get("MOCK_JITTER", "0.1"))
+ERROR_RATE = float(os.environ.get("MOCK_ERROR_RATE", "0.0"))
+CANNED = json.load(open(os.environ["MOCK_OUTPUTS"], encoding="utf-8")) if os.environ.get("MOCK_OUTPUTS") else {}
+rng = random.Random(int(os.environ.get("MOCK_SEED", "0")))
+
+app = FastAPI(title="mock-openai")
+stats = {"requests": 0, "errors": 0, "streams": 0}
+
+
+def analyze_output(prompt: str) -> dict:
+    word = prompt.split()[0] if prompt.split() else prompt
+    fixed = f"{word}(구체적으로)"
+    return {
+        "topic": "벤치마크",
+        "patches": [{"tag": "모호/지시 불명확", "from": word, "to": fixed}],
+    }
+
+
+def recommend_output(system: str) -> dict:
+    key = "global" if '"global"' in system else "local"
+    return {key: [{"title": f"추천 주제 {i}", "content": f"추천 질문 프롬프트 {i}"} for i in range(1, 4)]}
+
+
+def make_output(messages: list[dict]) -> dict:
+    system = messages[0]["content"] if messages else ""
+    user = messages[-1]["content"] if messages else ""
+    try:
+        payload = json.loads(user)
+    except (TypeError, ValueError):
+        payload = None
+    if isinstance(payload, dict) and ("interests" in payload or "topics" in payload):
+        return CANNED.get("recommend") or recommend_output(system)
+    return CANNED.get("analyze") or analyze_output(user)
+
+
+def usage(messages: list[dict], text: str) -> dict:
+    prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 2
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": len(text) // 2,
+        "total_tokens": prompt_tokens + len(text) // 2,
+        # 시스템 프롬프트 부분은 캐시됐다고 가정
+        "prompt_tokens_details": {"cached_tokens": (len(messages[0].get("content") or "") // 2) if messages else 0},
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    await asyncio.sleep(max(0.0, rng.gauss(LATENCY, JITTER)))
+    if rng.random() < ERROR_RATE:
+        stats["errors"] += 1
+        return JSONResponse(status_code=500, content={"error": {"message": "mock upstream error", "type": "server_error"}})
+
+    messages = body.get("messages", [])
+    text = json.dumps(make_output(messages), ensure_ascii=False)
+    model = body.get("model", "gpt-4o-mini")
+    created = int(time.time())
+
+    if not body.get("stream"):
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+            "usage": usage(messages, text),
+        }
+
+    stats["streams"] += 1
+
+    async def chunks():
+        def chunk(delta, finish=None, usage_=None):
+            return "data: " + json.dumps({
+                "id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [] if usage_ else [{"index": 0, "delta": delta, "finish_reason": finish}],
+                "usage": usage_,
+            }, ensure_ascii=False) + "\n\n"
+
+        for i in range(0, len(text), 8):
+            yield chunk({"content": text[i:i + 8]})
+            await asyncio.sleep(0.002)
+        yield chunk({}, "stop")
+        if (body.get("stream_options") or {}).get("include_usage"):
+            yield chunk({}, usage_=usage(messages, text))
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(chunks(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+def get_stats():
+    return stats
+
+
+def main():
+    global LATENCY, JITTER, ERROR_RATE
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=LATENCY)
+    parser.add_argument("--jitter", type=float, default=JITTER)
+    parser.add_argument("--error-rate", type=float, default=ERROR_RATE)
+    args = parser.parse_args()
+
+    LATENCY, JITTER, ERROR_RATE = args.latency, args.jitter, args.error_rate
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
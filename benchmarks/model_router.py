@@ -0,0 +1,78 @@
+"""
+모델 라우터 오프라인 평가.
+
+라벨링된 샘플 파일(JSONL: {"prompt", "task_type", "route"})에 라우터를 돌려
+작업 유형/경로 정확도, 혼동 행렬, 틀린 샘플, 요청당 라우팅 시간,
+고정 경로(default) 대비 max_tokens 예산 합계를 보여 준다.
+가중치/경계를 바꿔 보려면 --weights(JSON), --short-below, --complex-from을 준다.
+
+    python -m benchmarks.model_router --samples benchmarks/model_router_samples.jsonl
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+from app.core.config import settings
+from app.core.model_router import FixedRouter, HeuristicRouter, extract_features
+
+DEFAULT_SAMPLES = os.path.join(os.path.dirname(__file__), "model_router_samples.jsonl")
+
+
+def load_samples(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def confusion(pairs: list[tuple[str, str]]) -> dict:
+    table: dict[str, Counter] = {}
+    for label, predicted in pairs:
+        table.setdefault(label, Counter())[predicted] += 1
+    return {label: dict(row) for label, row in sorted(table.items())}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", default=DEFAULT_SAMPLES)
+    parser.add_argument("--weights", type=json.loads, default=None, help='예: {"log_tokens": 1.0, "code": 2.5}')
+    parser.add_argument("--short-below", type=float, default=None)
+    parser.add_argument("--complex-from", type=float, default=None)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+    router = HeuristicRouter(args.weights, args.short_below, args.complex_from)
+    routes = [router.route(s["prompt"]) for s in samples]
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for s in samples:
+            router.route(s["prompt"])
+    per_route_us = (time.perf_counter() - started) / (args.repeat * len(samples)) * 1e6
+
+    fixed = FixedRouter().route("")
+    mistakes = [
+        {"prompt": s["prompt"][:60], "label": [s["task_type"], s["route"]], "predicted": [r.task_type, r.name],
+         "score": r.score, "features": {k: round(v, 2) for k, v in extract_features(s["prompt"])[0].items()}}
+        for s, r in zip(samples, routes) if (s["task_type"], s["route"]) != (r.task_type, r.name)
+    ]
+    print(json.dumps({
+        "samples": len(samples),
+        "task_accuracy": round(sum(s["task_type"] == r.task_type for s, r in zip(samples, routes)) / len(samples), 3),
+        "route_accuracy": round(sum(s["route"] == r.name for s, r in zip(samples, routes)) / len(samples), 3),
+        "route_confusion": confusion([(s["route"], r.name) for s, r in zip(samples, routes)]),
+        "task_confusion": confusion([(s["task_type"], r.task_type) for s, r in zip(samples, routes)]),
+        "route_us": round(per_route_us, 2),
+        "max_tokens_budget": {"routed": sum(r.max_tokens for r in routes), "fixed_default": fixed.max_tokens * len(samples)},
+        "routes": settings.MODEL_ROUTES,
+        "thresholds": [router.short_below, router.complex_from],
+        "mistakes": mistakes,
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+패치 교차 검증/적용 마이크로벤치마크 (긴 프롬프트).
+
+원문 길이별로 30개 패치(왼→오, 비중첩)를 만들어
+- legacy: 예전 검증(패치마다 `frag in original` 전체 스캔 + find)
+- cursor: 현재 검증(app.core.patching.locate_patches, 탐색 시작점만 전진하는 한 번 스캔)
+- aho_corasick: 패턴 전체를 오토마톤 하나로 한 번 훑는 방식(순수 파이썬)
+의 검증 시간과, full_suggestion을 서버에서 만드는 apply_patches 시간을 잰다.
+마지막으로 LLM 출력에서 full_suggestion을 뺐을 때 completion 토큰이 얼마나 줄어드는지(추정)를 보여 준다.
+
+    python -m benchmarks.patch_validator --patches 30 --repeat 200
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+from app.core.aho_corasick import AhoCorasick
+from app.core.patching import apply_patches, locate_patches
+from app.core.prompts.registry import count_tokens
+
+SENTENCES = [
+    "파이썬으로 FastAPI 서버를 만들 때 비동기 DB 세션과 커넥션 풀 설정을 어떻게 해야 하는지 자세하게 설명해줘.",
+    "도커 컴포즈로 mysql이랑 redis를 같이 띄우고 헬스체크까지 거는 예제를 보여줘.",
+    "우리 팀 회의록을 요약해서 결정 사항과 담당자, 마감일을 표로 정리해줘.",
+    "react 컴포넌트에서 useEffect가 두 번 실행되는 이유랑 해결 방법 알려줘.",
+    "영어 이메일로 일정 변경을 정중하게 요청하는 문장을 세 가지 버전으로 써줘.",
+]
+TAGS = ["오타/맞춤법", "모호/지시 불명확", "구조/길이 중복", "문체/스타일 개선"]
+
+
+def make_case(chars: int, n_patches: int, rng: random.Random) -> tuple[str, list[tuple[str, str]]]:
+    parts = []
+    while sum(map(len, parts)) < chars:
+        parts.append(rng.choice(SENTENCES))
+    original = " ".join(parts)
+    words = original.split(" ")
+    # 원문을 n등분한 구간마다 한 단어씩 골라 왼→오 순서 패치를 만든다
+    edits = []
+    for k in range(n_patches):
+        word = words[len(words) * k // n_patches + rng.randrange(max(1, len(words) // n_patches))]
+        edits.append((word, f"{word}(구체적으로)"))
+    # 같은 단어가 앞쪽에 또 나오면 순서가 꼬일 수 있으므로 실제 배치 가능한 것만 남긴다
+    valid, search_from = [], 0
+    for frag, to in edits:
+        idx = original.find(frag, search_from)
+        if idx >= 0:
+            valid.append((frag, to))
+            search_from = idx + len(frag)
+    return original, valid
+
+
+def legacy_locate(original: str, frags: list[str]) -> list[int]:
+    positions, search_from = [], 0
+    for i, frag in enumerate(frags):
+        if frag not in original:
+            raise ValueError(i)
+        idx = original.find(frag, search_from)
+        if idx == -1:
+            raise ValueError(i)
+        positions.append(idx)
+        search_from = idx + len(frag)
+    return positions
+
+
+def aho_corasick_locate(original: str, frags: list[str]) -> list[int]:
+    automaton = AhoCorasick(frags)
+    ids = [automaton.ids[f] for f in frags]
+    positions, search_from = [], 0
+    for start, pid in automaton.iter(original):
+        if pid == ids[len(positions)] and start >= search_from:
+            positions.append(start)
+            search_from = start + len(frags[len(positions) - 1])
+            if len(positions) == len(frags):
+                break
+    if len(positions) != len(frags):
+        raise ValueError(len(positions))
+    return positions
+
+
+def bench(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 10000, 50000], help="원문 길이(문자)")
+    parser.add_argument("--patches", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = []
+    for size in args.sizes:
+        original, edits = make_case(size, args.patches, rng)
+        frags = [frag for frag, _ in edits]
+        positions = locate_patches(original, frags)
+        assert positions == legacy_locate(original, frags) == aho_corasick_locate(original, frags)
+        rows.append({
+            "chars": len(original),
+            "patches": len(edits),
+            "validate_us": {
+                "legacy": round(bench(lambda: legacy_locate(original, frags), args.repeat), 2),
+                "cursor": round(bench(lambda: locate_patches(original, frags), args.repeat), 2),
+                "aho_corasick": round(bench(lambda: aho_corasick_locate(original, frags), args.repeat), 2),
+            },
+            "apply_us": round(bench(lambda: apply_patches(original, positions, edits), args.repeat), 2),
+        })
+
+    # completion 토큰: 패치만 vs 패치 + full_suggestion (일반적인 길이의 프롬프트 기준)
+    token_rows = []
+    for size in (80, 300, 1000):
+        original, edits = make_case(size, min(args.patches, max(2, size // 60)), rng)
+        patches = [{"tag": rng.choice(TAGS), "from": f, "to": t} for f, t in edits]
+        full = apply_patches(original, locate_patches(original, [f for f, _ in edits]), edits)
+        body = {"topic": "벤치마크", "patches": patches}
+        without = count_tokens(json.dumps(body, ensure_ascii=False))[0]
+        with_full = count_tokens(json.dumps({**body, "full_suggestion": full}, ensure_ascii=False))[0]
+        token_rows.append({"chars": len(original), "patches": len(patches), "completion_tokens": {
+            "with_full_suggestion": with_full, "patches_only": without,
+            "saved": f"{(with_full - without) / with_full * 100:.0f}%"}})
+
+    print(json.dumps({"validate_and_apply": rows, "output_tokens": token_rows,
+                      "exact_tokens": count_tokens("x")[1]}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+PII 가림(app.core.pii) 처리량 벤치마크.
+
+이전 /analyze-prompt22의 두 번 훑는 정규식 마스킹(EMAIL_RE -> PHONE_RE, 되돌리기 없음)과
+한 번 훑는 새 스캐너(redact + restore)를 같은 입력에 돌린다.
+- 일반 입력: 한국어 문장 사이에 이메일/전화/주민번호가 섞인 텍스트의 MB/s
+- 적대적 입력: 긴 영숫자/숫자 연속, '@'/구분자 반복 등. 길이를 두 배씩 늘려 가며 시간이 몇 배가 되는지
+  (선형이면 약 2배, 이전 정규식은 약 4배)를 보여 준다. 이전 방식은 한 번에 --legacy-cap 초를 넘으면 더 키우지 않는다.
+
+    python -m benchmarks.pii_redaction --max-kb 1024
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+from app.core.pii import redact
+
+# 이전 구현(app/api/v1/routers/test.py의 mask_pii_text)
+LEGACY_EMAIL_RE = re.compile(r"([A-Za-z0-9._%+-]+)@([A-Za-z0-9.-]+\.[A-Za-z]{2,})")
+LEGACY_PHONE_RE = re.compile(r"(?:(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{2,4}\)?[-.\s]?)?\d{3,4}[-.\s]?\d{4})")
+
+
+def legacy_mask(text: str) -> str:
+    masked = LEGACY_EMAIL_RE.sub(lambda m: f"{m.group(1)[0]}***@***.{m.group(2).split('.')[-1]}", text)
+    return LEGACY_PHONE_RE.sub(lambda _: "XXX-XXXX-XXXX", masked)
+
+
+def redact_roundtrip(text: str) -> str:
+    redaction = redact(text)
+    return redaction.restore(redaction.text)
+
+
+NORMAL_LINE = ("고객 김민수(minsu.kim@example.co.kr, 010-1234-5678)의 환불 요청 메일을 정중하게 다시 써줘. "
+               "주민번호 900101-1234567은 빼고, 대표번호 1588-1234와 2024-01-15 접수 건도 언급해줘.\n")
+
+ADVERSARIAL = {
+    "alnum_run": lambda n: "a" * n,
+    "digit_run": lambda n: "7" * n,
+    "dotted_local_then_at": lambda n: "a." * (n // 2) + "@",
+    "long_domain_no_tld": lambda n: "a@" + "b-" * (n // 2),
+    "at_signs": lambda n: "a@" * (n // 2),
+    "dashed_digits": lambda n: "1-" * (n // 2),
+    "spaced_zero_groups": lambda n: "010 " * (n // 4),
+    "phone_like_no_tail": lambda n: "010-1234-" * (n // 9),
+}
+
+
+def timed(fn, text: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - started) / repeat
+
+
+def ladder(make, sizes: list[int], legacy_cap: float) -> dict:
+    rows = []
+    legacy_done = False
+    for n in sizes:
+        text = make(n)
+        new = timed(redact_roundtrip, text, 3)
+        row = {"chars": len(text), "new_ms": round(new * 1000, 2)}
+        if not legacy_done:
+            old = timed(legacy_mask, text, 1)
+            row["legacy_ms"] = round(old * 1000, 2)
+            legacy_done = old > legacy_cap
+        rows.append(row)
+    growth = lambda key: [round(b[key] / a[key], 1) for a, b in zip(rows, rows[1:]) if a.get(key) and b.get(key)]
+    return {"rows": rows, "new_growth": growth("new_ms"), "legacy_growth": growth("legacy_ms"),
+            "new_mb_s": round(rows[-1]["chars"] / (rows[-1]["new_ms"] / 1000) / 1e6, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-kb", type=int, default=1024, help="적대적 입력 최대 길이(KB)")
+    parser.add_argument("--normal-kb", type=int, default=1024, help="일반 입력 길이(KB)")
+    parser.add_argument("--legacy-cap", type=float, default=2.0, help="이전 방식 1회가 이 초를 넘으면 더 키우지 않음")
+    args = parser.parse_args()
+
+    normal = NORMAL_LINE * (args.normal_kb * 1024 // len(NORMAL_LINE) + 1)
+    redaction = redact(normal)
+    assert redaction.restore(redaction.text) == normal
+    normal_new = timed(redact_roundtrip, normal, 3)
+    normal_old = timed(legacy_mask, normal, 3)
+
+    sizes = []
+    n = 2048
+    while n <= args.max_kb * 1024:
+        sizes.append(n)
+        n *= 2
+    print(json.dumps({
+        "normal": {
+            "chars": len(normal),
+            "redactions": redaction.counts(),
+            "new_mb_s": round(len(normal) / normal_new / 1e6, 1),
+            "legacy_mb_s": round(len(normal) / normal_old / 1e6, 1),
+            "sample": redaction.text[:len(NORMAL_LINE)],
+        },
+        "adversarial": {name: ladder(make, sizes, args.legacy_cap) for name, make in ADVERSARIAL.items()},
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
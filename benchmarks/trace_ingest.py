@@ -0,0 +1,107 @@
+"""
+/trace_input 수집 경로 처리량 비교: 요청마다 insert/commit 하는 직접 경로 vs write-behind 버퍼.
+
+기본은 로컬 sqlite 파일을 쓰며, DATABASE_URL 환경변수로 MySQL을 지정할 수 있다.
+
+    python -m benchmarks.trace_ingest --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+import httpx
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, Base, async_engine, engine
+from app.main import app
+from app.models.history import History
+from app.models.user import User
+from app.services.trace_buffer import trace_buffer
+
+
+async def count_histories() -> int:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(func.count()).select_from(History))).scalar_one()
+
+
+async def drive(n: int, concurrency: int, devices: int) -> list[float]:
+    sem = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def one(i: int) -> float:
+            async with sem:
+                t0 = time.perf_counter()
+                r = await client.post("/api/trace_input", json={
+                    "device_uuid": f"bench-device-{i % devices}",
+                    "room_id": f"room-{i % 7}",
+                    "input_prompt": f"벤치마크 질문 {i}",
+                })
+                r.raise_for_status()
+                return time.perf_counter() - t0
+
+        return await asyncio.gather(*(one(i) for i in range(n)))
+
+
+async def run_mode(mode: str, n: int, concurrency: int, devices: int) -> dict:
+    before = await count_histories()
+    settings.TRACE_BUFFER_ENABLED = mode == "buffered"
+    if mode == "buffered":
+        trace_buffer.start()
+
+    t0 = time.perf_counter()
+    latencies = await drive(n, concurrency, devices)
+    accepted = time.perf_counter() - t0
+    if mode == "buffered":
+        await trace_buffer.stop()
+    persisted = time.perf_counter() - t0
+
+    written = await count_histories() - before
+    latencies.sort()
+    return {
+        "mode": mode,
+        "requests": n,
+        "rows_written": written,
+        "rps_accepted": round(n / accepted, 1),
+        "rps_persisted": round(n / persisted, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+
+async def seed_users(devices: int) -> None:
+    # 유저가 이미 있는 웜 상태의 수집 처리량을 재기 위해 유저를 미리 만들어 둔다
+    async with AsyncSessionLocal() as db:
+        existing = set((await db.execute(select(User.device_uuid))).scalars())
+        db.add_all(User(device_uuid=f"bench-device-{i}") for i in range(devices)
+                   if f"bench-device-{i}" not in existing)
+        await db.commit()
+
+
+async def main_async(args) -> list[dict]:
+    Base.metadata.create_all(engine)
+    await seed_users(args.devices)
+    results = []
+    for mode in ("direct", "buffered"):
+        results.append(await run_mode(mode, args.requests, args.concurrency, args.devices))
+    await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--devices", type=int, default=100)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()